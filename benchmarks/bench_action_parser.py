@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the action parser against the previous eval()-based parsing.
+
+Usage:
+    python benchmarks/bench_action_parser.py [--iterations N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Run from anywhere: make the phone_agent package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phone_agent.actions.handler import do
+from phone_agent.actions.parser import parse_action_call
+
+# Action strings as produced by the model in recorded sessions
+RECORDED_RESPONSES = [
+    'do(action="Launch", app="微信")',
+    'do(action="Tap", element=[512, 873])',
+    'do(action="Tap", element=[88, 64], message="确认支付")',
+    'do(action="Type", text="打开小红书搜索美食攻略")',
+    'do(action="Swipe", start=[500, 800], end=[500, 200])',
+    'do(action="Back")',
+    'do(action="Home")',
+    'do(action="Double Tap", element=[300, 450])',
+    'do(action="Long Press", element=[640, 910])',
+    'do(action="Wait", duration="2 seconds")',
+    'do(action="Take_over", message="请完成登录验证")',
+    'finish(message="已为您找到附近评分最高的火锅店。")',
+]
+
+
+def parse_with_eval(response: str) -> dict:
+    """The previous implementation, kept here for comparison."""
+    response = response.strip()
+    if response.startswith("do"):
+        return eval(response, {"do": do})
+    return {
+        "_metadata": "finish",
+        "message": response.replace("finish(message=", "")[1:-2],
+    }
+
+
+def bench(name: str, func, iterations: int, repeat: int) -> float:
+    """Run `func` over all recorded responses and print the best per-call time."""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for response in RECORDED_RESPONSES:
+                func(response)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    per_call_us = elapsed / (iterations * len(RECORDED_RESPONSES)) * 1e6
+    print(f"{name:<12} {per_call_us:8.2f} us/call")
+    return per_call_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Both parsers must agree on every recorded response
+    for response in RECORDED_RESPONSES:
+        assert parse_action_call(response).to_dict() == parse_with_eval(response)
+
+    baseline = bench("eval", parse_with_eval, args.iterations, args.repeat)
+    current = bench(
+        "parser", lambda r: parse_action_call(r), args.iterations, args.repeat
+    )
+    print(f"speedup      {baseline / current:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
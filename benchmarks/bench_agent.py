@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark whole agent steps offline against fake devices and a mock model.
+
+Runs PhoneAgent end to end (screenshots, encoding, prompt building, model
+requests, parsing and actions) without a phone or GPU: device I/O goes to a
+fake ADB server serving resources/*.png and model requests to a mock
+OpenAI-compatible server with scripted responses. Reports steps per second,
+the per-stage latency breakdown and memory use.
+
+Usage:
+    python benchmarks/bench_agent.py [--tasks N] [--devices N] [--stream]
+        [--pipelined] [--screen-tracking] [--screenshot-mode stream|pull|raw]
+        [--ttft-ms MS] [--tokens-per-second N] [--screencap-ms MS] [--tracemalloc]
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+# Run from anywhere: make the phone_agent package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_device import DeviceLatency, FakeADBServer, load_screens, use_fake_server
+from mock_model_server import MockModelServer, ModelLatency
+
+from phone_agent import PhoneAgent
+from phone_agent.adb.settle import SettleConfig
+from phone_agent.agent import AgentConfig
+from phone_agent.model import ModelConfig
+from phone_agent.timing import TaskTimings
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "..", "resources", "*.png")
+TASK = "打开微信给文件传输助手发送消息"
+
+
+def run_task(agent: PhoneAgent, timings: TaskTimings) -> int:
+    """Run one task step by step, collecting the timings of every step."""
+    agent.reset()
+    result = agent.step(TASK)
+    steps = 1
+    while not result.finished and steps < agent.agent_config.max_steps:
+        timings.add(result.timings)
+        result = agent.step()
+        steps += 1
+    timings.add(result.timings)
+    return steps
+
+
+async def arun_task(agent: PhoneAgent, timings: TaskTimings) -> int:
+    """Async counterpart of run_task()."""
+    agent.reset()
+    result = await agent.astep(TASK)
+    steps = 1
+    while not result.finished and steps < agent.agent_config.max_steps:
+        timings.add(result.timings)
+        result = await agent.astep()
+        steps += 1
+    timings.add(result.timings)
+    return steps
+
+
+def make_agent(args, model_url: str, serial: str) -> PhoneAgent:
+    return PhoneAgent(
+        model_config=ModelConfig(base_url=model_url, stream=args.stream),
+        agent_config=AgentConfig(
+            device_id=serial,
+            verbose=False,
+            screenshot_mode=args.screenshot_mode,
+            pipelined=args.pipelined,
+            screen_tracking=args.screen_tracking,
+            # Real settle detection over the fake device instead of fixed
+            # 1s sleeps, which would dominate every step
+            settle_config=SettleConfig(
+                stable_ms=args.settle_ms, poll_interval_ms=20, min_wait_ms=0
+            ),
+        ),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=3, help="Tasks per device")
+    parser.add_argument("--steps", type=int, default=5, help="Actions per task")
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--pipelined", action="store_true")
+    parser.add_argument("--screen-tracking", action="store_true")
+    parser.add_argument(
+        "--screenshot-mode", choices=["stream", "pull", "raw"], default="stream"
+    )
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--screencap-ms", type=float, default=60.0)
+    parser.add_argument("--shell-ms", type=float, default=5.0)
+    parser.add_argument("--input-ms", type=float, default=10.0)
+    parser.add_argument(
+        "--bandwidth", type=float, default=0.0, help="Screenshot MB/s (0: unlimited)"
+    )
+    parser.add_argument("--settle-ms", type=int, default=50)
+    parser.add_argument("--screens", default=RESOURCES, help="Screenshot glob")
+    parser.add_argument(
+        "--tracemalloc", action="store_true", help="Track Python allocations"
+    )
+    args = parser.parse_args()
+
+    device_server = FakeADBServer(
+        load_screens(args.screens),
+        count=args.devices,
+        latency=DeviceLatency(
+            shell_ms=args.shell_ms,
+            screencap_ms=args.screencap_ms,
+            input_ms=args.input_ms,
+            bandwidth_mbps=args.bandwidth,
+        ),
+    ).start()
+    use_fake_server(device_server)
+    model_server = MockModelServer(
+        steps_per_task=args.steps,
+        latency=ModelLatency(args.ttft_ms, args.tokens_per_second),
+    ).start()
+
+    agents = [
+        make_agent(args, model_server.base_url, serial)
+        for serial in device_server.devices
+    ]
+    timings = TaskTimings()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if args.devices == 1:
+        steps = sum(run_task(agents[0], timings) for _ in range(args.tasks))
+    else:
+
+        async def run_device(agent: PhoneAgent) -> int:
+            return sum([await arun_task(agent, timings) for _ in range(args.tasks)])
+
+        async def run_all() -> int:
+            return sum(await asyncio.gather(*(run_device(a) for a in agents)))
+
+        steps = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    print(timings.format_table())
+    print()
+    tasks = args.tasks * args.devices
+    print(f"tasks        {tasks:>10}")
+    print(f"steps        {steps:>10}")
+    print(f"elapsed      {elapsed:>10.2f} s")
+    print(f"throughput   {steps / elapsed:>10.2f} steps/s")
+    print(f"model calls  {model_server.requests:>10}")
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    print(f"peak RSS     {peak_mb:>10.1f} MB")
+    if args.tracemalloc:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        print(f"peak traced  {traced_peak / (1024 * 1024):>10.1f} MB")
+
+    model_server.stop()
+    device_server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark foreground-app resolution against the previous line-scanning lookup.
+
+Usage:
+    python benchmarks/bench_current_app.py [--iterations N]
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+# Run from anywhere: make the phone_agent package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phone_agent.adb.device_state import DeviceState, parse_focus
+from phone_agent.config.apps import APP_PACKAGES
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "dumpsys_window_*.txt")
+
+# What each fixture should resolve to
+EXPECTED = {
+    "dumpsys_window_android13_wechat.txt": "微信",
+    "dumpsys_window_android13_popup.txt": "美团",
+    "dumpsys_window_android10_weibolite.txt": "System Home",
+    "dumpsys_window_android10_locked.txt": "System Home",
+}
+
+# Lines the device-side grep of the state probe lets through
+DEVICE_FILTER = re.compile(r"mCurrentFocus=|mFocusedApp=|Lockscreen=|Keyguard")
+
+
+def current_app_by_scan(output: str) -> str:
+    """The previous implementation, kept here for comparison."""
+    for line in output.split("\n"):
+        if "mCurrentFocus" in line or "mFocusedApp" in line:
+            for app_name, package in APP_PACKAGES.items():
+                if package in line:
+                    return app_name
+    return "System Home"
+
+
+def current_app_by_index(output: str) -> str:
+    state = DeviceState(
+        screen_on=True, locked=False, focus=parse_focus(output), captured_at=0.0
+    )
+    return state.current_app
+
+
+def bench(name: str, func, outputs: list[str], iterations: int) -> float:
+    """Resolve every output `iterations` times and print the per-call time."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for output in outputs:
+            func(output)
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / (iterations * len(outputs)) * 1e6
+    print(f"{name:<18} {per_call_us:10.2f} us/call")
+    return per_call_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(FIXTURES))
+    outputs = []
+    filtered = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            output = f.read()
+        lines = [line for line in output.split("\n") if DEVICE_FILTER.search(line)]
+        outputs.append(output)
+        filtered.append("\n".join(lines))
+
+        name = os.path.basename(path)
+        scanned = current_app_by_scan(output)
+        indexed = current_app_by_index(output)
+        assert indexed == EXPECTED[name], (name, indexed)
+        assert current_app_by_index(filtered[-1]) == indexed
+        note = "" if scanned == indexed else f"  (scan: {scanned})"
+        print(f"{name:<42} {len(output) / 1024:6.1f} KiB -> {indexed}{note}")
+
+    full_kib = sum(len(o) for o in outputs) / len(outputs) / 1024
+    filtered_kib = sum(len(f) for f in filtered) / len(filtered) / 1024
+    print(f"\ntransfer per probe {full_kib:10.1f} KiB -> {filtered_kib:.2f} KiB\n")
+
+    baseline = bench("scan (full dump)", current_app_by_scan, outputs, args.iterations)
+    indexed = bench("index (full dump)", current_app_by_index, outputs, args.iterations)
+    probe = bench("index (filtered)", current_app_by_index, filtered, args.iterations)
+    print(
+        f"speedup            {baseline / indexed:10.2f}x full, "
+        f"{baseline / probe:.0f}x filtered"
+    )
+
+
+if __name__ == "__main__":
+    main()
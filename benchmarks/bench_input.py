@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark input events through `input` commands against the input injector.
+
+Sends the same taps, swipes, key presses, text and clears to a fake device with each
+input backend. The fake device charges --input-ms for every `input` or
+`am broadcast` command (the app_process start a real phone pays) and
+--inject-ms for every injector message, so the numbers show the protocol
+and client overhead on top of those. The injector is started through the
+same push and app_process path as on a phone, with a placeholder jar.
+
+Usage:
+    python benchmarks/bench_input.py [--events N] [--input-ms MS] [--inject-ms MS]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Run from anywhere: make the phone_agent package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_device import DeviceLatency, FakeADBServer, load_screens, use_fake_server
+
+from phone_agent.adb import back, clear_text, home, swipe, tap, type_text
+from phone_agent.adb.injector import close_injector, set_input_backend
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "..", "resources", "*.png")
+
+
+def send_events(count: int) -> None:
+    """Send `count` events cycling through every kind the agent uses."""
+    for i in range(count):
+        kind = i % 6
+        if kind == 0:
+            tap(540, 1200, delay=0)
+        elif kind == 1:
+            swipe(540, 1800, 540, 600, duration_ms=0, delay=0)
+        elif kind == 2:
+            back(delay=0)
+        elif kind == 3:
+            home(delay=0)
+        elif kind == 4:
+            type_text("hello")
+        else:
+            clear_text()
+
+
+def bench(server: FakeADBServer, backend: str, events: int) -> tuple[float, list[str]]:
+    """Run the events on a backend; return ms per event and the device's log."""
+    set_input_backend(backend)
+    device = server.get_device(None)
+    device.events.clear()
+    start = time.perf_counter()
+    send_events(events)
+    elapsed = time.perf_counter() - start
+    per_event_ms = elapsed / events * 1000
+    print(
+        f"{backend:<10} {per_event_ms:8.2f} ms/event  {events / elapsed:8.1f} events/s"
+    )
+    return per_event_ms, list(device.events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--input-ms", type=float, default=300.0)
+    parser.add_argument("--inject-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    latency = DeviceLatency(
+        shell_ms=2.0, input_ms=args.input_ms, inject_ms=args.inject_ms
+    )
+    server = FakeADBServer(load_screens(RESOURCES), latency=latency).start()
+    use_fake_server(server)
+
+    with tempfile.NamedTemporaryFile(suffix=".jar") as jar:
+        os.environ["PHONE_AGENT_INJECTOR_JAR"] = jar.name
+        start = time.perf_counter()
+        set_input_backend("injector")
+        tap(0, 0, delay=0)
+        print(f"injector start      {(time.perf_counter() - start) * 1000:8.2f} ms\n")
+
+        shell_ms, shell_events = bench(server, "shell", args.events)
+        inject_ms, inject_events = bench(server, "injector", args.events)
+        close_injector()
+
+    assert len(inject_events) == len(shell_events), "injector dropped events"
+    assert all(e.startswith("inject ") for e in inject_events), inject_events
+    print(f"speedup    {shell_ms / inject_ms:8.1f}x")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+"""
+Simulated Android devices behind a fake ADB server.
+
+The server speaks the ADB host protocol used by the "native" backend
+(`host:`, `shell:`, `exec:` and `sync:` services), so PhoneAgent runs
+unmodified against it: point $ANDROID_ADB_SERVER_PORT at the server and
+select the native backend. It also stands in for the on-device input
+injector (`localabstract:` service) once its jar is pushed and started.
+
+Each device cycles through a set of screenshots, advancing on every input
+event, records the input it receives and sleeps for configurable
+latencies to stand in for a real phone.
+"""
+
+import glob
+import hashlib
+import os
+import shlex
+import socket
+import socketserver
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.adb import injector
+from phone_agent.config.apps import APP_PACKAGES
+
+# Apps reported as focused, one per screen in turn
+FOCUSED_APPS = ["微信", "小红书", "美团", "淘宝"]
+
+
+@dataclass
+class DeviceLatency:
+    """Simulated device-side latencies in milliseconds."""
+
+    shell_ms: float = 5.0
+    screencap_ms: float = 60.0
+    input_ms: float = 10.0
+    # Per event through the input injector, which starts no process
+    inject_ms: float = 1.0
+    # Transfer rate for screenshots in MB/s (0 for unlimited)
+    bandwidth_mbps: float = 0.0
+
+
+@dataclass
+class Screen:
+    """One screen a fake device can show, pre-encoded in every capture format."""
+
+    png: bytes
+    raw: bytes
+    md5: str
+    package: str
+
+
+def load_screens(
+    pattern: str, size: tuple[int, int] | None = (1080, 2400)
+) -> list[Screen]:
+    """
+    Load screenshots to serve, resized to a phone resolution.
+
+    Args:
+        pattern: Glob of image files, e.g. "resources/*.png".
+        size: (width, height) to resize to, or None to keep the originals.
+
+    Returns:
+        Screens in file name order.
+
+    Raises:
+        FileNotFoundError: If nothing matches the pattern.
+    """
+    paths = sorted(glob.glob(pattern))
+    if not paths:
+        raise FileNotFoundError(f"No screenshots match {pattern}")
+
+    screens = []
+    for i, path in enumerate(paths):
+        img = Image.open(path).convert("RGBA")
+        if size:
+            img = img.resize(size, Image.Resampling.BILINEAR)
+        png = BytesIO()
+        img.save(png, format="PNG")
+        # `screencap` without -p: width, height, format (RGBA_8888), color space
+        raw = struct.pack("<IIII", img.width, img.height, 1, 0) + img.tobytes()
+        app = FOCUSED_APPS[i % len(FOCUSED_APPS)]
+        screens.append(
+            Screen(
+                png=png.getvalue(),
+                raw=raw,
+                md5=hashlib.md5(raw).hexdigest(),
+                package=APP_PACKAGES[app],
+            )
+        )
+    return screens
+
+
+# Injector messages with fixed-size payloads: name and struct format
+INJECTED_EVENTS = {
+    injector.MSG_TAP: ("tap", ">ii"),
+    injector.MSG_SWIPE: ("swipe", ">iiiiI"),
+    injector.MSG_KEY: ("key", ">i"),
+}
+
+
+@dataclass
+class FakeDevice:
+    """State of one simulated phone."""
+
+    serial: str
+    screens: list[Screen]
+    latency: DeviceLatency = field(default_factory=DeviceLatency)
+    index: int = 0
+    # Input commands received, e.g. "input tap 540 1200"
+    events: list[str] = field(default_factory=list)
+    files: dict[str, bytes] = field(default_factory=dict)
+    # Components started with `am start`, for cold/warm launch reports
+    launched: set[str] = field(default_factory=set)
+    # Whether the input injector was started with app_process
+    injector_running: bool = False
+    # Installed apps with a launcher icon
+    packages: list[str] = field(
+        default_factory=lambda: sorted(set(APP_PACKAGES.values()))
+    )
+
+    @property
+    def screen(self) -> Screen:
+        return self.screens[self.index % len(self.screens)]
+
+    def shell(self, command: str) -> bytes:
+        """Run a shell command and return its output."""
+        command = command.removesuffix(" 2>&1")
+        if command.startswith("screencap |"):
+            # `screencap | md5sum` from settle detection
+            self._sleep(self.latency.screencap_ms)
+            return f"{self.screen.md5}  -\n".encode()
+        if ";" in command:
+            # One round trip running several commands, e.g. the state probe
+            self._sleep(self.latency.shell_ms)
+            return b"".join(self._run(part) for part in command.split(";"))
+        self._sleep(self.latency.shell_ms)
+        return self._run(command)
+
+    def _run(self, command: str) -> bytes:
+        # Output filters (`| grep ...`) are not applied
+        args = shlex.split(command.partition("|")[0])
+        if args[:1] == ["echo"]:
+            return (" ".join(args[1:]) + "\n").encode()
+        if args[:2] == ["dumpsys", "window"]:
+            return (
+                "  mShowingLockscreen=false mDreamingLockscreen=false\n"
+                f"  mCurrentFocus=Window{{1a2b u0 {self.screen.package}/.MainActivity}}\n"
+                f"  mFocusedApp=ActivityRecord{{3c4d u0 {self.screen.package}/.MainActivity}}\n"
+            ).encode()
+        if args[:2] == ["dumpsys", "power"]:
+            return b"  Display Power: state=ON\n  mScreenOn=true\n"
+        if args[:4] == ["settings", "get", "secure", "default_input_method"]:
+            return b"com.android.adbkeyboard/.AdbIME\n"
+        if args[:1] == ["screencap"] and len(args) >= 3:
+            # `screencap -p <path>` for the pull capture mode
+            self._sleep(self.latency.screencap_ms)
+            self.files[args[-1]] = self.screen.png
+            return b""
+        if args[:3] == ["cmd", "package", "resolve-activity"]:
+            return (
+                "priority=0 preferredOrder=0 match=0x108000 specificIndex=-1\n"
+                f"{args[-1]}/.MainActivity\n"
+            ).encode()
+        if args[:3] == ["cmd", "package", "query-activities"]:
+            return "".join(
+                f"{package}/.MainActivity\n" for package in self.packages
+            ).encode()
+        if "app_process" in args and injector.SERVER_CLASS in args:
+            self.injector_running = injector.REMOTE_JAR in self.files
+            return b""
+        if args[:3] == ["am", "start", "-W"]:
+            self._sleep(self.latency.input_ms)
+            self.events.append(command)
+            component = args[-1]
+            state = "WARM" if component in self.launched else "COLD"
+            self.launched.add(component)
+            return (
+                f"Starting: Intent {{ cmp={component} }}\nStatus: ok\n"
+                f"LaunchState: {state}\nActivity: {component}\n"
+                "TotalTime: 350\nWaitTime: 360\nComplete\n"
+            ).encode()
+        if args[:1] in (["input"], ["monkey"], ["am"]):
+            self._sleep(self.latency.input_ms)
+            self.events.append(command)
+            if args[:2] != ["input", "text"] and args[:1] != ["am"]:
+                self.index += 1
+            return b""
+        return b""
+
+    def exec_out(self, command: str) -> bytes:
+        """Run a command and return its binary stdout."""
+        args = shlex.split(command)
+        if args[:1] != ["screencap"]:
+            return self.shell(command)
+        self._sleep(self.latency.screencap_ms)
+        data = self.screen.png if "-p" in args else self.screen.raw
+        self._transfer(len(data))
+        return data
+
+    def inject(self, message_type: int, payload: bytes) -> int:
+        """Apply one injector message and return its status."""
+        self._sleep(self.latency.inject_ms)
+        if message_type == injector.MSG_PING:
+            return injector.STATUS_OK
+        if message_type == injector.MSG_TEXT:
+            text = payload.decode()
+            if not text.isascii():
+                return injector.STATUS_UNSUPPORTED
+            self.events.append(f"inject text {text}")
+            return injector.STATUS_OK
+        if message_type == injector.MSG_CLEAR:
+            self.events.append("inject clear")
+            return injector.STATUS_OK
+        name, fmt = INJECTED_EVENTS[message_type]
+        fields = " ".join(str(v) for v in struct.unpack(fmt, payload))
+        self.events.append(f"inject {name} {fields}")
+        self.index += 1
+        return injector.STATUS_OK
+
+    def pull(self, path: str) -> bytes | None:
+        data = self.files.pop(path, None)
+        if data is not None:
+            self._transfer(len(data))
+        return data
+
+    def _transfer(self, size: int) -> None:
+        if self.latency.bandwidth_mbps:
+            time.sleep(size / (self.latency.bandwidth_mbps * 1024 * 1024))
+
+    @staticmethod
+    def _sleep(ms: float) -> None:
+        if ms:
+            time.sleep(ms / 1000)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """One ADB server connection: host requests, then at most one device service."""
+
+    def handle(self):
+        server: FakeADBServer = self.server.fake
+        sock: socket.socket = self.request
+        device = None
+        try:
+            while True:
+                request = self._read_request(sock)
+                if request is None:
+                    return
+                if request == "host:version":
+                    self._okay(sock, "0029")
+                    return
+                if request in ("host:devices", "host:devices-l"):
+                    listing = "".join(
+                        f"{serial}\tdevice product:bench model:Bench_Phone\n"
+                        for serial in server.devices
+                    )
+                    self._okay(sock, listing)
+                    return
+                if request.startswith("host:transport"):
+                    serial = request.partition("host:transport:")[2]
+                    device = server.get_device(serial or None)
+                    if device is None:
+                        self._fail(sock, f"device '{serial}' not found")
+                        return
+                    sock.sendall(b"OKAY")
+                    continue
+                if device is None:
+                    self._fail(sock, "no transport selected")
+                    return
+                if request.startswith("shell:"):
+                    sock.sendall(b"OKAY" + device.shell(request[6:]))
+                    return
+                if request.startswith("exec:"):
+                    sock.sendall(b"OKAY" + device.exec_out(request[5:]))
+                    return
+                if request == "sync:":
+                    sock.sendall(b"OKAY")
+                    self._sync(sock, device)
+                    return
+                if request == f"localabstract:{injector.SOCKET_NAME}":
+                    if not device.injector_running:
+                        self._fail(sock, "closed")
+                        return
+                    sock.sendall(b"OKAY")
+                    self._inject(sock, device)
+                    return
+                self._fail(sock, f"unsupported service: {request}")
+                return
+        except (ConnectionError, OSError):
+            return
+
+    def _sync(self, sock: socket.socket, device: FakeDevice) -> None:
+        while True:
+            header = _read_exact(sock, 8)
+            if header is None:
+                return
+            command, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if command == b"QUIT":
+                return
+            path = _read_exact(sock, length).decode()
+            if command == b"SEND":
+                self._receive(sock, device, path.rpartition(",")[0])
+                continue
+            data = device.pull(path)
+            if data is None:
+                message = b"No such file or directory"
+                sock.sendall(b"FAIL" + struct.pack("<I", len(message)) + message)
+                continue
+            for start in range(0, len(data), 65536):
+                chunk = data[start : start + 65536]
+                sock.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+            sock.sendall(b"DONE" + struct.pack("<I", 0))
+
+    @staticmethod
+    def _receive(sock: socket.socket, device: FakeDevice, path: str) -> None:
+        """Store a file pushed with SEND."""
+        chunks = []
+        while True:
+            header = _read_exact(sock, 8)
+            command, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if command == b"DONE":
+                break
+            chunks.append(_read_exact(sock, length))
+        device.files[path] = b"".join(chunks)
+        sock.sendall(b"OKAY" + struct.pack("<I", 0))
+
+    @staticmethod
+    def _inject(sock: socket.socket, device: FakeDevice) -> None:
+        """Speak the injector protocol, as the on-device server does."""
+        sock.sendall(injector.MAGIC + bytes([injector.PROTOCOL_VERSION]))
+        while True:
+            header = _read_exact(sock, 1)
+            if header is None:
+                return
+            message_type = header[0]
+            if message_type == injector.MSG_TEXT:
+                length = struct.unpack(">I", _read_exact(sock, 4))[0]
+                payload = _read_exact(sock, length) if length else b""
+            elif message_type in (injector.MSG_PING, injector.MSG_CLEAR):
+                payload = b""
+            elif message_type in INJECTED_EVENTS:
+                size = struct.calcsize(INJECTED_EVENTS[message_type][1])
+                payload = _read_exact(sock, size) or b""
+            else:
+                return
+            sock.sendall(bytes([device.inject(message_type, payload)]))
+
+    @staticmethod
+    def _read_request(sock: socket.socket) -> str | None:
+        length = _read_exact(sock, 4)
+        if length is None:
+            return None
+        return _read_exact(sock, int(length, 16)).decode()
+
+    @staticmethod
+    def _okay(sock: socket.socket, payload: str) -> None:
+        data = payload.encode()
+        sock.sendall(b"OKAY" + f"{len(data):04x}".encode() + data)
+
+    @staticmethod
+    def _fail(sock: socket.socket, message: str) -> None:
+        data = message.encode()
+        sock.sendall(b"FAIL" + f"{len(data):04x}".encode() + data)
+
+
+def _read_exact(sock: socket.socket, size: int) -> bytes | None:
+    buf = bytearray()
+    while len(buf) < size:
+        data = sock.recv(size - len(buf))
+        if not data:
+            return None
+        buf.extend(data)
+    return bytes(buf)
+
+
+class FakeADBServer:
+    """
+    A fake ADB server hosting simulated devices.
+
+    Args:
+        screens: Screens every device cycles through.
+        count: Number of devices, named bench-0001, bench-0002, ...
+        latency: Simulated latencies shared by all devices.
+        port: TCP port, or 0 to pick a free one.
+
+    Example:
+        >>> server = FakeADBServer(load_screens("resources/*.png")).start()
+        >>> os.environ["ANDROID_ADB_SERVER_PORT"] = str(server.port)
+    """
+
+    def __init__(
+        self,
+        screens: list[Screen],
+        count: int = 1,
+        latency: DeviceLatency | None = None,
+        port: int = 0,
+    ):
+        latency = latency or DeviceLatency()
+        self.devices = {
+            f"bench-{i + 1:04d}": FakeDevice(f"bench-{i + 1:04d}", screens, latency)
+            for i in range(count)
+        }
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def get_device(self, serial: str | None) -> FakeDevice | None:
+        if serial is None:
+            return next(iter(self.devices.values()))
+        return self.devices.get(serial)
+
+    def start(self) -> "FakeADBServer":
+        """Serve on a background thread."""
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def use_fake_server(server: FakeADBServer) -> None:
+    """Route PhoneAgent's device I/O to the fake server via the native backend."""
+    os.environ["ANDROID_ADB_SERVER_PORT"] = str(server.port)
+    os.environ["ANDROID_ADB_SERVER_ADDRESS"] = "127.0.0.1"
+
+    from phone_agent.adb.shell import set_adb_backend
+
+    set_adb_backend("native")
@@ -0,0 +1,188 @@
+"""
+A mock OpenAI-compatible model server with scripted responses.
+
+Answers `/v1/chat/completions` (streaming and not) with a `do(...)` action
+for the first steps of a task and `finish(...)` after that, emitting tokens
+at a configurable rate after a configurable time to first token. The step
+number is the count of assistant turns in the request, so the server keeps
+no per-task state.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Rough size of one token for pacing the output
+CHARS_PER_TOKEN = 4
+
+THINKING = "当前在目标应用的页面中，需要点击屏幕中间的按钮继续完成任务。"
+ACTIONS = [
+    'do(action="Launch", app="微信")',
+    'do(action="Tap", element=[500, 500])',
+    'do(action="Swipe", start=[500, 800], end=[500, 200])',
+    'do(action="Tap", element=[320, 640])',
+    'do(action="Back")',
+]
+FINISH = 'finish(message="任务已完成。")'
+
+
+@dataclass
+class ModelLatency:
+    """Simulated generation speed."""
+
+    ttft_ms: float = 300.0
+    tokens_per_second: float = 50.0
+
+
+class MockModelServer:
+    """
+    Serve scripted completions on a background thread.
+
+    Args:
+        steps_per_task: Actions returned before the finishing response.
+        latency: Simulated time to first token and token rate.
+        port: TCP port, or 0 to pick a free one.
+
+    Example:
+        >>> server = MockModelServer(steps_per_task=5).start()
+        >>> ModelConfig(base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        steps_per_task: int = 5,
+        latency: ModelLatency | None = None,
+        port: int = 0,
+    ):
+        self.steps_per_task = steps_per_task
+        self.latency = latency or ModelLatency()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def respond(self, messages: list[dict]) -> str:
+        """Scripted response for the step the conversation has reached."""
+        step = sum(1 for m in messages if m.get("role") == "assistant")
+        if step >= self.steps_per_task:
+            return f"{THINKING}\n{FINISH}"
+        return f"{THINKING}\n{ACTIONS[step % len(ACTIONS)]}"
+
+    def start(self) -> "MockModelServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json({"object": "list", "data": [{"id": "mock"}]})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length))
+                with mock._lock:
+                    mock.requests += 1
+                content = mock.respond(body.get("messages", []))
+                usage = {
+                    "prompt_tokens": len(json.dumps(body)) // CHARS_PER_TOKEN,
+                    "completion_tokens": len(content) // CHARS_PER_TOKEN,
+                }
+                usage["total_tokens"] = (
+                    usage["prompt_tokens"] + usage["completion_tokens"]
+                )
+                time.sleep(mock.latency.ttft_ms / 1000)
+                try:
+                    if body.get("stream"):
+                        self._stream(content, usage)
+                    else:
+                        self._sleep_tokens(len(content))
+                        self._send_json(_completion(content, usage))
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stops reading once the action is complete
+                    pass
+
+            def _stream(self, content: str, usage: dict) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                # One chunk per token, as a real server would send
+                for start in range(0, len(content), CHARS_PER_TOKEN):
+                    piece = content[start : start + CHARS_PER_TOKEN]
+                    if start:
+                        self._sleep_tokens(len(piece))
+                    self._event(_chunk({"content": piece}))
+                final = _chunk({}, finish_reason="stop")
+                final["usage"] = usage
+                self._event(final)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _event(self, data: dict) -> None:
+                line = "data: " + json.dumps(data, ensure_ascii=False) + "\n\n"
+                self.wfile.write(line.encode("utf-8"))
+                self.wfile.flush()
+
+            def _send_json(self, data: dict) -> None:
+                payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            @staticmethod
+            def _sleep_tokens(chars: int) -> None:
+                if mock.latency.tokens_per_second:
+                    tokens = max(1, chars // CHARS_PER_TOKEN)
+                    time.sleep(tokens / mock.latency.tokens_per_second)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _completion(content: str, usage: dict) -> dict:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "mock",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": usage,
+    }
+
+
+def _chunk(delta: dict, finish_reason: str | None = None) -> dict:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "mock",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
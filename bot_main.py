@@ -1,3 +1,5 @@
+import asyncio
+import dataclasses
 import logging
 from telegram import Update
 from telegram.ext import (
@@ -9,9 +11,13 @@ from telegram.ext import (
     filters
 )
 
+from phone_agent.adb import set_adb_backend, set_input_backend
 from phone_agent.config.bot_config import BotConfig
 from phone_agent.interfaces.telegram import TelegramInterface
 from phone_agent.interfaces.task_runner import TaskRunner
+from phone_agent.model import AsyncModelClient
+from phone_agent.metrics import start_metrics_server, track_scheduler
+from phone_agent.scheduler import DeviceScheduler
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -21,6 +27,7 @@ logger = logging.getLogger(__name__)
 
 config = BotConfig()
 active_tasks = {}
+scheduler = None
 
 
 def check_auth(func):
@@ -65,14 +72,29 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     from phone_agent.adb import list_devices
 
     try:
-        devices = list_devices()
+        devices = await asyncio.to_thread(list_devices)
         if not devices:
             await update.message.reply_text("No devices connected")
             return
 
-        device_info = "\n".join([
-            f"• {d.device_id} ({d.status})" for d in devices
-        ])
+        stats = scheduler.utilization() if scheduler else {}
+        lines = []
+        for d in devices:
+            line = f"• {d.device_id} ({d.status})"
+            if d.device_id in stats:
+                s = stats[d.device_id]
+                state = f"busy: {s.owner}" if s.busy else "idle"
+                line += f" - {state}, {s.tasks_completed} tasks, {s.utilization:.0%} utilized"
+            lines.append(line)
+        if scheduler and scheduler.queue_length:
+            lines.append(f"\n{scheduler.queue_length} task(s) waiting for a device")
+        batch_stats = AsyncModelClient(config.model_config).batch_stats
+        if batch_stats and batch_stats.batches:
+            lines.append(
+                f"Model requests: {batch_stats.requests} in {batch_stats.batches} "
+                f"batches (mean size {batch_stats.mean_batch_size:.1f})"
+            )
+        device_info = "\n".join(lines)
         await update.message.reply_text(
             f"*Connected Devices:*\n\n{device_info}",
             parse_mode='Markdown'
@@ -98,14 +120,26 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     active_tasks[chat_id] = interface
 
     try:
-        runner = TaskRunner(
-            interface=interface,
-            model_config=config.model_config,
-            agent_config=config.agent_config
-        )
-
-        result = await runner.run_task(task)
-        logger.info(f"Task completed: {result}")
+        if scheduler.idle_count == 0:
+            await scheduler.arefresh()
+        if scheduler.idle_count == 0:
+            await interface.send_message(
+                f"All devices are busy, waiting for a free one "
+                f"({scheduler.queue_length + 1} in queue)"
+            )
+
+        async with scheduler.lease(owner=str(chat_id)) as lease:
+            logger.info(f"Running task for chat {chat_id} on {lease.device_id}")
+            runner = TaskRunner(
+                interface=interface,
+                model_config=config.model_config,
+                agent_config=dataclasses.replace(
+                    config.agent_config, device_id=lease.device_id
+                )
+            )
+
+            result = await runner.run_task(task)
+            logger.info(f"Task completed: {result}")
 
     except Exception as e:
         logger.error(f"Task error: {e}", exc_info=True)
@@ -138,8 +172,25 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
 
 
 def main():
+    global scheduler
+
     try:
-        application = Application.builder().token(config.token).build()
+        set_adb_backend(config.adb_backend)
+        set_input_backend(config.input_backend)
+
+        # One task per device at a time; tasks from different chats run in parallel
+        scheduler = DeviceScheduler(config.device_ids)
+        logger.info(f"Scheduling tasks on devices: {scheduler.device_ids}")
+
+        if config.metrics_port:
+            start_metrics_server(config.metrics_port, config.metrics_host)
+            track_scheduler(scheduler)
+            logger.info(f"Serving metrics on http://{config.metrics_host}:{config.metrics_port}/metrics")
+
+        application = Application.builder() \
+            .token(config.token) \
+            .concurrent_updates(True) \
+            .build()
 
         application.add_handler(CommandHandler("start", start_command))
         application.add_handler(CommandHandler("cancel", cancel_command))
@@ -0,0 +1,25 @@
+#!/bin/sh
+# Build the on-device input injector used by `--input-backend injector`.
+#
+# Needs a JDK (11+) and an Android SDK with a platform and build-tools
+# installed. Writes injector/build/open-autoglm-injector.jar, where
+# phone_agent/adb/injector.py looks for it; the agent pushes it to the device.
+#
+# Usage: ANDROID_HOME=~/Android/Sdk injector/build.sh
+set -e
+
+cd "$(dirname "$0")"
+SDK="${ANDROID_HOME:-${ANDROID_SDK_ROOT:?Set ANDROID_HOME to the Android SDK}}"
+PLATFORM="${ANDROID_PLATFORM:-$(ls "$SDK/platforms" | sort -V | tail -n 1)}"
+BUILD_TOOLS="${ANDROID_BUILD_TOOLS:-$(ls "$SDK/build-tools" | sort -V | tail -n 1)}"
+ANDROID_JAR="$SDK/platforms/$PLATFORM/android.jar"
+
+rm -rf build
+mkdir -p build/classes
+javac --release 11 -classpath "$ANDROID_JAR" -d build/classes \
+    $(find src -name '*.java')
+"$SDK/build-tools/$BUILD_TOOLS/d8" --min-api 21 --lib "$ANDROID_JAR" \
+    --output build/open-autoglm-injector.jar \
+    $(find build/classes -name '*.class')
+
+echo "Built $(pwd)/build/open-autoglm-injector.jar"
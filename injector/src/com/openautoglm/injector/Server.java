@@ -0,0 +1,264 @@
+package com.openautoglm.injector;
+
+import android.net.LocalServerSocket;
+import android.net.LocalSocket;
+import android.os.SystemClock;
+import android.view.InputDevice;
+import android.view.InputEvent;
+import android.view.KeyCharacterMap;
+import android.view.KeyEvent;
+import android.view.MotionEvent;
+
+import java.io.DataInputStream;
+import java.io.EOFException;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
+import java.util.concurrent.atomic.AtomicInteger;
+
+/**
+ * Long-lived input injection server, started on the device with app_process.
+ *
+ * <p>Listens on an abstract UNIX socket and injects the tap, swipe, key and text events
+ * it receives straight into the input manager, so each event costs a socket round trip
+ * instead of a JVM start for every `input` command. The host side and the message
+ * layout are in phone_agent/adb/injector.py; both must change together.
+ *
+ * <p>Usage: CLASSPATH=/data/local/tmp/open-autoglm-injector.jar app_process /
+ * com.openautoglm.injector.Server SOCKET_NAME
+ */
+public final class Server {
+
+    private static final byte[] MAGIC = {'O', 'A', 'G', 'I'};
+    private static final int PROTOCOL_VERSION = 3;
+
+    private static final int MSG_PING = 0;
+    private static final int MSG_TAP = 1;
+    private static final int MSG_SWIPE = 2;
+    private static final int MSG_KEY = 3;
+    private static final int MSG_TEXT = 4;
+    private static final int MSG_CLEAR = 5;
+
+    private static final int STATUS_OK = 0;
+    private static final int STATUS_UNSUPPORTED = 1;
+    private static final int STATUS_ERROR = 2;
+    private static final int STATUS_PARTIAL = 3;
+
+    // InputManager.INJECT_INPUT_EVENT_MODE_*
+    private static final int MODE_ASYNC = 0;
+    private static final int MODE_WAIT_FOR_FINISH = 2;
+
+    // Interval between move events of a swipe, as a 120 Hz touchscreen reports them
+    private static final long MOVE_INTERVAL_MS = 8;
+    // Exit when no client has been connected for this long
+    private static final long IDLE_TIMEOUT_MS = 10 * 60 * 1000;
+    // Reject text messages larger than this instead of allocating for them
+    private static final int MAX_TEXT_BYTES = 1 << 20;
+
+    private static final AtomicInteger clients = new AtomicInteger();
+    private static volatile long lastActive = SystemClock.uptimeMillis();
+
+    private Server() {}
+
+    public static void main(String[] args) throws Exception {
+        String name = args.length > 0 ? args[0] : "open-autoglm-injector-" + PROTOCOL_VERSION;
+        Injector injector = new Injector();
+        // Fails if another server already owns the name, which is what we want
+        LocalServerSocket server = new LocalServerSocket(name);
+        startIdleWatchdog();
+
+        while (true) {
+            LocalSocket socket = server.accept();
+            clients.incrementAndGet();
+            Thread thread = new Thread(() -> serve(socket, injector), "injector-client");
+            thread.setDaemon(true);
+            thread.start();
+        }
+    }
+
+    private static void serve(LocalSocket socket, Injector injector) {
+        try (LocalSocket s = socket) {
+            DataInputStream in = new DataInputStream(s.getInputStream());
+            OutputStream out = s.getOutputStream();
+            out.write(MAGIC);
+            out.write(PROTOCOL_VERSION);
+            out.flush();
+
+            while (true) {
+                int type = in.read();
+                if (type < 0) {
+                    return;
+                }
+                out.write(handle(type, in, injector));
+                out.flush();
+            }
+        } catch (IOException e) {
+            // Client went away
+        } finally {
+            lastActive = SystemClock.uptimeMillis();
+            clients.decrementAndGet();
+        }
+    }
+
+    /** Reads the rest of one message, injects it and returns its status. */
+    private static int handle(int type, DataInputStream in, Injector injector)
+            throws IOException {
+        switch (type) {
+            case MSG_PING:
+                return STATUS_OK;
+            case MSG_TAP: {
+                int x = in.readInt();
+                int y = in.readInt();
+                return status(injector.swipe(x, y, x, y, 0));
+            }
+            case MSG_SWIPE: {
+                int x1 = in.readInt();
+                int y1 = in.readInt();
+                int x2 = in.readInt();
+                int y2 = in.readInt();
+                long duration = in.readInt() & 0xffffffffL;
+                return status(injector.swipe(x1, y1, x2, y2, duration));
+            }
+            case MSG_KEY:
+                return status(injector.key(in.readInt()));
+            case MSG_TEXT: {
+                int length = in.readInt();
+                if (length < 0 || length > MAX_TEXT_BYTES) {
+                    throw new IOException("Text message too large: " + length);
+                }
+                byte[] data = new byte[length];
+                in.readFully(data);
+                return injector.text(new String(data, StandardCharsets.UTF_8));
+            }
+            case MSG_CLEAR:
+                return status(injector.clear());
+            default:
+                // The length of an unknown message is unknown, so the stream is lost
+                throw new EOFException("Unknown message type " + type);
+        }
+    }
+
+    private static int status(boolean injected) {
+        return injected ? STATUS_OK : STATUS_ERROR;
+    }
+
+    private static void startIdleWatchdog() {
+        Thread thread = new Thread(() -> {
+            while (true) {
+                SystemClock.sleep(30_000);
+                if (clients.get() == 0
+                        && SystemClock.uptimeMillis() - lastActive > IDLE_TIMEOUT_MS) {
+                    System.exit(0);
+                }
+            }
+        }, "injector-watchdog");
+        thread.setDaemon(true);
+        thread.start();
+    }
+
+    /** Injects events through the hidden InputManager API, as `input` itself does. */
+    private static final class Injector {
+
+        private final Object manager;
+        private final Method injectInputEvent;
+        private final KeyCharacterMap charMap =
+                KeyCharacterMap.load(KeyCharacterMap.VIRTUAL_KEYBOARD);
+
+        Injector() throws ReflectiveOperationException {
+            Class<?> cls;
+            try {
+                // Android 14 moved the singleton out of InputManager
+                cls = Class.forName("android.hardware.input.InputManagerGlobal");
+            } catch (ClassNotFoundException e) {
+                cls = Class.forName("android.hardware.input.InputManager");
+            }
+            manager = cls.getDeclaredMethod("getInstance").invoke(null);
+            injectInputEvent = cls.getMethod("injectInputEvent", InputEvent.class, int.class);
+        }
+
+        /** Touches down at (x1, y1), moves to (x2, y2) over the duration and lifts. */
+        synchronized boolean swipe(int x1, int y1, int x2, int y2, long durationMs) {
+            long downTime = SystemClock.uptimeMillis();
+            if (!touch(downTime, downTime, MotionEvent.ACTION_DOWN, x1, y1, MODE_WAIT_FOR_FINISH)) {
+                return false;
+            }
+
+            long now = downTime;
+            long endTime = downTime + durationMs;
+            while (now < endTime) {
+                SystemClock.sleep(Math.min(MOVE_INTERVAL_MS, endTime - now));
+                now = SystemClock.uptimeMillis();
+                float alpha = Math.min(1f, (float) (now - downTime) / durationMs);
+                float x = x1 + (x2 - x1) * alpha;
+                float y = y1 + (y2 - y1) * alpha;
+                touch(downTime, now, MotionEvent.ACTION_MOVE, x, y, MODE_ASYNC);
+            }
+            return touch(downTime, SystemClock.uptimeMillis(), MotionEvent.ACTION_UP, x2, y2,
+                    MODE_WAIT_FOR_FINISH);
+        }
+
+        synchronized boolean key(int keyCode) {
+            long now = SystemClock.uptimeMillis();
+            return key(now, KeyEvent.ACTION_DOWN, keyCode) && key(now, KeyEvent.ACTION_UP, keyCode);
+        }
+
+        /** Selects all text in the focused field with Ctrl+A and deletes it. */
+        synchronized boolean clear() {
+            long now = SystemClock.uptimeMillis();
+            int meta = KeyEvent.META_CTRL_ON | KeyEvent.META_CTRL_LEFT_ON;
+            return key(now, KeyEvent.ACTION_DOWN, KeyEvent.KEYCODE_A, meta)
+                    && key(now, KeyEvent.ACTION_UP, KeyEvent.KEYCODE_A, meta)
+                    && key(KeyEvent.KEYCODE_DEL);
+        }
+
+        /**
+         * Types text as key events. Every character is mapped to keys before any is typed,
+         * so nothing is typed if one has no key; a failure after the first event is
+         * reported as partial, since the client must not type the text again.
+         */
+        synchronized int text(String text) {
+            KeyEvent[] events = charMap.getEvents(text.toCharArray());
+            if (events == null) {
+                return STATUS_UNSUPPORTED;
+            }
+            for (int i = 0; i < events.length; i++) {
+                if (!inject(events[i], MODE_WAIT_FOR_FINISH)) {
+                    return i == 0 ? STATUS_ERROR : STATUS_PARTIAL;
+                }
+            }
+            return STATUS_OK;
+        }
+
+        private boolean touch(long downTime, long eventTime, int action, float x, float y,
+                int mode) {
+            MotionEvent event = MotionEvent.obtain(
+                    downTime, eventTime, action, x, y, 1f, 1f, 0, 1f, 1f, 0, 0);
+            event.setSource(InputDevice.SOURCE_TOUCHSCREEN);
+            try {
+                return inject(event, mode);
+            } finally {
+                event.recycle();
+            }
+        }
+
+        private boolean key(long time, int action, int keyCode) {
+            return key(time, action, keyCode, 0);
+        }
+
+        private boolean key(long time, int action, int keyCode, int metaState) {
+            KeyEvent event = new KeyEvent(time, time, action, keyCode, 0, metaState,
+                    KeyCharacterMap.VIRTUAL_KEYBOARD, 0, 0, InputDevice.SOURCE_KEYBOARD);
+            return inject(event, MODE_WAIT_FOR_FINISH);
+        }
+
+        private boolean inject(InputEvent event, int mode) {
+            try {
+                return (Boolean) injectInputEvent.invoke(manager, event, mode);
+            } catch (ReflectiveOperationException | RuntimeException e) {
+                System.err.println("Injection failed: " + e);
+                return false;
+            }
+        }
+    }
+}
@@ -1,13 +1,17 @@
 import asyncio
+import dataclasses
 import json
 import logging
 from typing import Dict
 
 import lark_oapi as lark
 
+from phone_agent.adb import set_adb_backend, set_input_backend
 from phone_agent.config.bot_config import BotConfig
 from phone_agent.interfaces.lark import LarkInterface
 from phone_agent.interfaces.task_runner import TaskRunner
+from phone_agent.metrics import start_metrics_server, track_scheduler
+from phone_agent.scheduler import DeviceScheduler
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -23,6 +27,7 @@ client = lark.Client.builder() \
     .build()
 
 active_tasks: Dict[str, LarkInterface] = {}
+scheduler: DeviceScheduler = None
 
 
 def check_lark_auth(user_id: str) -> bool:
@@ -76,14 +81,25 @@ async def handle_message_event(data: lark.im.v1.P2ImMessageReceiveV1):
         active_tasks[user_id] = interface
 
         try:
-            runner = TaskRunner(
-                interface=interface,
-                model_config=config.model_config,
-                agent_config=config.agent_config
-            )
-
-            result = await runner.run_task(text)
-            logger.info(f"Task completed for user {user_id}: {result}")
+            if scheduler.idle_count == 0:
+                await scheduler.arefresh()
+            if scheduler.idle_count == 0:
+                await interface.send_message(
+                    f"所有设备都在忙，正在排队等待空闲设备（队列中第 {scheduler.queue_length + 1} 位）"
+                )
+
+            async with scheduler.lease(owner=user_id) as lease:
+                logger.info(f"Running task for user {user_id} on {lease.device_id}")
+                runner = TaskRunner(
+                    interface=interface,
+                    model_config=config.model_config,
+                    agent_config=dataclasses.replace(
+                        config.agent_config, device_id=lease.device_id
+                    )
+                )
+
+                result = await runner.run_task(text)
+                logger.info(f"Task completed for user {user_id}: {result}")
 
         except Exception as e:
             logger.error(f"Task error for user {user_id}: {e}", exc_info=True)
@@ -137,10 +153,24 @@ async def handle_card_action_event(data: lark.CustomizedEvent):
 
 
 def main():
+    global scheduler
+
     logger.info("Starting Lark bot with long connection...")
     logger.info(f"App ID: {config.lark_app_id}")
     logger.info(f"Allowed users: {config.lark_allowed_users}")
 
+    set_adb_backend(config.adb_backend)
+    set_input_backend(config.input_backend)
+
+    # One task per device at a time; tasks from different users run in parallel
+    scheduler = DeviceScheduler(config.device_ids)
+    logger.info(f"Scheduling tasks on devices: {scheduler.device_ids}")
+
+    if config.metrics_port:
+        start_metrics_server(config.metrics_port, config.metrics_host)
+        track_scheduler(scheduler)
+        logger.info(f"Serving metrics on http://{config.metrics_host}:{config.metrics_port}/metrics")
+
     event_handler = lark.EventDispatcherHandler.builder("", "") \
         .register_p2_im_message_receive_v1(do_p2_im_message_receive_v1) \
         .register_p1_customized_event("card.action.trigger", do_card_action_event) \
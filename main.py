@@ -11,6 +11,10 @@ Environment Variables:
     PHONE_AGENT_API_KEY: API key for model authentication (default: EMPTY)
     PHONE_AGENT_MAX_STEPS: Maximum steps per task (default: 100)
     PHONE_AGENT_DEVICE_ID: ADB device ID for multi-device setups
+    PHONE_AGENT_ADB_BACKEND: ADB backend, "adb" or "native" (default: adb)
+    PHONE_AGENT_IMAGE_FORMAT: Screenshot format sent to the model (default: png)
+    PHONE_AGENT_IMAGE_QUALITY: Quality for jpeg/webp screenshots (default: 85)
+    PHONE_AGENT_IMAGE_MAX_EDGE: Max long edge of screenshots sent to the model
 """
 
 import argparse
@@ -23,10 +27,16 @@ from urllib.parse import urlparse
 from openai import OpenAI
 
 from phone_agent import PhoneAgent
-from phone_agent.adb import ADBConnection, list_devices
+from phone_agent.adb import (
+    ADBConnection,
+    list_devices,
+    set_adb_backend,
+    set_input_backend,
+)
+from phone_agent.adb.settle import SettleConfig
 from phone_agent.agent import AgentConfig
 from phone_agent.config.apps import list_supported_apps
-from phone_agent.model import ModelConfig
+from phone_agent.model import ContextPolicy, ModelConfig
 
 
 def check_system_requirements() -> bool:
@@ -288,7 +298,23 @@ Examples:
         "--base-url",
         type=str,
         default=os.getenv("PHONE_AGENT_BASE_URL", "http://localhost:8000/v1"),
-        help="Model API base URL",
+        help="Model API base URL; separate several replicas with commas",
+    )
+
+    parser.add_argument(
+        "--load-balancing",
+        type=str,
+        choices=["least_outstanding", "latency"],
+        default="least_outstanding",
+        help="How requests are spread across several base URLs",
+    )
+
+    parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        help="With several base URLs, resend a request to another replica once "
+        "it has run longer than this latency percentile (e.g. 0.95); "
+        "needs --stream",
     )
 
     parser.add_argument(
@@ -305,6 +331,38 @@ Examples:
         help="API key for model authentication",
     )
 
+    parser.add_argument(
+        "--image-format",
+        type=str,
+        choices=["png", "jpeg", "webp"],
+        default=os.getenv("PHONE_AGENT_IMAGE_FORMAT", "png"),
+        help="Screenshot format sent to the model",
+    )
+
+    parser.add_argument(
+        "--image-quality",
+        type=int,
+        default=int(os.getenv("PHONE_AGENT_IMAGE_QUALITY", "85")),
+        help="Encoder quality for jpeg/webp screenshots",
+    )
+
+    parser.add_argument(
+        "--image-max-edge",
+        type=int,
+        default=(
+            int(os.environ["PHONE_AGENT_IMAGE_MAX_EDGE"])
+            if os.getenv("PHONE_AGENT_IMAGE_MAX_EDGE")
+            else None
+        ),
+        help="Downscale screenshots so the longer side is at most this many pixels",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream model output and execute the action as soon as it is complete",
+    )
+
     parser.add_argument(
         "--max-steps",
         type=int,
@@ -338,6 +396,25 @@ Examples:
         help="Disconnect from remote device (or 'all' to disconnect all)",
     )
 
+    parser.add_argument(
+        "--adb-backend",
+        type=str,
+        choices=["adb", "native"],
+        default=os.getenv("PHONE_AGENT_ADB_BACKEND", "adb"),
+        help="How to reach the ADB server: persistent adb shell sessions (adb) "
+        "or the built-in wire-protocol client (native)",
+    )
+
+    parser.add_argument(
+        "--input-backend",
+        type=str,
+        choices=["shell", "injector"],
+        default=os.getenv("PHONE_AGENT_INPUT_BACKEND", "shell"),
+        help="How to send taps, swipes, keys and text: an input command per "
+        "event (shell) or a persistent on-device server built with "
+        "injector/build.sh (injector)",
+    )
+
     parser.add_argument(
         "--list-devices", action="store_true", help="List connected devices and exit"
     )
@@ -360,6 +437,81 @@ Examples:
         "--list-apps", action="store_true", help="List supported apps and exit"
     )
 
+    parser.add_argument(
+        "--adaptive-settle",
+        action="store_true",
+        help="Wait until the screen stops changing after actions instead of fixed delays",
+    )
+
+    parser.add_argument(
+        "--max-context-turns",
+        type=int,
+        default=None,
+        metavar="K",
+        help="Send only the last K steps verbatim; older steps are summarized",
+    )
+
+    parser.add_argument(
+        "--max-context-tokens",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Summarize older steps until the estimated prompt fits N tokens",
+    )
+
+    parser.add_argument(
+        "--keep-thinking-turns",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Keep the model's thinking text only in the last N responses",
+    )
+
+    parser.add_argument(
+        "--prompt-layout",
+        type=str,
+        choices=["default", "prefix_cache"],
+        default="default",
+        help="Message layout; prefix_cache keeps requests append-only so "
+        "vLLM/SGLang automatic prefix caching can reuse earlier steps",
+    )
+
+    parser.add_argument(
+        "--trajectory-cache",
+        type=str,
+        metavar="PATH",
+        help="JSON file of solved tasks; repeated tasks replay matching steps "
+        "from it without calling the model",
+    )
+
+    parser.add_argument(
+        "--app-catalog",
+        type=str,
+        metavar="PATH",
+        help="JSON file caching the apps installed on each device, so Launch "
+        "finds apps missing from the built-in list and fuzzy app names",
+    )
+
+    parser.add_argument(
+        "--trace-file",
+        type=str,
+        metavar="PATH",
+        help="Append per-step latency breakdowns to this JSONL file",
+    )
+
+    parser.add_argument(
+        "--screen-tracking",
+        action="store_true",
+        help="Hash every screen to flag actions that changed nothing and "
+        "screens revisited in a loop",
+    )
+
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Capture the next observation concurrently with step bookkeeping",
+    )
+
     parser.add_argument(
         "--lang",
         type=str,
@@ -448,9 +600,26 @@ def handle_device_commands(args) -> bool:
     return False
 
 
+def build_context_policy(args) -> ContextPolicy | None:
+    """Build the context policy from command line arguments, if any is set."""
+    if (
+        args.max_context_turns is None
+        and args.max_context_tokens is None
+        and args.keep_thinking_turns is None
+    ):
+        return None
+    return ContextPolicy(
+        max_turns=args.max_context_turns,
+        max_prompt_tokens=args.max_context_tokens,
+        keep_thinking_turns=args.keep_thinking_turns,
+    )
+
+
 def main():
     """Main entry point."""
     args = parse_args()
+    set_adb_backend(args.adb_backend)
+    set_input_backend(args.input_backend)
 
     # Handle --list-apps (no system check needed)
     if args.list_apps:
@@ -467,15 +636,25 @@ def main():
     if not check_system_requirements():
         sys.exit(1)
 
+    base_urls = [url.strip() for url in args.base_url.split(",") if url.strip()]
+
     # Check model API connectivity and model availability
-    if not check_model_api(args.base_url, args.model, args.apikey):
-        sys.exit(1)
+    for base_url in base_urls:
+        if not check_model_api(base_url, args.model, args.apikey):
+            sys.exit(1)
 
     # Create configurations
     model_config = ModelConfig(
-        base_url=args.base_url,
+        base_url=base_urls[0],
+        base_urls=base_urls if len(base_urls) > 1 else [],
+        load_balancing=args.load_balancing,
+        hedge_percentile=args.hedge_percentile,
         model_name=args.model,
         api_key=args.apikey,
+        image_format=args.image_format,
+        image_quality=args.image_quality,
+        image_max_long_edge=args.image_max_edge,
+        stream=args.stream,
     )
 
     agent_config = AgentConfig(
@@ -483,6 +662,14 @@ def main():
         device_id=args.device_id,
         verbose=not args.quiet,
         lang=args.lang,
+        pipelined=args.pipelined,
+        screen_tracking=args.screen_tracking,
+        settle_config=SettleConfig() if args.adaptive_settle else None,
+        context_policy=build_context_policy(args),
+        prompt_layout=args.prompt_layout,
+        trajectory_cache=args.trajectory_cache,
+        app_catalog=args.app_catalog,
+        trace_file=args.trace_file,
     )
 
     # Create agent
@@ -496,7 +683,7 @@ def main():
     print("Phone Agent - AI-powered phone automation")
     print("=" * 50)
     print(f"Model: {model_config.model_name}")
-    print(f"Base URL: {model_config.base_url}")
+    print(f"Base URL: {', '.join(model_config.endpoint_urls)}")
     print(f"Max Steps: {agent_config.max_steps}")
     print(f"Language: {agent_config.lang}")
 
@@ -1,5 +1,16 @@
 """Action handling module for Phone Agent."""
 
 from phone_agent.actions.handler import ActionHandler, ActionResult
+from phone_agent.actions.parser import (
+    ActionParseError,
+    ParsedAction,
+    parse_action_call,
+)
 
-__all__ = ["ActionHandler", "ActionResult"]
+__all__ = [
+    "ActionHandler",
+    "ActionParseError",
+    "ActionResult",
+    "ParsedAction",
+    "parse_action_call",
+]
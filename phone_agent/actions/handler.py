@@ -4,19 +4,24 @@ import time
 from dataclasses import dataclass
 from typing import Any, Callable
 
+from phone_agent.actions.parser import ActionParseError, parse_action_call
 from phone_agent.adb import (
     back,
     clear_text,
     detect_and_set_adb_keyboard,
     double_tap,
     home,
-    launch_app,
+    launch_package,
     long_press,
     restore_keyboard,
     swipe,
     tap,
     type_text,
 )
+from phone_agent.adb.app_catalog import AppCatalog
+from phone_agent.adb.settle import SettleConfig, wait_for_settle
+from phone_agent.config.apps import APP_PACKAGES
+from phone_agent.timing import span
 
 
 @dataclass
@@ -38,6 +43,13 @@ class ActionHandler:
         confirmation_callback: Optional callback for sensitive action confirmation.
             Should return True to proceed, False to cancel.
         takeover_callback: Optional callback for takeover requests (login, captcha).
+        settle_config: Optional adaptive settle detection. When None, fixed
+            delays are used after each action.
+        app_catalog: Optional catalog of apps installed on the device, used
+            to launch apps missing from APP_PACKAGES and fuzzy app names.
+        on_stable: Optional callback passed to wait_for_settle(): called with
+            True when the screen stops changing after an action and with
+            False if it changes again.
     """
 
     def __init__(
@@ -45,10 +57,16 @@ class ActionHandler:
         device_id: str | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        settle_config: SettleConfig | None = None,
+        app_catalog: AppCatalog | None = None,
+        on_stable: Callable[[bool], None] | None = None,
     ):
         self.device_id = device_id
         self.confirmation_callback = confirmation_callback or self._default_confirmation
         self.takeover_callback = takeover_callback or self._default_takeover
+        self.settle_config = settle_config
+        self.app_catalog = app_catalog
+        self.on_stable = on_stable
 
     def execute(
         self, action: dict[str, Any], screen_width: int, screen_height: int
@@ -129,10 +147,24 @@ class ActionHandler:
         if not app_name:
             return ActionResult(False, False, "No app name specified")
 
-        success = launch_app(app_name, self.device_id)
-        if success:
-            return ActionResult(True, False)
-        return ActionResult(False, False, f"App not found: {app_name}")
+        package = None
+        if self.app_catalog is not None:
+            package = self.app_catalog.find(app_name, self.device_id)
+        if package is None:
+            package = APP_PACKAGES.get(app_name)
+        if package is None:
+            return ActionResult(False, False, f"App not found: {app_name}")
+
+        result = launch_package(package, self.device_id)
+        if not result.success:
+            if self.app_catalog is not None:
+                self.app_catalog.forget(package, self.device_id)
+            return ActionResult(False, False, f"Failed to launch: {app_name}")
+        # `am start -W` returned once the app was drawn; a cold start may
+        # still be showing its splash screen, so only that waits further
+        if not result.drawn or result.launch_state == "COLD":
+            self._wait(1.0)
+        return ActionResult(True, False)
 
     def _handle_tap(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle tap action."""
@@ -151,7 +183,8 @@ class ActionHandler:
                     message="User cancelled sensitive operation",
                 )
 
-        tap(x, y, self.device_id)
+        tap(x, y, self.device_id, delay=0)
+        self._wait(1.0)
         return ActionResult(True, False)
 
     def _handle_type(self, action: dict, width: int, height: int) -> ActionResult:
@@ -160,18 +193,18 @@ class ActionHandler:
 
         # Switch to ADB keyboard
         original_ime = detect_and_set_adb_keyboard(self.device_id)
-        time.sleep(1.0)
+        self._wait(1.0, ceiling_ms=1000)
 
         # Clear existing text and type new text
         clear_text(self.device_id)
-        time.sleep(1.0)
+        self._wait(1.0, ceiling_ms=1000)
 
         type_text(text, self.device_id)
-        time.sleep(1.0)
+        self._wait(1.0, ceiling_ms=1000)
 
         # Restore original keyboard
         restore_keyboard(original_ime, self.device_id)
-        time.sleep(1.0)
+        self._wait(1.0, ceiling_ms=1000)
 
         return ActionResult(True, False)
 
@@ -186,17 +219,20 @@ class ActionHandler:
         start_x, start_y = self._convert_relative_to_absolute(start, width, height)
         end_x, end_y = self._convert_relative_to_absolute(end, width, height)
 
-        swipe(start_x, start_y, end_x, end_y, device_id=self.device_id)
+        swipe(start_x, start_y, end_x, end_y, device_id=self.device_id, delay=0)
+        self._wait(1.0)
         return ActionResult(True, False)
 
     def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle back button action."""
-        back(self.device_id)
+        back(self.device_id, delay=0)
+        self._wait(1.0)
         return ActionResult(True, False)
 
     def _handle_home(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle home button action."""
-        home(self.device_id)
+        home(self.device_id, delay=0)
+        self._wait(1.0)
         return ActionResult(True, False)
 
     def _handle_double_tap(self, action: dict, width: int, height: int) -> ActionResult:
@@ -206,7 +242,8 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        double_tap(x, y, self.device_id)
+        double_tap(x, y, self.device_id, delay=0)
+        self._wait(1.0)
         return ActionResult(True, False)
 
     def _handle_long_press(self, action: dict, width: int, height: int) -> ActionResult:
@@ -216,7 +253,8 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        long_press(x, y, device_id=self.device_id)
+        long_press(x, y, device_id=self.device_id, delay=0)
+        self._wait(1.0)
         return ActionResult(True, False)
 
     def _handle_wait(self, action: dict, width: int, height: int) -> ActionResult:
@@ -253,6 +291,35 @@ class ActionHandler:
         # This action signals that user input is needed
         return ActionResult(True, False, message="User interaction required")
 
+    def _wait(self, delay: float, ceiling_ms: int | None = None) -> None:
+        """
+        Wait for the screen to settle after an action.
+
+        Args:
+            delay: Fixed delay in seconds used when settle detection is off or
+                unavailable. The adaptive wait never exceeds it.
+            ceiling_ms: Optional cap on the adaptive wait, overriding the
+                configured timeout.
+        """
+        if self.on_stable is not None:
+            # A capture from an earlier wait of this action predates it
+            self.on_stable(False)
+        with span("settle"):
+            if self.settle_config is None or not self.settle_config.enabled:
+                time.sleep(delay)
+                return
+            ceiling_ms = min(
+                ceiling_ms if ceiling_ms is not None else self.settle_config.timeout_ms,
+                int(delay * 1000),
+            )
+            wait_for_settle(
+                self.device_id,
+                self.settle_config,
+                ceiling_ms,
+                fallback_delay=delay,
+                on_stable=self.on_stable,
+            )
+
     @staticmethod
     def _default_confirmation(message: str) -> bool:
         """Default confirmation callback using console input."""
@@ -269,6 +336,9 @@ def parse_action(response: str) -> dict[str, Any]:
     """
     Parse action from model response.
 
+    The response is parsed by a dedicated grammar, never evaluated, so
+    injected code in model output cannot run.
+
     Args:
         response: Raw response string from the model.
 
@@ -279,20 +349,9 @@ def parse_action(response: str) -> dict[str, Any]:
         ValueError: If the response cannot be parsed.
     """
     try:
-        # Try to evaluate as Python dict/function call
-        response = response.strip()
-        if response.startswith("do"):
-            action = eval(response)
-        elif response.startswith("finish"):
-            action = {
-                "_metadata": "finish",
-                "message": response.replace("finish(message=", "")[1:-2],
-            }
-        else:
-            raise ValueError(f"Failed to parse action: {response}")
-        return action
-    except Exception as e:
-        raise ValueError(f"Failed to parse action: {e}")
+        return parse_action_call(response).to_dict()
+    except ActionParseError as e:
+        raise ValueError(f"Failed to parse action: {e}") from e
 
 
 def do(**kwargs) -> dict[str, Any]:
@@ -0,0 +1,288 @@
+"""
+Safe parser for the do(...)/finish(...) action grammar emitted by the model.
+
+Common calls take a regex fast path; on the recorded responses in
+benchmarks/bench_action_parser.py that is about 3.3 us per call against
+12.5 us for the eval() it replaced (roughly 3-4x, varying between runs).
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+# Action names understood by ActionHandler
+KNOWN_ACTIONS = frozenset(
+    {
+        "Launch",
+        "Tap",
+        "Type",
+        "Type_Name",
+        "Swipe",
+        "Back",
+        "Home",
+        "Double Tap",
+        "Long Press",
+        "Wait",
+        "Take_over",
+        "Note",
+        "Call_API",
+        "Interact",
+    }
+)
+
+# Arguments holding relative [x, y] coordinates on the 0-1000 grid
+COORDINATE_ARGS = frozenset({"element", "start", "end"})
+STRING_ARGS = frozenset({"action", "app", "text", "message", "duration", "instruction"})
+
+_CONSTANTS = {"True": True, "False": False, "None": None}
+_ESCAPES = {
+    "n": "\n",
+    "t": "\t",
+    "r": "\r",
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+    "0": "\0",
+}
+
+
+class ActionParseError(ValueError):
+    """
+    Raised when model output is not a valid action call.
+
+    Attributes:
+        position: Character offset in the input where the error was found.
+    """
+
+    def __init__(self, message: str, text: str, position: int):
+        self.position = position
+        self.text = text
+        snippet = text[max(0, position - 20) : position + 20]
+        super().__init__(f"{message} at position {position}: ...{snippet}...")
+
+
+@dataclass
+class ParsedAction:
+    """A validated action call."""
+
+    kind: str
+    args: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str | None:
+        """The action name for `do` calls, None for `finish`."""
+        return self.args.get("action")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the dictionary format used by ActionHandler."""
+        return {**self.args, "_metadata": self.kind}
+
+
+# One pass in C splits the call into tokens; `\S` catches anything invalid
+_TOKEN_RE = re.compile(
+    r""""(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|-?\d+(?:\.\d+)?|[A-Za-z_]\w*|[()\[\],=]|\S""",
+    re.DOTALL,
+)
+_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+
+# The shape nearly every model action has: plain double-quoted strings and
+# [x, y] integer pairs. Such calls skip the tokenizer and the parser objects;
+# anything else (escapes, nesting, floats, errors) goes the general way
+_FAST_ARG = r'\s*[A-Za-z_]\w*\s*=\s*(?:"[^"\\]*"|\[\s*\d+\s*,\s*\d+\s*\])\s*'
+_FAST_CALL_RE = re.compile(rf"(do|finish)\((?:{_FAST_ARG}(?:,{_FAST_ARG})*)?\)")
+_FAST_ARG_RE = re.compile(
+    r'([A-Za-z_]\w*)\s*=\s*(?:"([^"\\]*)"|\[\s*(\d+)\s*,\s*(\d+)\s*\])'
+)
+
+
+class _Parser:
+    """Recursive-descent parser over the tokens of a single call expression."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _TOKEN_RE.findall(text)
+        self.index = 0
+
+    def parse_call(self) -> tuple[str, dict[str, Any]]:
+        name = self._next()
+        if name not in ("do", "finish"):
+            self._fail(f"Unknown call '{name}'", 0)
+        self._expect("(")
+
+        args: dict[str, Any] = {}
+        while not self._at(")"):
+            key = self._next()
+            if not (key[0].isalpha() or key[0] == "_"):
+                self._fail("Expected an argument name", self.index - 1)
+            if key in args:
+                self._fail(f"Duplicate argument '{key}'", self.index - 1)
+            self._expect("=")
+            args[key] = self._value()
+            if not self._at(")"):
+                self._expect(",")
+        self._expect(")")
+
+        if self.index != len(self.tokens):
+            self._fail("Unexpected trailing input", self.index)
+        return name, args
+
+    def _value(self) -> Any:
+        token = self._next()
+        first = token[0]
+        if first == '"' or first == "'":
+            if len(token) < 2 or token[-1] != first:
+                self._fail("Unterminated string", self.index - 1)
+            body = token[1:-1]
+            if "\\" in body:
+                body = _ESCAPE_RE.sub(
+                    lambda m: _ESCAPES.get(m.group(1), m.group(0)), body
+                )
+            return body
+        if first.isdigit() or (first == "-" and len(token) > 1):
+            return float(token) if "." in token else int(token)
+        if token in _CONSTANTS:
+            return _CONSTANTS[token]
+        if token == "[":
+            items = []
+            while not self._at("]"):
+                items.append(self._value())
+                if not self._at("]"):
+                    self._expect(",")
+            self._expect("]")
+            return items
+        self._fail(f"Unexpected {token!r}", self.index - 1)
+
+    def _next(self) -> str:
+        if self.index >= len(self.tokens):
+            self._fail("Unexpected end of input", self.index)
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def _at(self, punct: str) -> bool:
+        if self.index >= len(self.tokens):
+            self._fail(f"Expected '{punct}'", self.index)
+        return self.tokens[self.index] == punct
+
+    def _expect(self, punct: str) -> None:
+        if self._next() != punct:
+            self._fail(f"Expected '{punct}'", self.index - 1)
+
+    def _fail(self, message: str, token_index: int):
+        # Map the token back to its character offset only on the error path
+        positions = [m.start() for m in _TOKEN_RE.finditer(self.text)]
+        position = (
+            positions[token_index] if token_index < len(positions) else len(self.text)
+        )
+        raise ActionParseError(message, self.text, position)
+
+
+def parse_action_call(text: str) -> ParsedAction:
+    """
+    Parse and validate a `do(...)` or `finish(...)` call without evaluating it.
+
+    Args:
+        text: Action text from the model, e.g. 'do(action="Tap", element=[500, 300])'.
+
+    Returns:
+        ParsedAction with validated arguments.
+
+    Raises:
+        ActionParseError: If the text is malformed or fails validation.
+    """
+    text = text.strip()
+    if text.endswith("</answer>"):
+        text = text[: -len("</answer>")].rstrip()
+
+    match = _FAST_CALL_RE.fullmatch(text)
+    if match is not None:
+        args = _fast_args(text, match.end(1))
+        if args is not None:
+            kind = match.group(1)
+            if not _fast_valid(kind, args):
+                _validate(kind, args, text)
+            return ParsedAction(kind=kind, args=args)
+
+    try:
+        kind, args = _Parser(text).parse_call()
+    except ActionParseError:
+        # finish messages often contain unescaped quotes; take the whole body
+        message = _extract_finish_message(text)
+        if message is None:
+            raise
+        return ParsedAction(kind="finish", args={"message": message})
+
+    _validate(kind, args, text)
+    return ParsedAction(kind=kind, args=args)
+
+
+def _fast_args(text: str, start: int) -> dict[str, Any] | None:
+    """Read the arguments of a call matched by _FAST_CALL_RE; None on duplicates."""
+    args: dict[str, Any] = {}
+    count = 0
+    for key, string, x, y in _FAST_ARG_RE.findall(text, start):
+        args[key] = [int(x), int(y)] if x else string
+        count += 1
+    # A duplicate name is an error the general parser reports with its position
+    return args if len(args) == count else None
+
+
+def _fast_valid(kind: str, args: dict[str, Any]) -> bool:
+    """
+    Cheaply accept a fast-path call; False means run _validate() to be sure.
+
+    Fast-path values are already strings or pairs of non-negative ints, so
+    only their placement and the coordinate maximum need checking.
+    """
+    if kind == "finish":
+        return True
+    if args.get("action") not in KNOWN_ACTIONS:
+        return False
+    for key, value in args.items():
+        if type(value) is list:
+            if key not in COORDINATE_ARGS or value[0] > 1000 or value[1] > 1000:
+                return False
+        elif key in COORDINATE_ARGS:
+            return False
+    return True
+
+
+def _extract_finish_message(text: str) -> str | None:
+    """Leniently extract the message of a finish call with unescaped quotes."""
+    prefix = "finish(message="
+    if not text.startswith(prefix) or not text.endswith(")"):
+        return None
+    body = text[len(prefix) : -1].strip()
+    if len(body) >= 2 and body[0] == body[-1] and body[0] in "\"'":
+        return body[1:-1]
+    return None
+
+
+def _validate(kind: str, args: dict[str, Any], text: str) -> None:
+    """Check argument names, types and coordinate ranges."""
+    if kind == "finish":
+        if not isinstance(args.get("message", ""), str):
+            raise ActionParseError("finish message must be a string", text, 0)
+        return
+
+    name = args.get("action")
+    if name is None:
+        raise ActionParseError("Missing 'action' argument", text, 0)
+    if name not in KNOWN_ACTIONS:
+        raise ActionParseError(
+            f"Unknown action '{name}'", text, max(0, text.find(str(name)))
+        )
+
+    for key, value in args.items():
+        if key in COORDINATE_ARGS:
+            if type(value) is not list or len(value) != 2:
+                error = f"'{key}' must be a list of two numbers"
+            elif not all(type(v) in (int, float) and 0 <= v <= 1000 for v in value):
+                error = f"'{key}' coordinates must be numbers within 0-1000"
+            else:
+                continue
+        elif key in STRING_ARGS and type(value) is not str:
+            error = f"'{key}' must be a string"
+        else:
+            continue
+        raise ActionParseError(error, text, max(0, text.find(f"{key}=")))
@@ -1,5 +1,10 @@
 """ADB utilities for Android device interaction."""
 
+from phone_agent.adb.app_catalog import (
+    AppCatalog,
+    get_app_catalog,
+    normalize_app_name,
+)
 from phone_agent.adb.connection import (
     ADBConnection,
     ConnectionType,
@@ -12,6 +17,7 @@ from phone_agent.adb.device import (
     double_tap,
     ensure_screen_unlocked,
     get_current_app,
+    get_focused_activity,
     home,
     is_screen_locked,
     is_screen_on,
@@ -22,17 +28,54 @@ from phone_agent.adb.device import (
     unlock_screen,
     wake_up,
 )
+from phone_agent.adb.device_state import (
+    DeviceState,
+    get_device_state,
+    invalidate_device_state,
+)
+from phone_agent.adb.injector import (
+    InjectorClient,
+    InjectorError,
+    PartialTextError,
+    get_injector,
+    get_input_backend,
+    set_input_backend,
+    start_injector,
+)
 from phone_agent.adb.input import (
     clear_text,
     detect_and_set_adb_keyboard,
     restore_keyboard,
     type_text,
 )
-from phone_agent.adb.screenshot import get_screenshot
+from phone_agent.adb.launcher import (
+    LaunchResult,
+    LaunchStats,
+    get_launch_stats,
+    launch_package,
+    remember_launcher_activity,
+    resolve_launcher_activity,
+)
+from phone_agent.adb.protocol import ADBProtocolError, ADBServerClient
+from phone_agent.adb.screen_hash import ScreenChange, ScreenTracker
+from phone_agent.adb.screenshot import Screenshot, get_screenshot
+from phone_agent.adb.settle import SettleConfig, wait_for_settle
+from phone_agent.adb.shell import (
+    ShellNotSentError,
+    ShellSession,
+    ShellSessionPool,
+    get_adb_backend,
+    run_shell,
+    set_adb_backend,
+)
 
 __all__ = [
     # Screenshot
     "get_screenshot",
+    "Screenshot",
+    # Screen change detection
+    "ScreenTracker",
+    "ScreenChange",
     # Input
     "type_text",
     "clear_text",
@@ -40,6 +83,7 @@ __all__ = [
     "restore_keyboard",
     # Device control
     "get_current_app",
+    "get_focused_activity",
     "tap",
     "swipe",
     "back",
@@ -47,12 +91,47 @@ __all__ = [
     "double_tap",
     "long_press",
     "launch_app",
+    # App launch
+    "AppCatalog",
+    "get_app_catalog",
+    "normalize_app_name",
+    "launch_package",
+    "resolve_launcher_activity",
+    "remember_launcher_activity",
+    "get_launch_stats",
+    "LaunchResult",
+    "LaunchStats",
     # Screen unlock
     "is_screen_on",
     "is_screen_locked",
     "wake_up",
     "unlock_screen",
     "ensure_screen_unlocked",
+    # Device state
+    "DeviceState",
+    "get_device_state",
+    "invalidate_device_state",
+    # Settle detection
+    "SettleConfig",
+    "wait_for_settle",
+    # Shell sessions
+    "run_shell",
+    "ShellNotSentError",
+    "ShellSession",
+    "ShellSessionPool",
+    # Backends
+    "set_adb_backend",
+    "get_adb_backend",
+    # Input injection
+    "set_input_backend",
+    "get_input_backend",
+    "get_injector",
+    "start_injector",
+    "InjectorClient",
+    "InjectorError",
+    "PartialTextError",
+    "ADBServerClient",
+    "ADBProtocolError",
     # Connection management
     "ADBConnection",
     "DeviceInfo",
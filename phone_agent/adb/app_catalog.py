@@ -0,0 +1,399 @@
+"""Per-device catalog of launchable apps, merged with the static app table."""
+
+import difflib
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+
+from phone_agent.adb.launcher import remember_launcher_activity
+from phone_agent.adb.protocol import ADBProtocolError
+from phone_agent.adb.shell import run_shell
+from phone_agent.config.apps import APP_PACKAGES
+
+# Bumped whenever the file layout changes; older files are ignored
+CATALOG_VERSION = 1
+
+_COMPONENT_RE = re.compile(r"^\s*([A-Za-z][\w.]*)/([\w.$]+)\s*$", re.MULTILINE)
+
+# Normalized words the model may put around an app name
+_PREFIXES = ("打开", "启动", "open", "launch")
+_SUFFIXES = ("app", "应用", "客户端")
+
+# Names the model may use for apps whose APP_PACKAGES names are Chinese. Only
+# catalog lookups use them, so they never show up as separate apps elsewhere
+APP_ALIASES: dict[str, str] = {
+    "Weixin": "com.tencent.mm",
+    "Weibo": "com.sina.weibo",
+    "Taobao": "com.taobao.taobao",
+    "JD": "com.jingdong.app.mall",
+    "Jingdong": "com.jingdong.app.mall",
+    "Pinduoduo": "com.xunmeng.pinduoduo",
+    "Xiaohongshu": "com.xingin.xhs",
+    "RedNote": "com.xingin.xhs",
+    "Douban": "com.douban.frodo",
+    "Zhihu": "com.zhihu.android",
+    "Amap": "com.autonavi.minimap",
+    "Gaode Map": "com.autonavi.minimap",
+    "Baidu Maps": "com.baidu.BaiduMap",
+    "Meituan": "com.sankuai.meituan",
+    "Dianping": "com.dianping.v1",
+    "Ele.me": "me.ele",
+    "KFC": "com.yek.android.kfc.activitys",
+    "Ctrip": "ctrip.android.view",
+    "Qunar": "com.Qunar",
+    "DiDi": "com.sdu.did.psnger",
+    "Douyin": "com.ss.android.ugc.aweme",
+    "Kuaishou": "com.smile.gifmaker",
+    "Tencent Video": "com.tencent.qqlive",
+    "iQIYI": "com.qiyi.video",
+    "Youku": "com.youku.phone",
+    "NetEase Cloud Music": "com.netease.cloudmusic",
+    "QQ Music": "com.tencent.qqmusic",
+    "Ximalaya": "com.ximalaya.ting.android",
+    "Feishu": "com.ss.android.lark",
+    "Lark": "com.ss.android.lark",
+    "Doubao": "com.larus.nova",
+    "Toutiao": "com.ss.android.article.news",
+    "Honkai: Star Rail": "com.miHoYo.hkrpg",
+}
+
+# Package name segments that say nothing about which app it is
+_GENERIC_SEGMENTS = {
+    "activity",
+    "activitys",
+    "android",
+    "app",
+    "apps",
+    "client",
+    "cn",
+    "co",
+    "com",
+    "global",
+    "io",
+    "main",
+    "me",
+    "mobile",
+    "net",
+    "org",
+    "phone",
+    "tv",
+}
+
+
+def normalize_app_name(name: str) -> str:
+    """
+    Normalize an app name for lookup.
+
+    Full-width forms are folded, case is ignored and whitespace and
+    punctuation are dropped, so "Google-Play Store" matches
+    "googleplaystore" and "崩坏：星穹铁道" matches "崩坏星穹铁道".
+    """
+    text = unicodedata.normalize("NFKC", name).casefold()
+    return "".join(c for c in text if c.isalnum())
+
+
+# Every name of a known app, installed or not
+_KNOWN_NAMES = {normalize_app_name(name) for name in [*APP_PACKAGES, *APP_ALIASES]}
+
+
+def guess_app_names(package: str) -> list[str]:
+    """
+    Guess names an app may be asked for by from its package name.
+
+    Android exposes no app labels to the shell, so installed apps missing
+    from APP_PACKAGES are known by the distinctive segments of their package,
+    e.g. "org.telegram.messenger" by "telegram" and "messenger".
+
+    Args:
+        package: Android package name.
+
+    Returns:
+        Normalized candidate names, most specific (last segment) first.
+    """
+    segments = [normalize_app_name(s) for s in reversed(package.split("."))]
+    return [s for s in segments if len(s) >= 3 and s not in _GENERIC_SEGMENTS]
+
+
+@dataclass
+class _DeviceApps:
+    """Launchable apps on one device and the names they are found by."""
+
+    # Package -> launcher component (None if only the package is known)
+    packages: dict[str, str | None]
+    updated_at: float = field(default_factory=time.time)
+    index: dict[str, str] = field(default_factory=dict)
+    # time.monotonic() of the last query in this process, if any
+    checked_at: float | None = None
+
+
+class AppCatalog:
+    """
+    Launchable apps installed on each device, stored in a JSON file.
+
+    Names resolve first through APP_PACKAGES and APP_ALIASES (limited to apps
+    installed on the device), then through names guessed from installed package names,
+    then fuzzily. The device is queried once, on the first lookup with no
+    stored catalog, and again when a name is not found (at most every
+    `refresh_interval` seconds) so newly installed or removed apps are
+    picked up.
+
+    Catalogs are shared per path within a process; use get_app_catalog().
+
+    Args:
+        path: JSON file holding the catalogs; created on first refresh.
+        refresh_interval: Minimum seconds between refreshes after a miss.
+    """
+
+    def __init__(self, path: str, refresh_interval: float = 60.0):
+        self.path = os.path.expanduser(path)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._devices = self._load()
+
+    def find(self, name: str, device_id: str | None = None) -> str | None:
+        """
+        Find the package of an app by name.
+
+        Args:
+            name: App name as given by the model, in any language or spelling
+                listed in APP_PACKAGES or APP_ALIASES, or a name of an
+                installed package.
+            device_id: Optional ADB device ID.
+
+        Returns:
+            Package name, or None if no installed app matches.
+        """
+        key = device_id or ""
+        with self._lock:
+            apps = self._devices.get(key)
+        if apps is None:
+            apps = self.refresh(device_id)
+
+        package = _match(normalize_app_name(name), apps.index)
+        if package is not None:
+            return package
+
+        checked_at = apps.checked_at
+        if checked_at is not None and (
+            time.monotonic() - checked_at < self.refresh_interval
+        ):
+            return None
+        apps = self.refresh(device_id)
+        return _match(normalize_app_name(name), apps.index)
+
+    def refresh(self, device_id: str | None = None) -> _DeviceApps:
+        """
+        Query the device for its launchable apps and save them if they changed.
+
+        A failed or empty query keeps the previous entry, so a device that is
+        briefly unreachable never overwrites its stored catalog.
+
+        Args:
+            device_id: Optional ADB device ID.
+
+        Returns:
+            The device's updated entry.
+        """
+        try:
+            packages = _query_launchable(device_id)
+        except (ADBProtocolError, OSError, subprocess.TimeoutExpired) as e:
+            print(f"Warning: Failed to list installed apps: {e}")
+            packages = {}
+
+        key = device_id or ""
+        with self._lock:
+            apps = self._devices.get(key)
+            if packages and (apps is None or apps.packages != packages):
+                apps = _DeviceApps(packages=packages, index=_build_index(packages))
+                self._devices[key] = apps
+                self._save()
+            elif apps is None:
+                # Kept in memory only, until a query succeeds
+                apps = _DeviceApps(packages={})
+                self._devices[key] = apps
+            apps.checked_at = time.monotonic()
+
+        for package, component in packages.items():
+            if component is not None:
+                remember_launcher_activity(package, component, device_id)
+        return apps
+
+    def forget(self, package: str, device_id: str | None = None) -> None:
+        """
+        Drop an app that failed to launch, e.g. because it was uninstalled.
+
+        The next lookup that misses queries the device again right away.
+
+        Args:
+            package: Android package name.
+            device_id: Optional ADB device ID.
+        """
+        with self._lock:
+            apps = self._devices.get(device_id or "")
+            if apps is None or package not in apps.packages:
+                return
+            packages = {p: c for p, c in apps.packages.items() if p != package}
+            self._devices[device_id or ""] = _DeviceApps(
+                packages=packages, index=_build_index(packages)
+            )
+            self._save()
+
+    def packages(self, device_id: str | None = None) -> list[str]:
+        """Packages known to be launchable on a device, sorted."""
+        with self._lock:
+            apps = self._devices.get(device_id or "")
+        return sorted(apps.packages) if apps else []
+
+    def _load(self) -> dict[str, _DeviceApps]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable app catalog {self.path}: {e}")
+            return {}
+        if data.get("version") != CATALOG_VERSION:
+            return {}
+
+        devices = {}
+        for key, entry in data.get("devices", {}).items():
+            packages = entry.get("packages", {})
+            devices[key] = _DeviceApps(
+                packages=packages,
+                updated_at=entry.get("updated_at", 0.0),
+                index=_build_index(packages),
+            )
+        return devices
+
+    def _save(self) -> None:
+        """Write the catalogs atomically so a crash never leaves a partial file."""
+        data = {
+            "version": CATALOG_VERSION,
+            "devices": {
+                key: {"packages": apps.packages, "updated_at": apps.updated_at}
+                for key, apps in self._devices.items()
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+def _query_launchable(device_id: str | None) -> dict[str, str | None]:
+    """Map each package with a launcher icon to its launcher component."""
+    output = run_shell(
+        [
+            "cmd",
+            "package",
+            "query-activities",
+            "--brief",
+            "-a",
+            "android.intent.action.MAIN",
+            "-c",
+            "android.intent.category.LAUNCHER",
+        ],
+        device_id,
+        timeout=30,
+    )
+    packages: dict[str, str | None] = {}
+    for package, activity in _COMPONENT_RE.findall(output):
+        packages.setdefault(package, f"{package}/{activity}")
+    if packages:
+        return packages
+
+    # `cmd package` needs Android 7; fall back to every installed package
+    output = run_shell(["pm", "list", "packages"], device_id, timeout=30)
+    return {
+        line[len("package:") :].strip(): None
+        for line in output.splitlines()
+        if line.startswith("package:")
+    }
+
+
+def _build_index(packages: dict[str, str | None]) -> dict[str, str]:
+    """Map normalized names to the installed packages they refer to."""
+    index: dict[str, str] = {}
+    for name, package in [*APP_PACKAGES.items(), *APP_ALIASES.items()]:
+        if package in packages:
+            index.setdefault(normalize_app_name(name), package)
+
+    # Guessed names shared by several packages (e.g. "google") are ambiguous
+    owners: dict[str, set[str]] = {}
+    for package in packages:
+        for name in guess_app_names(package):
+            owners.setdefault(name, set()).add(package)
+    for package in sorted(packages):
+        index.setdefault(normalize_app_name(package), package)
+        for name in guess_app_names(package):
+            if len(owners[name]) == 1:
+                index.setdefault(name, package)
+    return index
+
+
+def _match(query: str, index: dict[str, str]) -> str | None:
+    """
+    Look up a normalized name exactly, then fuzzily if one app clearly matches.
+
+    Names are never matched by containment: "微信读书" must not open "微信".
+    """
+    if not query:
+        return None
+    stripped = _strip_affixes(query)
+    for name in (query, stripped):
+        if name in index:
+            return index[name]
+    # A known app that is not installed must not resolve to a similar one
+    if query in _KNOWN_NAMES or stripped in _KNOWN_NAMES:
+        return None
+
+    close = difflib.get_close_matches(stripped, index.keys(), n=5, cutoff=0.85)
+    packages = {index[name] for name in close}
+    return packages.pop() if len(packages) == 1 else None
+
+
+def _strip_affixes(query: str) -> str:
+    """Drop words around an app name, e.g. "打开淘宝app" -> "淘宝"."""
+    for prefix in _PREFIXES:
+        if query.startswith(prefix) and len(query) > len(prefix):
+            query = query[len(prefix) :]
+            break
+    for suffix in _SUFFIXES:
+        if query.endswith(suffix) and len(query) > len(suffix):
+            query = query[: -len(suffix)]
+            break
+    return query
+
+
+_catalogs: dict[str, AppCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_app_catalog(path: str) -> AppCatalog:
+    """
+    Get the catalog stored at a path, shared by all agents in the process.
+
+    Args:
+        path: JSON file holding the catalogs.
+
+    Returns:
+        Shared AppCatalog.
+    """
+    path = os.path.abspath(os.path.expanduser(path))
+    with _catalogs_lock:
+        if path not in _catalogs:
+            _catalogs[path] = AppCatalog(path)
+        return _catalogs[path]
@@ -6,6 +6,8 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+from phone_agent.adb.shell import get_adb_backend, get_server_client
+
 
 class ConnectionType(Enum):
     """Type of ADB connection."""
@@ -123,15 +125,19 @@ class ADBConnection:
             List of DeviceInfo objects.
         """
         try:
-            result = subprocess.run(
-                [self.adb_path, "devices", "-l"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
+            if get_adb_backend() == "native":
+                lines = get_server_client().devices().strip().split("\n")
+            else:
+                result = subprocess.run(
+                    [self.adb_path, "devices", "-l"],
+                    capture_output=True,
+                    text=True,
+                    timeout=5,
+                )
+                lines = result.stdout.strip().split("\n")[1:]  # Skip header
 
             devices = []
-            for line in result.stdout.strip().split("\n")[1:]:  # Skip header
+            for line in lines:
                 if not line.strip():
                     continue
 
@@ -1,38 +1,54 @@
 """Device control utilities for Android automation."""
 
 import os
-import subprocess
 import time
 from typing import List, Optional, Tuple
 
+from phone_agent.adb.device_state import (
+    DEFAULT_STATE_TTL,
+    get_device_state,
+    invalidate_device_state,
+)
+from phone_agent.adb.injector import inject_key, inject_swipe, inject_tap
+from phone_agent.adb.launcher import launch_package
+from phone_agent.adb.shell import run_shell
 from phone_agent.config.apps import APP_PACKAGES
 
 
-def get_current_app(device_id: str | None = None) -> str:
+def get_current_app(
+    device_id: str | None = None, max_age: float = DEFAULT_STATE_TTL
+) -> str:
     """
     Get the currently focused app name.
 
     Args:
         device_id: Optional ADB device ID for multi-device setups.
+        max_age: Maximum age in seconds of a cached device state to reuse.
 
     Returns:
         The app name if recognized, otherwise "System Home".
     """
-    adb_prefix = _get_adb_prefix(device_id)
+    return get_device_state(device_id, max_age).current_app
 
-    result = subprocess.run(
-        adb_prefix + ["shell", "dumpsys", "window"], capture_output=True, text=True
-    )
-    output = result.stdout
 
-    # Parse window focus info
-    for line in output.split("\n"):
-        if "mCurrentFocus" in line or "mFocusedApp" in line:
-            for app_name, package in APP_PACKAGES.items():
-                if package in line:
-                    return app_name
+def get_focused_activity(
+    device_id: str | None = None, max_age: float = DEFAULT_STATE_TTL
+) -> tuple[str, str] | None:
+    """
+    Get the package and activity of the focused window.
 
-    return "System Home"
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        max_age: Maximum age in seconds of a cached device state to reuse.
+
+    Returns:
+        (package, activity) as reported by the device, where the activity
+        may be relative (".ui.Main"), or None if no app window has focus.
+    """
+    state = get_device_state(device_id, max_age)
+    if state.package is None:
+        return None
+    return state.package, state.activity
 
 
 def tap(x: int, y: int, device_id: str | None = None, delay: float = 1.0) -> None:
@@ -45,11 +61,9 @@ def tap(x: int, y: int, device_id: str | None = None, delay: float = 1.0) -> Non
         device_id: Optional ADB device ID.
         delay: Delay in seconds after tap.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
+    if not inject_tap(x, y, device_id):
+        run_shell(["input", "tap", str(x), str(y)], device_id)
+    invalidate_device_state(device_id)
     time.sleep(delay)
 
 
@@ -65,15 +79,12 @@ def double_tap(
         device_id: Optional ADB device ID.
         delay: Delay in seconds after double tap.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
-    time.sleep(0.1)
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
+    for i in range(2):
+        if i:
+            time.sleep(0.1)
+        if not inject_tap(x, y, device_id):
+            run_shell(["input", "tap", str(x), str(y)], device_id)
+    invalidate_device_state(device_id)
     time.sleep(delay)
 
 
@@ -94,13 +105,12 @@ def long_press(
         device_id: Optional ADB device ID.
         delay: Delay in seconds after long press.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix
-        + ["shell", "input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
-        capture_output=True,
-    )
+    if not inject_swipe(x, y, x, y, duration_ms, device_id):
+        run_shell(
+            ["input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
+            device_id,
+        )
+    invalidate_device_state(device_id)
     time.sleep(delay)
 
 
@@ -125,28 +135,26 @@ def swipe(
         device_id: Optional ADB device ID.
         delay: Delay in seconds after swipe.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
     if duration_ms is None:
         # Calculate duration based on distance
         dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
         duration_ms = int(dist_sq / 1000)
         duration_ms = max(1000, min(duration_ms, 2000))  # Clamp between 1000-2000ms
 
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
-            "input",
-            "swipe",
-            str(start_x),
-            str(start_y),
-            str(end_x),
-            str(end_y),
-            str(duration_ms),
-        ],
-        capture_output=True,
-    )
+    if not inject_swipe(start_x, start_y, end_x, end_y, duration_ms, device_id):
+        run_shell(
+            [
+                "input",
+                "swipe",
+                str(start_x),
+                str(start_y),
+                str(end_x),
+                str(end_y),
+                str(duration_ms),
+            ],
+            device_id,
+        )
+    invalidate_device_state(device_id)
     time.sleep(delay)
 
 
@@ -158,11 +166,9 @@ def back(device_id: str | None = None, delay: float = 1.0) -> None:
         device_id: Optional ADB device ID.
         delay: Delay in seconds after pressing back.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "4"], capture_output=True
-    )
+    if not inject_key("KEYCODE_BACK", device_id):
+        run_shell(["input", "keyevent", "4"], device_id)
+    invalidate_device_state(device_id)
     time.sleep(delay)
 
 
@@ -174,11 +180,9 @@ def home(device_id: str | None = None, delay: float = 1.0) -> None:
         device_id: Optional ADB device ID.
         delay: Delay in seconds after pressing home.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "KEYCODE_HOME"], capture_output=True
-    )
+    if not inject_key("KEYCODE_HOME", device_id):
+        run_shell(["input", "keyevent", "KEYCODE_HOME"], device_id)
+    invalidate_device_state(device_id)
     time.sleep(delay)
 
 
@@ -189,7 +193,8 @@ def launch_app(app_name: str, device_id: str | None = None, delay: float = 1.0)
     Args:
         app_name: The app name (must be in APP_PACKAGES).
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after launching.
+        delay: Delay in seconds after launching, when the launch did not
+            already wait for the app to be drawn (monkey fallback).
 
     Returns:
         True if app was launched, False if app not found.
@@ -197,89 +202,42 @@ def launch_app(app_name: str, device_id: str | None = None, delay: float = 1.0)
     if app_name not in APP_PACKAGES:
         return False
 
-    adb_prefix = _get_adb_prefix(device_id)
-    package = APP_PACKAGES[app_name]
-
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
-            "monkey",
-            "-p",
-            package,
-            "-c",
-            "android.intent.category.LAUNCHER",
-            "1",
-        ],
-        capture_output=True,
-    )
-    time.sleep(delay)
+    result = launch_package(APP_PACKAGES[app_name], device_id)
+    if not result.drawn:
+        time.sleep(delay)
     return True
 
 
-def _get_adb_prefix(device_id: str | None) -> list:
-    """Get ADB command prefix with optional device specifier."""
-    if device_id:
-        return ["adb", "-s", device_id]
-    return ["adb"]
-
-
-def is_screen_on(device_id: str | None = None) -> bool:
+def is_screen_on(
+    device_id: str | None = None, max_age: float = DEFAULT_STATE_TTL
+) -> bool:
     """
     Check if the device screen is on.
 
     Args:
         device_id: Optional ADB device ID.
+        max_age: Maximum age in seconds of a cached device state to reuse.
 
     Returns:
         True if screen is on, False otherwise.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    result = subprocess.run(
-        adb_prefix + ["shell", "dumpsys", "power"], capture_output=True, text=True
-    )
-    output = result.stdout
+    return get_device_state(device_id, max_age).screen_on
 
-    for line in output.split("\n"):
-        if "mScreenOn=" in line or "Display Power" in line or "state=" in line:
-            if "mScreenOn=true" in line or "state=ON" in line:
-                return True
-            if "mScreenOn=false" in line or "state=OFF" in line:
-                return False
 
-    return False
-
-
-def is_screen_locked(device_id: str | None = None) -> bool:
+def is_screen_locked(
+    device_id: str | None = None, max_age: float = DEFAULT_STATE_TTL
+) -> bool:
     """
     Check if the device screen is locked.
 
     Args:
         device_id: Optional ADB device ID.
+        max_age: Maximum age in seconds of a cached device state to reuse.
 
     Returns:
         True if screen is locked, False otherwise.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    result = subprocess.run(
-        adb_prefix + ["shell", "dumpsys", "window"], capture_output=True, text=True
-    )
-    output = result.stdout
-
-    for line in output.split("\n"):
-        if "mDreamingLockscreen=" in line:
-            if "true" in line:
-                return True
-        if "mShowingLockscreen=" in line:
-            if "true" in line:
-                return True
-        if "showing=" in line and "Keyguard" in line:
-            if "showing=true" in line:
-                return True
-
-    return False
+    return get_device_state(device_id, max_age).locked
 
 
 def wake_up(device_id: str | None = None, delay: float = 0.5) -> None:
@@ -290,12 +248,9 @@ def wake_up(device_id: str | None = None, delay: float = 0.5) -> None:
         device_id: Optional ADB device ID.
         delay: Delay in seconds after waking up.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "KEYCODE_WAKEUP"],
-        capture_output=True,
-    )
+    if not inject_key("KEYCODE_WAKEUP", device_id):
+        run_shell(["input", "keyevent", "KEYCODE_WAKEUP"], device_id)
+    invalidate_device_state(device_id)
     time.sleep(delay)
 
 
@@ -313,20 +268,16 @@ def unlock_screen(
     Returns:
         True if unlock attempt was made, False otherwise.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
     if unlock_method == "swipe":
-        subprocess.run(
-            adb_prefix + ["shell", "input", "swipe", "300", "1000", "300", "300"],
-            capture_output=True,
-        )
+        if not inject_swipe(300, 1000, 300, 300, 300, device_id):
+            run_shell(["input", "swipe", "300", "1000", "300", "300"], device_id)
     elif unlock_method == "menu":
-        subprocess.run(
-            adb_prefix + ["shell", "input", "keyevent", "82"], capture_output=True
-        )
+        if not inject_key("KEYCODE_MENU", device_id):
+            run_shell(["input", "keyevent", "82"], device_id)
     else:
         return False
 
+    invalidate_device_state(device_id)
     time.sleep(delay)
     return True
 
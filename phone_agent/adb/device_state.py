@@ -0,0 +1,157 @@
+"""Screen, keyguard and focused-window state from one cached device probe."""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from phone_agent.adb.shell import run_shell
+from phone_agent.config.apps import PACKAGE_APPS
+
+# Seconds a probe stays valid; bounds how long a change made outside the
+# agent (e.g. the screen timing out while idle) can go unnoticed
+DEFAULT_STATE_TTL = 1.0
+
+_SECTION_MARKER = "--phone-agent-window--"
+
+# Both dumps are filtered on the device, so only a few lines cross the wire
+PROBE_COMMAND = (
+    "dumpsys power | grep -E 'Display Power|mScreenOn='; "
+    f"echo {_SECTION_MARKER}; "
+    "dumpsys window | grep -E 'mCurrentFocus=|mFocusedApp=|Lockscreen=|Keyguard'"
+)
+
+# The component in a focus record, e.g. "mCurrentFocus=Window{1f u0 pkg/.Main}"
+# or "mFocusedApp=ActivityRecord{2e u0 pkg/pkg.ui.Main t12}"
+_FOCUS_RE = re.compile(
+    r"(?:mCurrentFocus|mFocusedApp)=.*?\bu\d+ ([A-Za-z][\w.]*)/([\w.$]+)"
+)
+
+# For devices without grep (before Android 6)
+_UNFILTERED_COMMAND = f"dumpsys power; echo {_SECTION_MARKER}; dumpsys window"
+
+
+@dataclass(frozen=True)
+class DeviceState:
+    """Snapshot of the device's screen, keyguard and foreground window."""
+
+    screen_on: bool
+    locked: bool
+    # (package, activity) of the focused window and focused app, in dump order
+    focus: tuple[tuple[str, str], ...]
+    captured_at: float
+
+    @property
+    def package(self) -> str | None:
+        """Package of the focused window, as reported by the device."""
+        return self.focus[0][0] if self.focus else None
+
+    @property
+    def activity(self) -> str | None:
+        """Activity of the focused window, as reported (may start with ".")."""
+        return self.focus[0][1] if self.focus else None
+
+    @property
+    def current_app(self) -> str:
+        """Name of the focused app if recognized, otherwise "System Home"."""
+        # A dialog from another package can hold the window focus while a
+        # known app stays the focused app behind it
+        for package, _ in self.focus:
+            app_name = PACKAGE_APPS.get(package)
+            if app_name is not None:
+                return app_name
+        return "System Home"
+
+
+def parse_screen_on(output: str) -> bool | None:
+    """Read the screen state from `dumpsys power`; None if it is not reported."""
+    for line in output.split("\n"):
+        if "mScreenOn=" in line or "Display Power" in line or "state=" in line:
+            if "mScreenOn=true" in line or "state=ON" in line:
+                return True
+            if "mScreenOn=false" in line or "state=OFF" in line:
+                return False
+    return None
+
+
+def parse_locked(output: str) -> bool:
+    """Read whether the keyguard is showing from `dumpsys window`."""
+    for line in output.split("\n"):
+        if "mDreamingLockscreen=" in line and "true" in line:
+            return True
+        if "mShowingLockscreen=" in line and "true" in line:
+            return True
+        if "showing=" in line and "Keyguard" in line and "showing=true" in line:
+            return True
+    return False
+
+
+def parse_focus(output: str) -> tuple[tuple[str, str], ...]:
+    """
+    Extract the focused components from `dumpsys window`.
+
+    Args:
+        output: Full or grep-filtered `dumpsys window` output.
+
+    Returns:
+        (package, activity) of each mCurrentFocus / mFocusedApp record that
+        names a component, in the order they appear.
+    """
+    return tuple(match.groups() for match in _FOCUS_RE.finditer(output))
+
+
+_cache: dict[str | None, DeviceState] = {}
+_unfiltered: set[str | None] = set()
+_lock = threading.Lock()
+
+
+def get_device_state(
+    device_id: str | None = None, max_age: float = DEFAULT_STATE_TTL
+) -> DeviceState:
+    """
+    Get the device state, probing the device only if the cached one is stale.
+
+    One shell round trip reads screen power, keyguard and window focus,
+    replacing separate `dumpsys` calls for each.
+
+    Args:
+        device_id: Optional ADB device ID.
+        max_age: Maximum age in seconds of a cached state; 0 always probes.
+
+    Returns:
+        The current DeviceState.
+    """
+    with _lock:
+        state = _cache.get(device_id)
+    if state is not None and time.monotonic() - state.captured_at < max_age:
+        return state
+
+    state = _probe(device_id)
+    with _lock:
+        _cache[device_id] = state
+    return state
+
+
+def invalidate_device_state(device_id: str | None = None) -> None:
+    """Forget the cached state after an action that may have changed it."""
+    with _lock:
+        _cache.pop(device_id, None)
+
+
+def _probe(device_id: str | None) -> DeviceState:
+    command = _UNFILTERED_COMMAND if device_id in _unfiltered else PROBE_COMMAND
+    output = run_shell(command, device_id, timeout=15)
+    power, _, window = output.partition(_SECTION_MARKER)
+    screen_on = parse_screen_on(power)
+    if screen_on is None and command == PROBE_COMMAND:
+        # No power lines at all: grep is probably missing, so dump everything
+        with _lock:
+            _unfiltered.add(device_id)
+        return _probe(device_id)
+
+    return DeviceState(
+        screen_on=bool(screen_on),
+        locked=parse_locked(window),
+        focus=parse_focus(window),
+        captured_at=time.monotonic(),
+    )
@@ -0,0 +1,393 @@
+"""Input injection through a long-lived server on the device."""
+
+import os
+import socket
+import struct
+import threading
+import time
+
+from phone_agent.adb.protocol import ADBProtocolError
+from phone_agent.adb.shell import get_server_client, push_file, run_shell
+
+# "shell": an `input`/`am` command per event; "injector": the on-device server
+INPUT_BACKENDS = ("shell", "injector")
+
+# Part of the socket name, so a server left running by an older version is
+# never spoken to; bump on any change to the messages below
+PROTOCOL_VERSION = 3
+SOCKET_NAME = f"open-autoglm-injector-{PROTOCOL_VERSION}"
+MAGIC = b"OAGI"
+
+SERVER_CLASS = "com.openautoglm.injector.Server"
+REMOTE_JAR = "/data/local/tmp/open-autoglm-injector.jar"
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+DEFAULT_JAR = os.path.join(_REPO_ROOT, "injector", "build", "open-autoglm-injector.jar")
+
+# Message types; every message is one type byte followed by big-endian fields
+MSG_PING = 0
+MSG_TAP = 1  # x: i32, y: i32
+MSG_SWIPE = 2  # x1, y1, x2, y2: i32, duration_ms: u32
+MSG_KEY = 3  # keycode: i32 (down and up)
+MSG_TEXT = 4  # length: u32, UTF-8 bytes
+MSG_CLEAR = 5  # select all (Ctrl+A) in the focused field, then delete
+
+# One-byte reply to every message, sent once the event has been injected
+STATUS_OK = 0
+STATUS_UNSUPPORTED = 1  # e.g. text with characters no key produces
+STATUS_ERROR = 2
+STATUS_PARTIAL = 3  # text typed only in part before an injection failed
+
+KEYCODES = {
+    "KEYCODE_HOME": 3,
+    "KEYCODE_BACK": 4,
+    "KEYCODE_POWER": 26,
+    "KEYCODE_ENTER": 66,
+    "KEYCODE_DEL": 67,
+    "KEYCODE_MENU": 82,
+    "KEYCODE_WAKEUP": 224,
+}
+
+# Seconds before retrying to start the server on a device where it failed
+RETRY_INTERVAL = 60.0
+
+_input_backend = os.getenv("PHONE_AGENT_INPUT_BACKEND", "shell")
+
+
+class InjectorError(RuntimeError):
+    """Raised when the injection server cannot be started or stops answering."""
+
+
+class PartialTextError(InjectorError):
+    """
+    Raised when only part of a text was typed before injection failed.
+
+    The typed part is already in the field, so the text must not be sent
+    again by other means.
+    """
+
+
+def encode_tap(x: int, y: int) -> bytes:
+    return struct.pack(">Bii", MSG_TAP, x, y)
+
+
+def encode_swipe(x1: int, y1: int, x2: int, y2: int, duration_ms: int) -> bytes:
+    return struct.pack(">BiiiiI", MSG_SWIPE, x1, y1, x2, y2, duration_ms)
+
+
+def encode_key(keycode: int) -> bytes:
+    return struct.pack(">Bi", MSG_KEY, keycode)
+
+
+def encode_text(text: str) -> bytes:
+    data = text.encode("utf-8")
+    return struct.pack(">BI", MSG_TEXT, len(data)) + data
+
+
+class InjectorClient:
+    """
+    Connection to the injection server on one device.
+
+    The server injects events straight into the input manager of an
+    `app_process` that stays running, so an event costs a socket round trip
+    instead of starting a JVM for every `input` command. Messages are sent
+    one at a time and each waits for its status byte.
+
+    Args:
+        sock: Connected stream to the server, e.g. from
+            ADBServerClient.open_stream().
+        timeout: Seconds to wait for a reply, on top of a swipe's duration.
+
+    Raises:
+        InjectorError: If the server does not greet with the expected
+            protocol version.
+    """
+
+    def __init__(self, sock: socket.socket, timeout: float = 10.0):
+        self._sock = sock
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.closed = False
+        sock.settimeout(timeout)
+        try:
+            hello = self._read_exact(len(MAGIC) + 1)
+        except (InjectorError, OSError):
+            self.close()
+            raise
+        if hello != MAGIC + bytes([PROTOCOL_VERSION]):
+            self.close()
+            raise InjectorError(f"Unexpected injector greeting: {hello!r}")
+
+    def ping(self) -> None:
+        """Check that the server is answering."""
+        self._call(bytes([MSG_PING]))
+
+    def tap(self, x: int, y: int) -> None:
+        self._call(encode_tap(x, y))
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int) -> None:
+        self._call(
+            encode_swipe(x1, y1, x2, y2, duration_ms),
+            self.timeout + duration_ms / 1000,
+        )
+
+    def key(self, keycode: int) -> None:
+        self._call(encode_key(keycode))
+
+    def text(self, text: str) -> bool:
+        """
+        Type text as key events.
+
+        Returns:
+            False, with nothing typed, if a character cannot be produced by
+            the device's virtual keyboard map (e.g. Chinese text).
+
+        Raises:
+            PartialTextError: If injection failed after part of the text was
+                typed.
+        """
+        return self._call(encode_text(text)) == STATUS_OK
+
+    def clear(self) -> None:
+        """Delete all text in the focused input field."""
+        self._call(bytes([MSG_CLEAR]))
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+    def _call(self, message: bytes, timeout: float | None = None) -> int:
+        """Send a message and return its status, closing the connection on failure."""
+        with self._lock:
+            try:
+                self._sock.settimeout(timeout or self.timeout)
+                self._sock.sendall(message)
+                status = self._read_exact(1)[0]
+            except OSError as e:
+                self.close()
+                raise InjectorError(f"Injector connection lost: {e}") from e
+            except InjectorError:
+                self.close()
+                raise
+        if status == STATUS_ERROR:
+            raise InjectorError(f"Injector failed to inject message {message[0]}")
+        if status == STATUS_PARTIAL:
+            raise PartialTextError("Injector typed only part of the text")
+        return status
+
+    def _read_exact(self, size: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < size:
+            data = self._sock.recv(size - len(buf))
+            if not data:
+                raise InjectorError("Injector closed the connection")
+            buf.extend(data)
+        return bytes(buf)
+
+
+def start_injector(
+    device_id: str | None = None, jar_path: str | None = None, timeout: float = 5.0
+) -> InjectorClient:
+    """
+    Connect to the injection server, pushing and starting it if needed.
+
+    The server is reached through the ADB server's `localabstract:` service,
+    so no port forward is set up. It keeps running between agent runs and
+    exits on its own after ten idle minutes.
+
+    Args:
+        device_id: Optional ADB device ID.
+        jar_path: Server jar built by injector/build.sh. Defaults to
+            $PHONE_AGENT_INJECTOR_JAR or injector/build/open-autoglm-injector.jar.
+        timeout: Seconds to wait for a started server to accept connections.
+
+    Returns:
+        Connected client.
+
+    Raises:
+        InjectorError: If the jar is missing or the server does not start.
+    """
+    try:
+        return _connect(device_id)
+    except (ADBProtocolError, InjectorError, OSError):
+        pass
+
+    jar_path = jar_path or os.getenv("PHONE_AGENT_INJECTOR_JAR", DEFAULT_JAR)
+    if not os.path.isfile(jar_path):
+        raise InjectorError(
+            f"Injector jar not found at {jar_path}; build it with injector/build.sh"
+        )
+    push_file(jar_path, REMOTE_JAR, device_id)
+    # nohup keeps the server alive when the shell that started it goes away
+    run_shell(
+        f"CLASSPATH={REMOTE_JAR} nohup app_process / {SERVER_CLASS} {SOCKET_NAME}"
+        " >/dev/null 2>&1 &",
+        device_id,
+    )
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return _connect(device_id)
+        except (ADBProtocolError, InjectorError, OSError) as e:
+            if time.monotonic() >= deadline:
+                raise InjectorError(f"Injector did not start: {e}") from e
+            time.sleep(0.1)
+
+
+def _connect(device_id: str | None) -> InjectorClient:
+    sock = get_server_client().open_stream(f"localabstract:{SOCKET_NAME}", device_id)
+    return InjectorClient(sock)
+
+
+def set_input_backend(backend: str) -> None:
+    """
+    Select how input events reach the device.
+
+    Like the ADB backend, this is a process-wide startup setting shared by
+    every agent and device.
+
+    Args:
+        backend: "shell" to run `input` and `am broadcast` for every event, or
+            "injector" for the persistent on-device server. Events the
+            injector cannot deliver fall back to the shell.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    global _input_backend
+    if backend not in INPUT_BACKENDS:
+        raise ValueError(
+            f"Unknown input backend: {backend} "
+            f"(expected one of {', '.join(INPUT_BACKENDS)})"
+        )
+    _input_backend = backend
+
+
+def get_input_backend() -> str:
+    """Get the name of the active input backend."""
+    return _input_backend
+
+
+_clients: dict[str | None, InjectorClient] = {}
+_failed_at: dict[str | None, float] = {}
+_device_locks: dict[str | None, threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def get_injector(device_id: str | None = None) -> InjectorClient | None:
+    """
+    Get the shared injector connection for a device, starting it on first use.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        The client, or None if the server could not be started recently.
+    """
+    with _lock:
+        client = _clients.get(device_id)
+        if client is not None:
+            return client
+        device_lock = _device_locks.setdefault(device_id, threading.Lock())
+
+    with device_lock:
+        with _lock:
+            client = _clients.get(device_id)
+            failed_at = _failed_at.get(device_id)
+        if client is not None:
+            return client
+        if failed_at is not None and time.monotonic() - failed_at < RETRY_INTERVAL:
+            return None
+
+        try:
+            client = start_injector(device_id)
+        except (ADBProtocolError, InjectorError, OSError) as e:
+            print(f"Warning: Input injector unavailable, using input commands: {e}")
+            with _lock:
+                _failed_at[device_id] = time.monotonic()
+            return None
+
+        with _lock:
+            _clients[device_id] = client
+            _failed_at.pop(device_id, None)
+        return client
+
+
+def close_injector(device_id: str | None = None) -> None:
+    """Close the connection to a device's injector; the server keeps running."""
+    with _lock:
+        client = _clients.pop(device_id, None)
+    if client is not None:
+        client.close()
+
+
+def inject_tap(x: int, y: int, device_id: str | None = None) -> bool:
+    """Tap through the injector. Returns False if the shell must be used instead."""
+    return _inject(device_id, "tap", x, y)
+
+
+def inject_swipe(
+    x1: int, y1: int, x2: int, y2: int, duration_ms: int, device_id: str | None = None
+) -> bool:
+    """Swipe through the injector. Returns False if the shell must be used instead."""
+    return _inject(device_id, "swipe", x1, y1, x2, y2, duration_ms)
+
+
+def inject_key(keycode: int | str, device_id: str | None = None) -> bool:
+    """
+    Press a key through the injector.
+
+    Args:
+        keycode: Key code, as a number ("4") or a name from KEYCODES.
+        device_id: Optional ADB device ID.
+
+    Returns:
+        False if the shell must be used instead, e.g. for an unknown key name.
+    """
+    if isinstance(keycode, str):
+        keycode = int(keycode) if keycode.isdigit() else KEYCODES.get(keycode)
+        if keycode is None:
+            return False
+    return _inject(device_id, "key", keycode)
+
+
+def inject_text(text: str, device_id: str | None = None) -> bool:
+    """
+    Type text through the injector.
+
+    Returns:
+        False if the shell must be used instead.
+
+    Raises:
+        PartialTextError: If part of the text was typed before a failure; the
+            shell must not type it again.
+    """
+    return _inject(device_id, "text", text)
+
+
+def inject_clear(device_id: str | None = None) -> bool:
+    """Clear the focused field through the injector. Returns False if not used."""
+    return _inject(device_id, "clear")
+
+
+def _inject(device_id: str | None, method: str, *args) -> bool:
+    if _input_backend != "injector":
+        return False
+    client = get_injector(device_id)
+    if client is None:
+        return False
+    try:
+        return getattr(client, method)(*args) is not False
+    except PartialTextError:
+        raise
+    except InjectorError as e:
+        print(f"Warning: {e}; falling back to input commands")
+        if client.closed:
+            # Reconnect, restarting the server if it died, on the next event
+            with _lock:
+                if _clients.get(device_id) is client:
+                    del _clients[device_id]
+        return False
@@ -1,9 +1,11 @@
 """Input utilities for Android device text input."""
 
 import base64
-import subprocess
 from typing import Optional
 
+from phone_agent.adb.injector import inject_clear, inject_text
+from phone_agent.adb.shell import run_shell
+
 
 def type_text(text: str, device_id: str | None = None) -> None:
     """
@@ -16,24 +18,22 @@ def type_text(text: str, device_id: str | None = None) -> None:
     Note:
         Requires ADB Keyboard to be installed on the device.
         See: https://github.com/nicnocquee/AdbKeyboard
+
+        With the injector input backend, text the virtual keyboard map can
+        produce (e.g. ASCII) is typed as key events instead of a broadcast.
+
+    Raises:
+        PartialTextError: If the injector typed only part of the text; it is
+            not broadcast again, which would duplicate the typed part.
     """
-    adb_prefix = _get_adb_prefix(device_id)
+    if text and inject_text(text, device_id):
+        return
+
     encoded_text = base64.b64encode(text.encode("utf-8")).decode("utf-8")
 
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
-            "am",
-            "broadcast",
-            "-a",
-            "ADB_INPUT_B64",
-            "--es",
-            "msg",
-            encoded_text,
-        ],
-        capture_output=True,
-        text=True,
+    run_shell(
+        ["am", "broadcast", "-a", "ADB_INPUT_B64", "--es", "msg", encoded_text],
+        device_id,
     )
 
 
@@ -43,14 +43,14 @@ def clear_text(device_id: str | None = None) -> None:
 
     Args:
         device_id: Optional ADB device ID for multi-device setups.
-    """
-    adb_prefix = _get_adb_prefix(device_id)
 
-    subprocess.run(
-        adb_prefix + ["shell", "am", "broadcast", "-a", "ADB_CLEAR_TEXT"],
-        capture_output=True,
-        text=True,
-    )
+    Note:
+        With the injector input backend, the text is selected with Ctrl+A
+        and deleted with key events instead of an ADB Keyboard broadcast.
+    """
+    if inject_clear(device_id):
+        return
+    run_shell(["am", "broadcast", "-a", "ADB_CLEAR_TEXT"], device_id)
 
 
 def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
@@ -63,23 +63,14 @@ def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
     Returns:
         The original keyboard IME identifier for later restoration.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
     # Get current IME
-    result = subprocess.run(
-        adb_prefix + ["shell", "settings", "get", "secure", "default_input_method"],
-        capture_output=True,
-        text=True,
-    )
-    current_ime = (result.stdout + result.stderr).strip()
+    current_ime = run_shell(
+        ["settings", "get", "secure", "default_input_method"], device_id
+    ).strip()
 
     # Switch to ADB Keyboard if not already set
     if "com.android.adbkeyboard/.AdbIME" not in current_ime:
-        subprocess.run(
-            adb_prefix + ["shell", "ime", "set", "com.android.adbkeyboard/.AdbIME"],
-            capture_output=True,
-            text=True,
-        )
+        run_shell(["ime", "set", "com.android.adbkeyboard/.AdbIME"], device_id)
 
     # Warm up the keyboard
     type_text("", device_id)
@@ -95,15 +86,4 @@ def restore_keyboard(ime: str, device_id: str | None = None) -> None:
         ime: The IME identifier to restore.
         device_id: Optional ADB device ID for multi-device setups.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "ime", "set", ime], capture_output=True, text=True
-    )
-
-
-def _get_adb_prefix(device_id: str | None) -> list:
-    """Get ADB command prefix with optional device specifier."""
-    if device_id:
-        return ["adb", "-s", device_id]
-    return ["adb"]
+    run_shell(["ime", "set", ime], device_id)
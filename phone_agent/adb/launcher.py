@@ -0,0 +1,232 @@
+"""App launch through cached launcher activities and `am start -W`."""
+
+import re
+import threading
+from dataclasses import dataclass
+
+from phone_agent.adb.device_state import invalidate_device_state
+from phone_agent.adb.shell import run_shell
+
+# Output of `am start -W`, e.g. "LaunchState: COLD" or "TotalTime: 812"
+_AM_FIELD_RE = re.compile(
+    r"^(Status|LaunchState|TotalTime|WaitTime): *(\S+)", re.MULTILINE
+)
+_COMPONENT_RE = re.compile(r"^[A-Za-z][\w.]*/[\w.$]+$")
+
+# A cold start can take several seconds on a slow device
+LAUNCH_TIMEOUT = 30
+
+
+@dataclass
+class LaunchResult:
+    """Outcome of launching an app."""
+
+    package: str
+    success: bool
+    # Activity started with `am start`, or None when monkey was used
+    component: str | None = None
+    # COLD, WARM or HOT as reported by Android 10+; HOT when an existing task
+    # was only brought to the front
+    launch_state: str | None = None
+    # Milliseconds until the first frame was drawn, as reported by `am start -W`
+    total_time_ms: int | None = None
+    wait_time_ms: int | None = None
+
+    @property
+    def drawn(self) -> bool:
+        """The app had drawn its first frame when the launch returned."""
+        return self.total_time_ms is not None
+
+
+@dataclass
+class LaunchStats:
+    """Launches of one app on one device."""
+
+    launches: int = 0
+    cold: int = 0
+    warm: int = 0
+    hot: int = 0
+    total_ms: int = 0
+    # Launches whose draw time was reported, i.e. the count behind total_ms
+    timed: int = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.timed if self.timed else 0.0
+
+
+_activities: dict[tuple[str | None, str], str] = {}
+_stats: dict[tuple[str | None, str], LaunchStats] = {}
+_lock = threading.Lock()
+
+
+def resolve_launcher_activity(
+    package: str, device_id: str | None = None, refresh: bool = False
+) -> str | None:
+    """
+    Get the component started by the package's launcher icon.
+
+    Resolved components are cached per device for the life of the process.
+
+    Args:
+        package: Android package name.
+        device_id: Optional ADB device ID.
+        refresh: Ignore the cached component and resolve again.
+
+    Returns:
+        Component such as "com.tencent.mm/.ui.LauncherUI", or None if the
+        package has no launcher activity or the device cannot resolve it
+        (`cmd package` needs Android 7).
+    """
+    key = (device_id, package)
+    if not refresh:
+        with _lock:
+            component = _activities.get(key)
+        if component is not None:
+            return component
+
+    output = run_shell(
+        [
+            "cmd",
+            "package",
+            "resolve-activity",
+            "--brief",
+            "-a",
+            "android.intent.action.MAIN",
+            "-c",
+            "android.intent.category.LAUNCHER",
+            package,
+        ],
+        device_id,
+        timeout=10,
+    )
+    lines = output.strip().splitlines()
+    component = lines[-1].strip() if lines else ""
+    if not _COMPONENT_RE.match(component):
+        # e.g. "No activity found"
+        return None
+
+    with _lock:
+        _activities[key] = component
+    return component
+
+
+def remember_launcher_activity(
+    package: str, component: str, device_id: str | None = None
+) -> None:
+    """Cache a launcher component found by other means, e.g. an app catalog."""
+    with _lock:
+        _activities[(device_id, package)] = component
+
+
+def launch_package(package: str, device_id: str | None = None) -> LaunchResult:
+    """
+    Launch an app and wait until it has drawn its first frame.
+
+    Starts the resolved launcher activity with `am start -W`, which returns
+    once the app is drawn, instead of spawning monkey and sleeping. A cached
+    component that no longer starts (e.g. after an app update) is resolved
+    again once; monkey is only used when no component resolves or starts.
+
+    Args:
+        package: Android package name.
+        device_id: Optional ADB device ID.
+
+    Returns:
+        LaunchResult with the reported launch state and draw time.
+    """
+    result = None
+    component = resolve_launcher_activity(package, device_id)
+    if component is not None:
+        result = _am_start(package, component, device_id)
+        if not result.success:
+            refreshed = resolve_launcher_activity(package, device_id, refresh=True)
+            result = None
+            if refreshed is not None:
+                result = _am_start(package, refreshed, device_id)
+
+    if result is None or not result.success:
+        output = run_shell(
+            ["monkey", "-p", package, "-c", "android.intent.category.LAUNCHER", "1"],
+            device_id,
+        )
+        # e.g. "No activities found to run, monkey aborted." when not installed
+        result = LaunchResult(package=package, success="aborted" not in output)
+
+    invalidate_device_state(device_id)
+    _record(device_id, result)
+    return result
+
+
+def get_launch_stats(device_id: str | None = None) -> dict[str, LaunchStats]:
+    """
+    Get launch counts and times per package for a device.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        Copy of the stats, keyed by package name.
+    """
+    with _lock:
+        return {
+            package: LaunchStats(**vars(stats))
+            for (device, package), stats in _stats.items()
+            if device == device_id
+        }
+
+
+def _am_start(package: str, component: str, device_id: str | None) -> LaunchResult:
+    # MAIN/LAUNCHER makes an existing task come to the front as from the icon
+    output = run_shell(
+        [
+            "am",
+            "start",
+            "-W",
+            "-a",
+            "android.intent.action.MAIN",
+            "-c",
+            "android.intent.category.LAUNCHER",
+            "-n",
+            component,
+        ],
+        device_id,
+        timeout=LAUNCH_TIMEOUT,
+    )
+    fields = dict(_AM_FIELD_RE.findall(output))
+    if "Error" in output or fields.get("Status") not in ("ok", "timeout"):
+        return LaunchResult(package=package, success=False, component=component)
+
+    launch_state = fields.get("LaunchState")
+    if launch_state not in ("COLD", "WARM", "HOT"):
+        launch_state = "HOT" if "brought to the front" in output else None
+    return LaunchResult(
+        package=package,
+        success=True,
+        component=component,
+        launch_state=launch_state,
+        total_time_ms=_to_int(fields.get("TotalTime")),
+        wait_time_ms=_to_int(fields.get("WaitTime")),
+    )
+
+
+def _record(device_id: str | None, result: LaunchResult) -> None:
+    with _lock:
+        stats = _stats.setdefault((device_id, result.package), LaunchStats())
+        stats.launches += 1
+        if result.launch_state == "COLD":
+            stats.cold += 1
+        elif result.launch_state == "WARM":
+            stats.warm += 1
+        elif result.launch_state == "HOT":
+            stats.hot += 1
+        if result.total_time_ms is not None:
+            stats.total_ms += result.total_time_ms
+            stats.timed += 1
+
+
+def _to_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
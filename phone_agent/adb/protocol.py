@@ -0,0 +1,254 @@
+"""Pure-Python client for the ADB host wire protocol."""
+
+import os
+import socket
+import struct
+import time
+
+
+class ADBProtocolError(RuntimeError):
+    """Raised when the ADB server rejects a request or sends malformed data."""
+
+
+class ADBServerClient:
+    """
+    Talks to the local ADB server over TCP instead of spawning `adb` processes.
+
+    Every service request opens a short-lived socket to the server, which is
+    far cheaper than forking an adb client. Supports the `host:`, `shell:`,
+    `exec:` and `sync:` services, and raw streams to other device services.
+
+    Args:
+        host: ADB server host. Defaults to $ANDROID_ADB_SERVER_ADDRESS or 127.0.0.1.
+        port: ADB server port. Defaults to $ANDROID_ADB_SERVER_PORT or 5037.
+        timeout: Socket timeout in seconds.
+
+    Example:
+        >>> client = ADBServerClient()
+        >>> client.devices()
+        'emulator-5554\\tdevice product:sdk model:sdk_phone device:generic\\n'
+        >>> client.shell("getprop ro.product.model", "emulator-5554")
+        'sdk_phone\\n'
+    """
+
+    def __init__(
+        self, host: str | None = None, port: int | None = None, timeout: float = 10.0
+    ):
+        self.host = host or os.getenv("ANDROID_ADB_SERVER_ADDRESS", "127.0.0.1")
+        self.port = port or int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037"))
+        self.timeout = timeout
+
+    def version(self) -> int:
+        """Get the ADB server protocol version."""
+        with self._connect() as sock:
+            self._request(sock, "host:version")
+            return int(self._read_length_prefixed(sock), 16)
+
+    def devices(self, long: bool = True) -> str:
+        """
+        List devices known to the server.
+
+        Args:
+            long: Include device properties, like `adb devices -l`.
+
+        Returns:
+            Device listing text, one device per line (no header).
+        """
+        with self._connect() as sock:
+            self._request(sock, "host:devices-l" if long else "host:devices")
+            return self._read_length_prefixed(sock)
+
+    def shell(
+        self, command: str, serial: str | None = None, timeout: float | None = None
+    ) -> str:
+        """
+        Run a shell command and return its combined output as text.
+
+        Args:
+            command: Shell command line.
+            serial: Device serial. If None, uses the only connected device.
+            timeout: Socket timeout in seconds for this command.
+
+        Returns:
+            Command output.
+        """
+        data = self._run_service(f"shell:{command}", serial, timeout)
+        return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+    def exec_out(
+        self, command: str, serial: str | None = None, timeout: float | None = None
+    ) -> bytes:
+        """
+        Run a command and return its raw stdout, with no pty translation.
+
+        Args:
+            command: Command line.
+            serial: Device serial. If None, uses the only connected device.
+            timeout: Socket timeout in seconds for this command.
+
+        Returns:
+            Raw stdout bytes.
+        """
+        return self._run_service(f"exec:{command}", serial, timeout)
+
+    def pull(
+        self, remote_path: str, serial: str | None = None, timeout: float | None = None
+    ) -> bytes:
+        """
+        Read a file from the device using the sync service.
+
+        Args:
+            remote_path: Path on the device.
+            serial: Device serial. If None, uses the only connected device.
+            timeout: Socket timeout in seconds.
+
+        Returns:
+            File contents.
+        """
+        with self._connect(timeout) as sock:
+            self._select_transport(sock, serial)
+            self._request(sock, "sync:")
+
+            path = remote_path.encode("utf-8")
+            sock.sendall(b"RECV" + struct.pack("<I", len(path)) + path)
+
+            chunks = []
+            while True:
+                chunk_id, length = struct.unpack("<4sI", self._read_exact(sock, 8))
+                if chunk_id == b"DATA":
+                    chunks.append(self._read_exact(sock, length))
+                elif chunk_id == b"DONE":
+                    break
+                elif chunk_id == b"FAIL":
+                    message = self._read_exact(sock, length).decode("utf-8", "replace")
+                    raise ADBProtocolError(f"Pull failed: {message}")
+                else:
+                    raise ADBProtocolError(f"Unexpected sync response: {chunk_id!r}")
+
+            sock.sendall(b"QUIT" + struct.pack("<I", 0))
+            return b"".join(chunks)
+
+    def push(
+        self,
+        data: bytes,
+        remote_path: str,
+        serial: str | None = None,
+        mode: int = 0o644,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Write a file to the device using the sync service.
+
+        Args:
+            data: File contents.
+            remote_path: Path on the device.
+            serial: Device serial. If None, uses the only connected device.
+            mode: Permission bits of the file.
+            timeout: Socket timeout in seconds.
+        """
+        with self._connect(timeout) as sock:
+            self._select_transport(sock, serial)
+            self._request(sock, "sync:")
+
+            target = f"{remote_path},{mode}".encode("utf-8")
+            sock.sendall(b"SEND" + struct.pack("<I", len(target)) + target)
+            for start in range(0, len(data), 65536):
+                chunk = data[start : start + 65536]
+                sock.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+            sock.sendall(b"DONE" + struct.pack("<I", int(time.time())))
+
+            status, length = struct.unpack("<4sI", self._read_exact(sock, 8))
+            if status == b"FAIL":
+                message = self._read_exact(sock, length).decode("utf-8", "replace")
+                raise ADBProtocolError(f"Push failed: {message}")
+            if status != b"OKAY":
+                raise ADBProtocolError(f"Unexpected sync response: {status!r}")
+            sock.sendall(b"QUIT" + struct.pack("<I", 0))
+
+    def open_stream(
+        self, service: str, serial: str | None = None, timeout: float | None = None
+    ) -> socket.socket:
+        """
+        Open a device service and hand over its socket.
+
+        Useful for long-lived services such as `localabstract:<name>`, which
+        connects to a UNIX socket on the device without an `adb forward`.
+
+        Args:
+            service: Device service, e.g. "localabstract:scrcpy".
+            serial: Device serial. If None, uses the only connected device.
+            timeout: Socket timeout in seconds.
+
+        Returns:
+            Connected socket; the caller must close it.
+        """
+        sock = self._connect(timeout)
+        try:
+            self._select_transport(sock, serial)
+            self._request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _run_service(
+        self, service: str, serial: str | None, timeout: float | None
+    ) -> bytes:
+        """Open a device service and read its stream until the device closes it."""
+        with self._connect(timeout) as sock:
+            self._select_transport(sock, serial)
+            self._request(sock, service)
+
+            chunks = []
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                chunks.append(data)
+            return b"".join(chunks)
+
+    def _connect(self, timeout: float | None = None) -> socket.socket:
+        """Open a socket to the ADB server."""
+        try:
+            return socket.create_connection(
+                (self.host, self.port), timeout=timeout or self.timeout
+            )
+        except OSError as e:
+            raise ADBProtocolError(
+                f"Cannot reach ADB server at {self.host}:{self.port}: {e}"
+            ) from e
+
+    def _select_transport(self, sock: socket.socket, serial: str | None) -> None:
+        """Switch the connection to the given device."""
+        if serial:
+            self._request(sock, f"host:transport:{serial}")
+        else:
+            self._request(sock, "host:transport-any")
+
+    def _request(self, sock: socket.socket, payload: str) -> None:
+        """Send a length-prefixed request and wait for OKAY."""
+        data = payload.encode("utf-8")
+        sock.sendall(f"{len(data):04x}".encode("ascii") + data)
+
+        status = self._read_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise ADBProtocolError(self._read_length_prefixed(sock))
+        raise ADBProtocolError(f"Unexpected ADB server status: {status!r}")
+
+    def _read_length_prefixed(self, sock: socket.socket) -> str:
+        """Read a 4-hex-digit length followed by that many bytes."""
+        length = int(self._read_exact(sock, 4), 16)
+        return self._read_exact(sock, length).decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _read_exact(sock: socket.socket, size: int) -> bytes:
+        """Read exactly `size` bytes from the socket."""
+        buf = bytearray()
+        while len(buf) < size:
+            data = sock.recv(size - len(buf))
+            if not data:
+                raise ADBProtocolError("ADB server closed the connection")
+            buf.extend(data)
+        return bytes(buf)
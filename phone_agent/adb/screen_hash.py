@@ -0,0 +1,116 @@
+"""Perceptual hashing of screenshots and detection of unchanged or repeated screens."""
+
+from collections import deque
+from dataclasses import dataclass
+
+from PIL import Image
+
+# The hash compares neighbouring cells of a HASH_SIZE grid: 512 bits
+HASH_SIZE = 16
+
+# Hashes at most this many bits apart are treated as the same screen
+# (absorbs status bar clock ticks and cursor blinks)
+DEFAULT_MAX_DISTANCE = 6
+
+
+def compute_dhash(image: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """
+    Compute the difference hash (dHash) of an image.
+
+    The image is reduced to a (hash_size + 1) square grayscale grid and each
+    bit records whether a cell is brighter than its right neighbour, then
+    whether it is brighter than the cell below, so the hash ignores scaling
+    and small color shifts but follows both horizontal and vertical layout.
+
+    Args:
+        image: Image to hash.
+        hash_size: Grid size; the hash has 2 * hash_size ** 2 bits.
+
+    Returns:
+        The hash as an integer.
+    """
+    grid = hash_size + 1
+    # Converting to grayscale first keeps the box filter on one channel
+    pixels = image.convert("L").resize((grid, grid), Image.Resampling.BOX).tobytes()
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            cell = pixels[row * grid + col]
+            value = (value << 1) | (cell > pixels[row * grid + col + 1])
+            value = (value << 1) | (cell > pixels[(row + 1) * grid + col])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+@dataclass
+class ScreenChange:
+    """How the current screen relates to the ones seen before it."""
+
+    # Bits differing from the previous screen, or None for the first screen
+    distance: int | None
+    # The previous action left the screen visibly unchanged
+    unchanged: bool
+    # Earlier screens in the window that look the same as this one
+    revisits: int
+
+    @property
+    def looping(self) -> bool:
+        """The agent has come back to this screen at least twice before."""
+        return self.revisits >= 2
+
+
+class ScreenTracker:
+    """
+    Track screen hashes across steps to spot actions that did nothing and loops.
+
+    Args:
+        max_distance: Hashes at most this many bits apart count as equal.
+        window: Number of recent screens checked for revisits.
+
+    Example:
+        >>> tracker = ScreenTracker()
+        >>> change = tracker.observe(screenshot.dhash)
+        >>> if change.unchanged:
+        ...     print("The last action had no visible effect")
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE, window: int = 10):
+        self.max_distance = max_distance
+        self._history: deque[int] = deque(maxlen=window)
+
+    def observe(self, screen_hash: int) -> ScreenChange:
+        """
+        Record the screen of a new step.
+
+        Args:
+            screen_hash: dHash of the step's screenshot.
+
+        Returns:
+            ScreenChange relative to the previous screens.
+        """
+        distance = None
+        if self._history:
+            distance = hamming_distance(self._history[-1], screen_hash)
+
+        # The immediately preceding screen is covered by `unchanged`
+        earlier = list(self._history)[:-1]
+        revisits = sum(
+            1
+            for previous in earlier
+            if hamming_distance(previous, screen_hash) <= self.max_distance
+        )
+
+        self._history.append(screen_hash)
+        return ScreenChange(
+            distance=distance,
+            unchanged=distance is not None and distance <= self.max_distance,
+            revisits=revisits,
+        )
+
+    def reset(self) -> None:
+        """Forget all screens, e.g. when a new task starts."""
+        self._history.clear()
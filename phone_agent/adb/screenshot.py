@@ -2,108 +2,318 @@
 
 import base64
 import os
-import subprocess
+import struct
 import tempfile
 import uuid
-from dataclasses import dataclass
+import zlib
+from dataclasses import dataclass, field
 from io import BytesIO
-from typing import Tuple
+from typing import Any
 
 from PIL import Image
 
+from phone_agent.adb.screen_hash import compute_dhash
+from phone_agent.adb.shell import exec_out, pull_file, run_shell
+from phone_agent.timing import span
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Android PixelFormat values emitted by `screencap` -> (bytes per pixel, PIL raw mode)
+RAW_PIXEL_FORMATS: dict[int, tuple[int, str]] = {
+    1: (4, "RGBA"),  # RGBA_8888
+    2: (4, "RGBX"),  # RGBX_8888
+    3: (3, "RGB"),  # RGB_888
+    5: (4, "BGRA"),  # BGRA_8888
+}
+
+# exec-out keeps no exit status, so a failed capture (e.g. a secure screen)
+# writes its error and a "Failed" line to stdout on every backend
+_REPORT_FAILURE = ' 2>&1 || echo "Failed: screencap exited with status $?"'
+
 
 @dataclass
 class Screenshot:
-    """Represents a captured screenshot."""
+    """
+    Represents a captured screenshot.
+
+    A screenshot holds either the PNG produced on the device or the raw
+    framebuffer pixels. Encoded forms are produced lazily on first access.
+    """
 
-    base64_data: str
     width: int
     height: int
     is_sensitive: bool = False
+    png_data: bytes | None = None
+    raw_data: memoryview | None = None
+    raw_format: int = 1
+    _base64_cache: dict[tuple[str, int], str] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _dhash: int | None = field(default=None, repr=False, compare=False)
+    _digest: int | None = field(default=None, repr=False, compare=False)
+    _image: Image.Image | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def dhash(self) -> int:
+        """
+        Perceptual hash of the screen, computed once and cached.
+
+        Nearly identical screens have hashes a few bits apart; see
+        screen_hash.hamming_distance(). Raw captures are hashed in place in a
+        few milliseconds. PNG cannot be decoded at reduced size, so PNG
+        captures cost a full decode, which is shared with to_image().
+        """
+        if self._dhash is None:
+            self._dhash = compute_dhash(self.to_image())
+        return self._dhash
+
+    @property
+    def digest(self) -> int:
+        """Checksum of the exact screen contents, computed once and cached."""
+        if self._digest is None:
+            self._digest = zlib.crc32(self._data)
+        return self._digest
+
+    def same_content(self, other: "Screenshot") -> bool:
+        """
+        Check whether two screenshots show exactly the same pixels.
+
+        Args:
+            other: Screenshot to compare with.
+
+        Returns:
+            True if both have the same size and contents.
+        """
+        return (
+            self.width == other.width
+            and self.height == other.height
+            and self.raw_format == other.raw_format
+            and (self.raw_data is None) == (other.raw_data is None)
+            and self.digest == other.digest
+            and self._data == other._data
+        )
+
+    @property
+    def _data(self) -> bytes | memoryview:
+        return self.png_data if self.raw_data is None else self.raw_data
+
+    @property
+    def base64_data(self) -> str:
+        """Base64-encoded PNG of the screenshot."""
+        return self.to_base64("PNG")
+
+    @property
+    def pixels(self) -> memoryview:
+        """
+        Raw pixel buffer in the device's pixel format, without copying.
+
+        Raises:
+            ValueError: If the screenshot was captured as PNG.
+        """
+        if self.raw_data is None:
+            raise ValueError("Screenshot has no raw pixel data (captured as PNG)")
+        return self.raw_data
+
+    def to_numpy(self) -> Any:
+        """
+        Get the pixels as a read-only (height, width, channels) numpy array.
+
+        For raw captures this is a view over the received buffer, not a copy.
+
+        Returns:
+            numpy.ndarray of dtype uint8.
+        """
+        import numpy as np
+
+        if self.raw_data is None:
+            return np.asarray(self.to_image())
+
+        bytes_per_pixel = RAW_PIXEL_FORMATS[self.raw_format][0]
+        return np.frombuffer(self.raw_data, dtype=np.uint8).reshape(
+            self.height, self.width, bytes_per_pixel
+        )
+
+    def to_image(self) -> Image.Image:
+        """Decode the screenshot into a PIL image, decoding a PNG only once."""
+        if self.raw_data is None:
+            if self._image is None:
+                self._image = Image.open(BytesIO(self.png_data))
+                self._image.load()
+            return self._image
+
+        size = (self.width, self.height)
+        raw_mode = RAW_PIXEL_FORMATS[self.raw_format][1]
+        if raw_mode in ("RGB", "RGBX"):
+            return Image.frombytes("RGB", size, self.raw_data, "raw", raw_mode)
+        # RGBA-family buffers can be mapped without copying
+        return Image.frombuffer("RGBA", size, self.raw_data, "raw", raw_mode, 0, 1)
+
+    def to_bytes(self, format: str = "PNG", quality: int = 85) -> bytes:
+        """
+        Encode the screenshot.
+
+        Args:
+            format: Image format, "PNG", "JPEG" or "WEBP".
+            quality: Encoder quality for lossy formats.
+
+        Returns:
+            Encoded image bytes.
+        """
+        format = format.upper()
+        if format == "PNG" and self.png_data is not None:
+            return self.png_data
+
+        img = self.to_image()
+        if format == "JPEG" and img.mode != "RGB":
+            img = img.convert("RGB")
+
+        buffered = BytesIO()
+        img.save(buffered, format=format, quality=quality)
+        return buffered.getvalue()
+
+    def to_base64(self, format: str = "PNG", quality: int = 85) -> str:
+        """
+        Encode the screenshot as base64, caching the result per format.
 
+        Args:
+            format: Image format, "PNG", "JPEG" or "WEBP".
+            quality: Encoder quality for lossy formats.
 
-def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
+        Returns:
+            Base64-encoded image.
+        """
+        key = (format.upper(), quality)
+        if key not in self._base64_cache:
+            self._base64_cache[key] = base64.b64encode(
+                self.to_bytes(format, quality)
+            ).decode("utf-8")
+        return self._base64_cache[key]
+
+
+def get_screenshot(
+    device_id: str | None = None, timeout: int = 10, mode: str = "stream"
+) -> Screenshot:
     """
     Capture a screenshot from the connected Android device.
 
     Args:
         device_id: Optional ADB device ID for multi-device setups.
         timeout: Timeout in seconds for screenshot operations.
+        mode: Capture mode. "stream" reads `screencap -p` output straight from
+            the device's stdout into memory; "raw" does the same without
+            on-device PNG compression and keeps the framebuffer pixels;
+            "pull" writes the PNG to device storage and pulls it (for devices
+            where exec-out is unreliable).
 
     Returns:
-        Screenshot object containing base64 data and dimensions.
+        Screenshot object containing image data and dimensions.
 
     Note:
         If the screenshot fails (e.g., on sensitive screens like payment pages),
         a black fallback image is returned with is_sensitive=True.
     """
-    temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
-    adb_prefix = _get_adb_prefix(device_id)
-
     try:
-        # Execute screenshot command
-        result = subprocess.run(
-            adb_prefix + ["shell", "screencap", "-p", "/sdcard/tmp.png"],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
+        if mode == "raw":
+            with span("screencap"):
+                data = exec_out(f"screencap{_REPORT_FAILURE}", device_id, timeout)
+            screenshot = parse_raw_screencap(data)
+            if screenshot is not None:
+                return screenshot
+        elif mode == "stream":
+            with span("screencap"):
+                data = exec_out(f"screencap -p{_REPORT_FAILURE}", device_id, timeout)
+        elif mode == "pull":
+            data = _capture_via_pull(device_id, timeout)
+        else:
+            raise ValueError(f"Unknown screenshot mode: {mode}")
 
-        # Check for screenshot failure (sensitive screen)
-        output = result.stdout + result.stderr
-        if "Status: -1" in output or "Failed" in output:
-            return _create_fallback_screenshot(is_sensitive=True)
-
-        # Pull screenshot to local temp path
-        subprocess.run(
-            adb_prefix + ["pull", "/sdcard/tmp.png", temp_path],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-
-        if not os.path.exists(temp_path):
+        if not data.startswith(PNG_SIGNATURE):
+            # Check for screenshot failure (sensitive screen)
+            output = data.decode("utf-8", errors="replace")
+            if "Status: -1" in output or "Failed" in output:
+                return _create_fallback_screenshot(is_sensitive=True)
             return _create_fallback_screenshot(is_sensitive=False)
 
-        # Read and encode image
-        img = Image.open(temp_path)
-        width, height = img.size
-
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-        # Cleanup
-        os.remove(temp_path)
-
-        return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
-        )
+        # The PNG is forwarded as-is; dimensions come from the IHDR chunk
+        width, height = struct.unpack(">II", data[16:24])
+        return Screenshot(width=width, height=height, is_sensitive=False, png_data=data)
 
     except Exception as e:
         print(f"Screenshot error: {e}")
         return _create_fallback_screenshot(is_sensitive=False)
 
 
-def _get_adb_prefix(device_id: str | None) -> list:
-    """Get ADB command prefix with optional device specifier."""
-    if device_id:
-        return ["adb", "-s", device_id]
-    return ["adb"]
+def parse_raw_screencap(data: bytes) -> Screenshot | None:
+    """
+    Parse the output of `screencap` without `-p`.
+
+    The output is a little-endian header of width, height and pixel format
+    (plus a color space word since Android 10) followed by the pixels.
+
+    Args:
+        data: Raw screencap output.
+
+    Returns:
+        Screenshot viewing the pixels in place, or None if the data is not
+        a raw framebuffer dump.
+    """
+    if len(data) < 12:
+        return None
+
+    width, height, pixel_format = struct.unpack_from("<III", data)
+    if pixel_format not in RAW_PIXEL_FORMATS:
+        return None
+
+    bytes_per_pixel = RAW_PIXEL_FORMATS[pixel_format][0]
+    header_size = len(data) - width * height * bytes_per_pixel
+    if header_size not in (12, 16):
+        return None
+
+    return Screenshot(
+        width=width,
+        height=height,
+        is_sensitive=False,
+        raw_data=memoryview(data)[header_size:],
+        raw_format=pixel_format,
+    )
+
+
+def _capture_via_pull(device_id: str | None, timeout: int) -> bytes:
+    """Capture to device storage and pull the file, using a per-call path."""
+    name = f"screenshot_{uuid.uuid4().hex}.png"
+    remote_path = f"/data/local/tmp/{name}"
+    temp_path = os.path.join(tempfile.gettempdir(), name)
+
+    try:
+        with span("screencap"):
+            output = run_shell(["screencap", "-p", remote_path], device_id, timeout)
+        if "Status: -1" in output or "Failed" in output:
+            return output.encode("utf-8")
+
+        with span("pull"):
+            pull_file(remote_path, temp_path, device_id, timeout=5)
+        if not os.path.exists(temp_path):
+            return b""
+
+        with open(temp_path, "rb") as f:
+            return f.read()
+    finally:
+        run_shell(["rm", "-f", remote_path], device_id)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
 
 def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
     """Create a black fallback image when screenshot fails."""
     default_width, default_height = 1080, 2400
 
-    black_img = Image.new("RGB", (default_width, default_height), color="black")
-    buffered = BytesIO()
-    black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    # All-zero RGBX pixels; only encoded if something asks for it
+    black_pixels = bytes(default_width * default_height * 4)
 
     return Screenshot(
-        base64_data=base64_data,
         width=default_width,
         height=default_height,
         is_sensitive=is_sensitive,
+        raw_data=memoryview(black_pixels),
+        raw_format=2,
     )
@@ -0,0 +1,116 @@
+"""Adaptive detection of when the screen has stopped changing after an action."""
+
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from phone_agent.adb.shell import run_shell
+
+# Hash the raw framebuffer on the device so only a digest crosses the wire
+FRAME_HASH_COMMAND = "screencap | md5sum"
+
+
+@dataclass
+class SettleConfig:
+    """Configuration for post-action settle detection."""
+
+    enabled: bool = True
+    stable_ms: int = 300
+    poll_interval_ms: int = 100
+    min_wait_ms: int = 100
+    # Never wait longer than the fixed 1s delay this replaces
+    timeout_ms: int = 1000
+
+
+def get_frame_hash(device_id: str | None = None) -> str:
+    """
+    Get a cheap digest of the current screen contents.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        Hex digest of the raw framebuffer, or an empty string on failure.
+    """
+    output = run_shell(FRAME_HASH_COMMAND, device_id, timeout=5)
+    parts = output.split()
+    if not parts or not _is_md5_digest(parts[0]):
+        # e.g. screencap refused on a secure window, or no md5sum on the device
+        return ""
+    return parts[0]
+
+
+def wait_for_settle(
+    device_id: str | None = None,
+    config: SettleConfig | None = None,
+    timeout_ms: int | None = None,
+    fallback_delay: float | None = None,
+    on_stable: Callable[[bool], None] | None = None,
+) -> float:
+    """
+    Block until the screen has been unchanged for `stable_ms`.
+
+    Args:
+        device_id: Optional ADB device ID.
+        config: Settle configuration. Defaults to SettleConfig().
+        timeout_ms: Override for the ceiling on how long to wait.
+        fallback_delay: Seconds to wait in total when the screen cannot be
+            hashed (e.g. a FLAG_SECURE window or no md5sum on the device).
+            Defaults to the ceiling.
+        on_stable: Called with True when a frame first repeats, i.e. the
+            screen may have settled, and with False if it changes again or
+            the wait ends without confirming it (timeout or fallback), so
+            the caller can start capturing while stability is confirmed.
+
+    Returns:
+        Seconds spent waiting.
+    """
+    config = config or SettleConfig()
+    timeout_s = (timeout_ms if timeout_ms is not None else config.timeout_ms) / 1000
+    start = time.monotonic()
+    deadline = start + timeout_s
+    fallback_deadline = start + (
+        fallback_delay if fallback_delay is not None else timeout_s
+    )
+
+    time.sleep(min(config.min_wait_ms / 1000, timeout_s))
+
+    last_hash = None
+    stable = False
+    settled = False
+    stable_since = time.monotonic()
+    while time.monotonic() < deadline:
+        try:
+            frame_hash = get_frame_hash(device_id)
+        except Exception:
+            frame_hash = ""
+        if not frame_hash:
+            # Settling cannot be observed; behave like the fixed delay
+            time.sleep(max(0.0, fallback_deadline - time.monotonic()))
+            break
+
+        now = time.monotonic()
+        if frame_hash != last_hash:
+            last_hash = frame_hash
+            stable_since = now
+            if stable:
+                stable = False
+                on_stable(False)
+        elif (now - stable_since) * 1000 >= config.stable_ms:
+            settled = True
+            break
+        elif not stable and on_stable is not None:
+            stable = True
+            on_stable(True)
+
+        time.sleep(min(config.poll_interval_ms / 1000, max(0.0, deadline - now)))
+
+    if stable and not settled:
+        # A capture taken on that repeated frame may show a screen in motion
+        on_stable(False)
+    return time.monotonic() - start
+
+
+def _is_md5_digest(value: str) -> bool:
+    """Check whether a string looks like an md5 hex digest."""
+    return len(value) == 32 and all(c in "0123456789abcdef" for c in value)
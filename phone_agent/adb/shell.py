@@ -0,0 +1,421 @@
+"""Persistent ADB shell sessions for low-latency command execution."""
+
+import atexit
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+
+from phone_agent.adb.protocol import ADBServerClient
+
+# "adb": persistent `adb shell` sessions; "native": talk to the ADB server directly
+ADB_BACKENDS = ("adb", "native")
+
+_backend = os.getenv("PHONE_AGENT_ADB_BACKEND", "adb")
+_server_client: ADBServerClient | None = None
+
+
+class ShellNotSentError(ConnectionError):
+    """Raised when a shell session closed before a command was written to it."""
+
+
+class ShellSession:
+    """
+    A long-lived `adb shell` process that commands are written into.
+
+    Each command is followed by an `echo` of a unique marker and the exit
+    status, so its output can be read back without spawning a new adb client.
+
+    Args:
+        device_id: Optional ADB device ID.
+        adb_path: Path to ADB executable.
+    """
+
+    def __init__(self, device_id: str | None = None, adb_path: str = "adb"):
+        self.device_id = device_id
+        self.adb_path = adb_path
+        self._process: subprocess.Popen | None = None
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        self._marker = f"__PHONE_AGENT_{uuid.uuid4().hex}__"
+
+    def start(self) -> None:
+        """Start the underlying `adb shell` process."""
+        self.close()
+        cmd = [self.adb_path]
+        if self.device_id:
+            cmd.extend(["-s", self.device_id])
+        cmd.append("shell")
+
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._read_output,
+            args=(self._process, self._lines),
+            daemon=True,
+        ).start()
+
+    def is_alive(self) -> bool:
+        """Check whether the shell process is still running."""
+        return self._process is not None and self._process.poll() is None
+
+    def run(self, command: str, timeout: float = 10.0) -> str:
+        """
+        Run a command in the session and return its combined output.
+
+        Args:
+            command: Shell command line to execute on the device.
+            timeout: Timeout in seconds waiting for the command to finish.
+
+        Returns:
+            Combined stdout and stderr of the command.
+
+        Raises:
+            subprocess.TimeoutExpired: If the command does not finish in time.
+            ShellNotSentError: If the session was closed before the command
+                could be written, so it never ran.
+            ConnectionError: If the shell session dies while running the command.
+        """
+        return self.run_with_status(command, timeout)[0]
+
+    def run_with_status(
+        self, command: str, timeout: float = 10.0
+    ) -> tuple[str, int | None]:
+        """
+        Run a command in the session and return its output and exit status.
+
+        Args:
+            command: Shell command line to execute on the device.
+            timeout: Timeout in seconds for the whole command, however often
+                it prints.
+
+        Returns:
+            Combined stdout and stderr of the command, and its exit status
+            (None if the status line could not be parsed).
+
+        Raises:
+            subprocess.TimeoutExpired: If the command does not finish in time.
+            ShellNotSentError: If the session was closed before the command
+                could be written, so it never ran.
+            ConnectionError: If the shell session dies while running the command.
+        """
+        if not self.is_alive():
+            self.start()
+
+        try:
+            self._process.stdin.write(
+                f"{{ {command}\n}} 2>&1; echo {self._marker}$?\n".encode("utf-8")
+            )
+            self._process.stdin.flush()
+        except OSError as e:
+            self.close()
+            raise ShellNotSentError(f"ADB shell session closed: {e}") from e
+
+        deadline = time.monotonic() + timeout
+        output = []
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                # The session state is unknown now, so drop it entirely
+                self.close()
+                raise subprocess.TimeoutExpired(command, timeout)
+
+            if line is None:
+                self.close()
+                raise ConnectionError("ADB shell session closed unexpectedly")
+
+            if self._marker in line:
+                # Output without a trailing newline shares the marker line
+                before, status = line.split(self._marker, 1)
+                output.append(before)
+                status = status.strip()
+                return "".join(output), int(status) if status.isdigit() else None
+
+            output.append(line)
+
+    def close(self) -> None:
+        """Terminate the shell process."""
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        self._process = None
+
+    @staticmethod
+    def _read_output(process: subprocess.Popen, lines: queue.Queue) -> None:
+        """Forward output lines of the shell process into a queue."""
+        for raw in iter(process.stdout.readline, b""):
+            lines.put(raw.decode("utf-8", errors="replace").replace("\r\n", "\n"))
+        lines.put(None)
+
+
+class ShellSessionPool:
+    """
+    A small pool of shell sessions for a single device.
+
+    Sessions are created lazily up to `max_size`, so concurrent callers
+    (e.g. screenshot and foreground-app detection) do not serialize on one shell.
+
+    Args:
+        device_id: Optional ADB device ID.
+        max_size: Maximum number of concurrent sessions.
+        adb_path: Path to ADB executable.
+    """
+
+    def __init__(
+        self, device_id: str | None = None, max_size: int = 2, adb_path: str = "adb"
+    ):
+        self.device_id = device_id
+        self.max_size = max_size
+        self.adb_path = adb_path
+        self._idle: queue.LifoQueue[ShellSession] = queue.LifoQueue()
+        self._sessions: list[ShellSession] = []
+        self._lock = threading.Lock()
+
+    def run(self, command: str, timeout: float = 10.0) -> str:
+        """
+        Run a command on an idle session, reconnecting once if the session died.
+
+        Args:
+            command: Shell command line to execute on the device.
+            timeout: Timeout in seconds waiting for the command to finish.
+
+        Returns:
+            Combined stdout and stderr of the command.
+        """
+        return self.run_with_status(command, timeout)[0]
+
+    def run_with_status(
+        self, command: str, timeout: float = 10.0
+    ) -> tuple[str, int | None]:
+        """
+        Run a command on an idle session and return its output and exit status.
+
+        A command is retried on a fresh shell only if the session was found
+        closed before the command was written. A command that may have
+        reached the device is never sent twice, so a tap is not injected again.
+
+        Args:
+            command: Shell command line to execute on the device.
+            timeout: Timeout in seconds waiting for the command to finish.
+
+        Returns:
+            Combined stdout and stderr of the command, and its exit status.
+        """
+        session = self._acquire(timeout)
+        try:
+            try:
+                return session.run_with_status(command, timeout)
+            except ShellNotSentError:
+                # Device reconnected or adb server restarted; retry on a fresh shell
+                session.start()
+                return session.run_with_status(command, timeout)
+        finally:
+            self._idle.put(session)
+
+    def close(self) -> None:
+        """Close all sessions in the pool."""
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+
+    def _acquire(self, timeout: float) -> ShellSession:
+        """Get an idle session, creating one if the pool is not full."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._sessions) < self.max_size:
+                session = ShellSession(self.device_id, self.adb_path)
+                self._sessions.append(session)
+                return session
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise subprocess.TimeoutExpired("acquire shell session", timeout)
+
+
+_pools: dict[str | None, ShellSessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_shell_pool(device_id: str | None = None) -> ShellSessionPool:
+    """
+    Get the shared shell session pool for a device.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        The ShellSessionPool for the device.
+    """
+    with _pools_lock:
+        pool = _pools.get(device_id)
+        if pool is None:
+            pool = ShellSessionPool(device_id)
+            _pools[device_id] = pool
+        return pool
+
+
+def set_adb_backend(backend: str) -> None:
+    """
+    Select how device commands reach the ADB server.
+
+    The backend is process-wide and shared by every agent and device; choose
+    it once at startup, before any device command runs.
+
+    Args:
+        backend: "adb" for persistent `adb shell` sessions, or "native" for the
+            pure-Python wire-protocol client.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    global _backend
+    if backend not in ADB_BACKENDS:
+        raise ValueError(
+            f"Unknown ADB backend: {backend} (expected one of {', '.join(ADB_BACKENDS)})"
+        )
+    _backend = backend
+
+
+def get_adb_backend() -> str:
+    """Get the name of the active ADB backend."""
+    return _backend
+
+
+def get_server_client() -> ADBServerClient:
+    """Get the shared ADB wire-protocol client."""
+    global _server_client
+    if _server_client is None:
+        _server_client = ADBServerClient()
+    return _server_client
+
+
+def run_shell(
+    command: str | list[str], device_id: str | None = None, timeout: float = 10.0
+) -> str:
+    """
+    Run a shell command on the device through the active ADB backend.
+
+    Args:
+        command: Command line, or a list of arguments to be shell-quoted.
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        Combined stdout and stderr of the command.
+    """
+    if not isinstance(command, str):
+        command = shlex.join(command)
+    if _backend == "native":
+        return get_server_client().shell(f"{command} 2>&1", device_id, timeout)
+    return get_shell_pool(device_id).run(command, timeout)
+
+
+def exec_out(
+    command: str | list[str], device_id: str | None = None, timeout: float = 10.0
+) -> bytes:
+    """
+    Run a command and return its raw binary stdout, like `adb exec-out`.
+
+    Args:
+        command: Command line, or a list of arguments to be shell-quoted.
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        Raw stdout bytes of the command.
+    """
+    if not isinstance(command, str):
+        command = shlex.join(command)
+    if _backend == "native":
+        return get_server_client().exec_out(command, device_id, timeout)
+
+    cmd = ["adb"]
+    if device_id:
+        cmd.extend(["-s", device_id])
+    result = subprocess.run(
+        cmd + ["exec-out", command], capture_output=True, timeout=timeout
+    )
+    if result.returncode != 0:
+        # adb's own errors (e.g. device offline) go to stderr
+        return result.stdout + result.stderr
+    return result.stdout
+
+
+def pull_file(
+    remote_path: str, local_path: str, device_id: str | None = None, timeout: int = 5
+) -> None:
+    """
+    Copy a file from the device through the active ADB backend.
+
+    Args:
+        remote_path: Path on the device.
+        local_path: Destination path on the host.
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+    """
+    if _backend == "native":
+        data = get_server_client().pull(remote_path, device_id, timeout)
+        with open(local_path, "wb") as f:
+            f.write(data)
+        return
+
+    cmd = ["adb"]
+    if device_id:
+        cmd.extend(["-s", device_id])
+    subprocess.run(
+        cmd + ["pull", remote_path, local_path], capture_output=True, timeout=timeout
+    )
+
+
+def push_file(
+    local_path: str, remote_path: str, device_id: str | None = None, timeout: int = 10
+) -> None:
+    """
+    Copy a file to the device through the active ADB backend.
+
+    Args:
+        local_path: Path on the host.
+        remote_path: Destination path on the device.
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+    """
+    if _backend == "native":
+        with open(local_path, "rb") as f:
+            data = f.read()
+        get_server_client().push(data, remote_path, device_id, timeout=timeout)
+        return
+
+    cmd = ["adb"]
+    if device_id:
+        cmd.extend(["-s", device_id])
+    subprocess.run(
+        cmd + ["push", local_path, remote_path], capture_output=True, timeout=timeout
+    )
+
+
+@atexit.register
+def close_all_sessions() -> None:
+    """Close every shell session opened by this process."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -1,16 +1,44 @@
 """Main PhoneAgent class for orchestrating phone automation."""
 
+import asyncio
 import json
+import time
 import traceback
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any, Callable
 
 from phone_agent.actions import ActionHandler
 from phone_agent.actions.handler import do, finish, parse_action
-from phone_agent.adb import get_current_app, get_screenshot
-from phone_agent.config import get_messages, get_system_prompt
+from phone_agent.adb import (
+    ScreenChange,
+    Screenshot,
+    ScreenTracker,
+    ensure_screen_unlocked,
+    get_app_catalog,
+    get_current_app,
+    get_screenshot,
+)
+from phone_agent.adb.settle import SettleConfig
+from phone_agent.config import get_date_line, get_messages, get_system_prompt
 from phone_agent.model import ModelClient, ModelConfig
-from phone_agent.model.client import MessageBuilder
+from phone_agent.model.client import AsyncModelClient, MessageBuilder, ModelResponse
+from phone_agent.model.context import (
+    DEFAULT_IMAGE_TOKENS,
+    ContextPolicy,
+    apply_context_policy,
+    estimate_tokens,
+)
+from phone_agent.model.image import EncodedImage, encode_image
+from phone_agent.model.prefix_cache import PrefixCacheMonitor, PrefixReuse
+from phone_agent.timing import StepTimings, TaskTimings, TraceWriter
+from phone_agent.trajectory_cache import (
+    Trajectory,
+    TrajectoryStep,
+    get_trajectory_cache,
+)
+
+PROMPT_LAYOUTS = ("default", "prefix_cache")
 
 
 @dataclass
@@ -22,10 +50,41 @@ class AgentConfig:
     lang: str = "cn"
     system_prompt: str | None = None
     verbose: bool = True
+    screenshot_mode: str = "stream"
+    # Capture the next observation on a worker thread as soon as the screen
+    # stops changing after an action, while settle detection confirms it is
+    # stable (needs settle_config; otherwise capture overlaps only the
+    # caller's handling of the step result)
+    pipelined: bool = False
+    # Adaptive post-action settle detection; None keeps fixed 1s delays
+    settle_config: SettleConfig | None = None
+    # Bound the history sent each step; None sends the full history
+    context_policy: ContextPolicy | None = None
+    # "prefix_cache" keeps every request an append-only extension of the
+    # previous one so server-side prefix caching can reuse it
+    prompt_layout: str = "default"
+    # Hash every screen to flag actions that changed nothing and revisited
+    # screens (StepResult.screen_change); costs a PNG decode per step unless
+    # screenshot_mode is "raw"
+    screen_tracking: bool = False
+    # JSON file of solved task trajectories; matching steps of a repeated
+    # task are replayed from it without calling the model
+    trajectory_cache: str | None = None
+    # Append per-step timings to this JSONL file
+    trace_file: str | None = None
+    # JSON file caching each device's installed apps, so Launch works for
+    # apps missing from APP_PACKAGES and for fuzzy or translated names
+    app_catalog: str | None = None
 
     def __post_init__(self):
+        if self.prompt_layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"Unknown prompt layout: {self.prompt_layout}")
         if self.system_prompt is None:
-            self.system_prompt = get_system_prompt(self.lang)
+            # The date moves into the task message so the system prompt
+            # stays identical across days
+            self.system_prompt = get_system_prompt(
+                self.lang, include_date=self.prompt_layout == "default"
+            )
 
 
 @dataclass
@@ -37,6 +96,43 @@ class StepResult:
     action: dict[str, Any] | None
     thinking: str
     message: str | None = None
+    # Prompt size of this step's request: server-reported when available,
+    # otherwise estimated
+    prompt_tokens: int | None = None
+    # Longest common prefix with the previous request
+    prefix_reuse: PrefixReuse | None = None
+    # Whether the screen this step saw is unchanged or revisited
+    screen_change: ScreenChange | None = None
+    # The action was replayed from the trajectory cache, not asked of the model
+    replayed: bool = False
+    # Seconds spent in each part of the step (see phone_agent.timing)
+    timings: StepTimings | None = None
+
+
+@dataclass
+class _PendingStep:
+    """A step that has observed the device and is waiting for the model."""
+
+    screenshot: Screenshot
+    messages: list[dict[str, Any]]
+    prompt_tokens: int
+    prefix_reuse: PrefixReuse
+    screen_change: ScreenChange | None
+    current_app: str
+    timings: StepTimings
+    started_at: float
+    # Recorded step to replay instead of asking the model
+    replay: TrajectoryStep | None = None
+
+
+@dataclass
+class Observation:
+    """Device state captured before asking the model for the next action."""
+
+    screenshot: Screenshot
+    current_app: str
+    image: EncodedImage
+    timings: StepTimings = field(default_factory=StepTimings)
 
 
 class PhoneAgent:
@@ -51,6 +147,8 @@ class PhoneAgent:
         agent_config: Configuration for the agent behavior.
         confirmation_callback: Optional callback for sensitive action confirmation.
         takeover_callback: Optional callback for takeover requests.
+        thinking_callback: Optional callback receiving the model's thinking text
+            as it streams in (requires ModelConfig.stream).
 
     Example:
         >>> from phone_agent import PhoneAgent
@@ -67,19 +165,55 @@ class PhoneAgent:
         agent_config: AgentConfig | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        thinking_callback: Callable[[str], None] | None = None,
     ):
         self.model_config = model_config or ModelConfig()
+        self.thinking_callback = thinking_callback
         self.agent_config = agent_config or AgentConfig()
 
         self.model_client = ModelClient(self.model_config)
+        self.async_model_client = AsyncModelClient(self.model_config)
         self.action_handler = ActionHandler(
             device_id=self.agent_config.device_id,
             confirmation_callback=confirmation_callback,
             takeover_callback=takeover_callback,
+            settle_config=self.agent_config.settle_config,
+            on_stable=self._on_stable if self.agent_config.pipelined else None,
+            app_catalog=(
+                get_app_catalog(self.agent_config.app_catalog)
+                if self.agent_config.app_catalog
+                else None
+            ),
         )
 
         self._context: list[dict[str, Any]] = []
         self._step_count = 0
+        self._prefix_monitor = PrefixCacheMonitor()
+        self._screen_tracker = ScreenTracker()
+        self._last_observation: Observation | None = None
+
+        self.trajectory_cache = None
+        if self.agent_config.trajectory_cache:
+            self.trajectory_cache = get_trajectory_cache(
+                self.agent_config.trajectory_cache
+            )
+        self._trajectory: Trajectory | None = None
+        self._trajectory_key: str | None = None
+        self._replaying = False
+        self._replayed_steps = 0
+
+        self.task_timings = TaskTimings()
+        self._task: str | None = None
+        self._trace = None
+        if self.agent_config.trace_file:
+            self._trace = TraceWriter(self.agent_config.trace_file)
+
+        # Pipelined mode only; created on first use and shut down by reset()
+        self._executor: ThreadPoolExecutor | None = None
+        self._next_observation: Future[Observation] | None = None
+        # Capture started when the screen stopped changing during the settle
+        # wait of the action being executed
+        self._speculative: Future[Observation] | None = None
 
     def run(self, task: str) -> str:
         """
@@ -91,23 +225,50 @@ class PhoneAgent:
         Returns:
             Final message from the agent.
         """
-        self._context = []
-        self._step_count = 0
+        self.reset()
 
         # First step with user prompt
         result = self._execute_step(task, is_first=True)
 
         if result.finished:
-            return result.message or "Task completed"
+            return self._end_task(result.message or "Task completed")
 
         # Continue until finished or max steps reached
         while self._step_count < self.agent_config.max_steps:
             result = self._execute_step(is_first=False)
 
             if result.finished:
-                return result.message or "Task completed"
+                return self._end_task(result.message or "Task completed")
+
+        return self._end_task("Max steps reached")
+
+    async def arun(self, task: str) -> str:
+        """
+        Run the agent to complete a task without blocking the event loop.
+
+        Model requests are awaited on the running loop through a connection
+        pool shared by all agents; device I/O runs on worker threads.
+
+        Args:
+            task: Natural language description of the task.
+
+        Returns:
+            Final message from the agent.
+        """
+        self.reset()
+
+        result = await self._aexecute_step(task, is_first=True)
+
+        if result.finished:
+            return self._end_task(result.message or "Task completed")
+
+        while self._step_count < self.agent_config.max_steps:
+            result = await self._aexecute_step(is_first=False)
+
+            if result.finished:
+                return self._end_task(result.message or "Task completed")
 
-        return "Max steps reached"
+        return self._end_task("Max steps reached")
 
     def step(self, task: str | None = None) -> StepResult:
         """
@@ -128,30 +289,138 @@ class PhoneAgent:
 
         return self._execute_step(task, is_first)
 
+    async def astep(self, task: str | None = None) -> StepResult:
+        """
+        Execute a single step of the agent without blocking the event loop.
+
+        Args:
+            task: Task description (only needed for first step).
+
+        Returns:
+            StepResult with step details.
+        """
+        is_first = len(self._context) == 0
+
+        if is_first and not task:
+            raise ValueError("Task is required for the first step")
+
+        return await self._aexecute_step(task, is_first)
+
     def reset(self) -> None:
         """Reset the agent state for a new task."""
         self._context = []
         self._step_count = 0
+        self._prefix_monitor.reset()
+        self._screen_tracker.reset()
+        self._trajectory = None
+        self.task_timings = TaskTimings()
+        self._discard_next_observation()
+        self._shutdown_executor()
+
+    def close(self) -> None:
+        """Stop the worker threads of a pipelined agent."""
+        self._discard_next_observation()
+        self._shutdown_executor()
+
+    def _end_task(self, message: str) -> str:
+        """Print the timing breakdown of the finished task and pass on its result."""
+        self._shutdown_executor()
+        if self.agent_config.verbose and self.task_timings.steps:
+            msgs = get_messages(self.agent_config.lang)
+            print(f"⏱ {msgs['timing_summary']} ({self.task_timings.steps} steps):")
+            print(self.task_timings.format_table())
+        return message
 
     def _execute_step(
         self, user_prompt: str | None = None, is_first: bool = False
     ) -> StepResult:
         """Execute a single step of the agent loop."""
-        self._step_count += 1
-
-        from phone_agent.adb import ensure_screen_unlocked
+        pending = self._prepare_step(user_prompt, is_first)
+        if pending.replay is not None:
+            return self._complete_step(pending, self._replay_response(pending.replay))
+        try:
+            with pending.timings.span("model"):
+                response = self.model_client.request(
+                    pending.messages, on_thinking=self._on_thinking
+                )
+        except Exception as e:
+            return self._model_error_result(e, pending)
+        return self._complete_step(pending, response)
 
+    async def _aexecute_step(
+        self, user_prompt: str | None = None, is_first: bool = False
+    ) -> StepResult:
+        """Execute a single step, awaiting the model instead of blocking on it."""
+        # Device I/O is blocking (adb), so it runs on a worker thread
+        pending = await asyncio.to_thread(self._prepare_step, user_prompt, is_first)
+        if pending.replay is not None:
+            response = self._replay_response(pending.replay)
+            return await asyncio.to_thread(self._complete_step, pending, response)
         try:
-            ensure_screen_unlocked(self.agent_config.device_id)
+            with pending.timings.span("model"):
+                response = await self.async_model_client.request(
+                    pending.messages, on_thinking=self._on_thinking
+                )
         except Exception as e:
-            if self.agent_config.verbose:
-                print(f"Warning: Failed to unlock screen: {e}")
+            return self._model_error_result(e, pending)
+        return await asyncio.to_thread(self._complete_step, pending, response)
 
-        # Capture current screen state
-        screenshot = get_screenshot(self.agent_config.device_id)
-        current_app = get_current_app(self.agent_config.device_id)
+    def _prepare_step(self, user_prompt: str | None, is_first: bool) -> _PendingStep:
+        """Observe the device and build the request for this step."""
+        started_at = time.perf_counter()
+        self._step_count += 1
+
+        # Capture current screen state (possibly prefetched after the last action)
+        if is_first:
+            self._discard_next_observation()
+            self._screen_tracker.reset()
+        observation = self._get_observation()
+        screenshot = observation.screenshot
+        current_app = observation.current_app
+        image = observation.image
+        screen_change = None
+        if self.agent_config.screen_tracking:
+            screen_change = self._screen_tracker.observe(screenshot.dhash)
+        if is_first:
+            self._task = user_prompt
+            self._start_trajectory(user_prompt, current_app)
+        replay = self._find_replay(screenshot, current_app)
+
+        timings = StepTimings()
+        timings.merge(observation.timings)
+        with timings.span("prompt"):
+            messages, prompt_tokens, prefix_reuse = self._build_step_messages(
+                user_prompt, is_first, current_app, image
+            )
 
-        # Build messages
+        if self.model_config.stream and self.agent_config.verbose and replay is None:
+            # Header for the thinking text streamed during the request
+            msgs = get_messages(self.agent_config.lang)
+            print("\n" + "=" * 50)
+            print(f"💭 {msgs['thinking']}:")
+            print("-" * 50)
+
+        return _PendingStep(
+            screenshot=screenshot,
+            messages=messages,
+            prompt_tokens=prompt_tokens,
+            prefix_reuse=prefix_reuse,
+            screen_change=screen_change,
+            current_app=current_app,
+            timings=timings,
+            started_at=started_at,
+            replay=replay,
+        )
+
+    def _build_step_messages(
+        self,
+        user_prompt: str | None,
+        is_first: bool,
+        current_app: str,
+        image: EncodedImage,
+    ) -> tuple[list[dict[str, Any]], int, PrefixReuse]:
+        """Add this step's user message to the context and build the request."""
+        prefix_cache = self.agent_config.prompt_layout == "prefix_cache"
         if is_first:
             self._context.append(
                 MessageBuilder.create_system_message(self.agent_config.system_prompt)
@@ -159,10 +428,17 @@ class PhoneAgent:
 
             screen_info = MessageBuilder.build_screen_info(current_app)
             text_content = f"{user_prompt}\n\n{screen_info}"
+            if prefix_cache and self._uses_dateless_prompt():
+                text_content = (
+                    f"{get_date_line(self.agent_config.lang)}\n\n{text_content}"
+                )
 
             self._context.append(
                 MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
+                    text=text_content,
+                    image_base64=image.base64_data,
+                    image_mime_type=image.mime_type,
+                    image_first=not prefix_cache,
                 )
             )
         else:
@@ -171,52 +447,119 @@ class PhoneAgent:
 
             self._context.append(
                 MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
+                    text=text_content,
+                    image_base64=image.base64_data,
+                    image_mime_type=image.mime_type,
+                    image_first=not prefix_cache,
                 )
             )
 
-        # Get model response
-        try:
-            response = self.model_client.request(self._context)
-        except Exception as e:
-            if self.agent_config.verbose:
-                traceback.print_exc()
-            return StepResult(
-                success=False,
-                finished=True,
-                action=None,
-                thinking="",
-                message=f"Model error: {e}",
-            )
+        messages = self._build_request_messages()
+        policy = self.agent_config.context_policy
+        prompt_tokens = estimate_tokens(
+            messages, policy.image_tokens if policy else DEFAULT_IMAGE_TOKENS
+        )
+        prefix_reuse = self._prefix_monitor.observe(messages)
+        return messages, prompt_tokens, prefix_reuse
+
+    def _model_error_result(
+        self, error: Exception, pending: _PendingStep
+    ) -> StepResult:
+        """Build the result of a step whose model request failed."""
+        if self.agent_config.verbose:
+            traceback.print_exc()
+        result = StepResult(
+            success=False,
+            finished=True,
+            action=None,
+            thinking="",
+            message=f"Model error: {error}",
+            prompt_tokens=pending.prompt_tokens,
+            prefix_reuse=pending.prefix_reuse,
+            screen_change=pending.screen_change,
+            timings=pending.timings,
+        )
+        self._record_timings(pending, result)
+        return result
+
+    def _complete_step(
+        self, pending: _PendingStep, response: ModelResponse
+    ) -> StepResult:
+        """Parse the model response, execute the action and record the step."""
+        screenshot = pending.screenshot
+        messages = pending.messages
+        prefix_reuse = pending.prefix_reuse
+        screen_change = pending.screen_change
+        prompt_tokens = pending.prompt_tokens
+        timings = pending.timings
+        replayed = pending.replay is not None
+        stream_to_console = (
+            self.model_config.stream and self.agent_config.verbose and not replayed
+        )
+        prefix_cache = self.agent_config.prompt_layout == "prefix_cache"
+
+        if response.prompt_tokens is not None:
+            prompt_tokens = response.prompt_tokens
+        if response.time_to_first_token is not None:
+            timings.add("model_ttft", response.time_to_first_token)
 
         # Parse action from response
         try:
-            action = parse_action(response.action)
+            with timings.span("parse"):
+                action = parse_action(response.action)
         except ValueError:
             if self.agent_config.verbose:
                 traceback.print_exc()
             action = finish(message=response.action)
 
         if self.agent_config.verbose:
-            # Print thinking process
+            # Print thinking process (already printed live when streaming)
             msgs = get_messages(self.agent_config.lang)
-            print("\n" + "=" * 50)
-            print(f"💭 {msgs['thinking']}:")
-            print("-" * 50)
-            print(response.thinking)
+            if stream_to_console:
+                print()
+                if response.time_to_first_token is not None:
+                    print(
+                        f"⏱ TTFT {response.time_to_first_token:.2f}s, "
+                        f"action {response.time_to_action or response.total_time:.2f}s"
+                    )
+            else:
+                print("\n" + "=" * 50)
+                print(f"💭 {msgs['thinking']}:")
+                print("-" * 50)
+                print(response.thinking)
             print("-" * 50)
             print(f"🎯 {msgs['action']}:")
             print(json.dumps(action, ensure_ascii=False, indent=2))
+            print(
+                f"📏 {msgs['context_size']}: {len(messages)} messages, "
+                f"{prompt_tokens} tokens"
+            )
+            cached = (
+                f", server cached {response.cached_tokens} tokens"
+                if response.cached_tokens is not None
+                else ""
+            )
+            print(
+                f"♻️ {msgs['prefix_reuse']}: {prefix_reuse.common_messages} messages, "
+                f"{prefix_reuse.ratio:.0%}{cached}"
+            )
+            if screen_change is not None and screen_change.unchanged:
+                print(f"⚠️ {msgs['screen_unchanged']}")
+            if screen_change is not None and screen_change.looping:
+                print(f"🔁 {msgs['screen_revisited']} ({screen_change.revisits}x)")
+            if replayed:
+                print(f"⏩ {msgs['replayed_step']}")
             print("=" * 50 + "\n")
 
         # Remove image from context to save space
         self._context[-1] = MessageBuilder.remove_images_from_message(self._context[-1])
 
-        # Execute action
+        # Execute action; settle waits inside it are collected as well
         try:
-            result = self.action_handler.execute(
-                action, screenshot.width, screenshot.height
-            )
+            with timings.collect(), timings.span("action"):
+                result = self.action_handler.execute(
+                    action, screenshot.width, screenshot.height
+                )
         except Exception as e:
             if self.agent_config.verbose:
                 traceback.print_exc()
@@ -225,15 +568,35 @@ class PhoneAgent:
             )
 
         # Add assistant response to context
-        self._context.append(
-            MessageBuilder.create_assistant_message(
+        if prefix_cache:
+            # Exactly what the model generated, so its tokens stay cached
+            assistant_content = response.raw_content
+        else:
+            assistant_content = (
                 f"<think>{response.thinking}</think><answer>{response.action}</answer>"
             )
-        )
+        self._context.append(MessageBuilder.create_assistant_message(assistant_content))
 
         # Check if finished
         finished = action.get("_metadata") == "finish" or result.should_finish
 
+        if self._trajectory is not None:
+            self._record_step(pending, response)
+            if action.get("_metadata") == "finish" and result.success:
+                self._store_trajectory()
+            elif finished and self._replayed_steps:
+                # A replayed path ended in failure: do not replay it again
+                self.trajectory_cache.invalidate(self._trajectory_key)
+
+        speculative, self._speculative = self._speculative, None
+        if self.agent_config.pipelined and not finished:
+            # Captured during the settle wait once the screen stopped
+            # changing; otherwise start now, overlapping the caller's handling
+            # of this result
+            self._next_observation = speculative or self._get_executor().submit(
+                self._capture_observation
+            )
+
         if finished and self.agent_config.verbose:
             msgs = get_messages(self.agent_config.lang)
             print("\n" + "🎉 " + "=" * 48)
@@ -242,13 +605,212 @@ class PhoneAgent:
             )
             print("=" * 50 + "\n")
 
-        return StepResult(
+        step_result = StepResult(
             success=result.success,
             finished=finished,
             action=action,
             thinking=response.thinking,
             message=result.message or action.get("message"),
+            prompt_tokens=prompt_tokens,
+            prefix_reuse=prefix_reuse,
+            screen_change=screen_change,
+            replayed=replayed,
+            timings=timings,
+        )
+        self._record_timings(pending, step_result)
+        return step_result
+
+    def _record_timings(self, pending: _PendingStep, result: StepResult) -> None:
+        """Close the step's timings, aggregate them and append them to the trace."""
+        timings = pending.timings
+        timings.add("step", time.perf_counter() - pending.started_at)
+        self.task_timings.add(timings)
+
+        if self._trace is None:
+            return
+        action = result.action or {}
+        try:
+            self._trace.write(
+                {
+                    "time": time.time(),
+                    "task": self._task,
+                    "device_id": self.agent_config.device_id,
+                    "step": self._step_count,
+                    "action": action.get("action") or action.get("_metadata"),
+                    "success": result.success,
+                    "finished": result.finished,
+                    "replayed": result.replayed,
+                    "prompt_tokens": result.prompt_tokens,
+                    "timings_ms": timings.as_ms(),
+                }
+            )
+        except OSError as e:
+            if self.agent_config.verbose:
+                print(f"Warning: Failed to write trace: {e}")
+
+    def _start_trajectory(self, task: str, start_app: str) -> None:
+        """Begin recording a task and look up an earlier recording of it."""
+        if self.trajectory_cache is None:
+            return
+        self._trajectory = Trajectory(task=task, start_app=start_app)
+        self._trajectory_key = self.trajectory_cache.make_key(task, start_app)
+        self._replaying = self.trajectory_cache.get(self._trajectory_key) is not None
+        self._replayed_steps = 0
+
+    def _find_replay(
+        self, screenshot: Screenshot, current_app: str
+    ) -> TrajectoryStep | None:
+        """Get the recorded step for this screen while the replay still matches."""
+        if not self._replaying:
+            return None
+        replay = self.trajectory_cache.match(
+            self._trajectory_key,
+            self._step_count - 1,
+            screenshot.dhash,
+            current_app,
         )
+        if replay is None:
+            # Diverged from the recording: the model takes over for good
+            self._replaying = False
+        else:
+            self._replayed_steps += 1
+        return replay
+
+    @staticmethod
+    def _replay_response(replay: TrajectoryStep) -> ModelResponse:
+        return ModelResponse(
+            thinking=replay.thinking,
+            action=replay.action,
+            raw_content=replay.raw_content,
+        )
+
+    def _record_step(self, pending: _PendingStep, response: ModelResponse) -> None:
+        self._trajectory.steps.append(
+            TrajectoryStep(
+                screen_hash=f"{pending.screenshot.dhash:x}",
+                current_app=pending.current_app,
+                thinking=response.thinking,
+                action=response.action,
+                raw_content=response.raw_content,
+            )
+        )
+
+    def _store_trajectory(self) -> None:
+        """Save the completed task so a rerun can replay it."""
+        try:
+            self.trajectory_cache.store(
+                self._trajectory_key,
+                self._trajectory,
+                replayed=self._replayed_steps > 0,
+            )
+        except OSError as e:
+            if self.agent_config.verbose:
+                print(f"Warning: Failed to save trajectory cache: {e}")
+        self._trajectory = None
+
+    def _uses_dateless_prompt(self) -> bool:
+        """Whether the system prompt is the default one without a date line."""
+        return self.agent_config.system_prompt == get_system_prompt(
+            self.agent_config.lang, include_date=False
+        )
+
+    def _build_request_messages(self) -> list[dict[str, Any]]:
+        """Apply the context policy to the full history for this request."""
+        policy = self.agent_config.context_policy
+        if policy is None:
+            return self._context
+        return apply_context_policy(self._context, policy, self.agent_config.lang)
+
+    def _on_thinking(self, text: str) -> None:
+        """Forward streamed thinking text to the console and the callback."""
+        if self.agent_config.verbose:
+            print(text, end="", flush=True)
+        if self.thinking_callback is not None:
+            self.thinking_callback(text)
+
+    def _get_observation(self) -> Observation:
+        """Get the prefetched observation, or capture one now."""
+        if self._next_observation is not None:
+            future, self._next_observation = self._next_observation, None
+            observation = future.result()
+        else:
+            observation = self._capture_observation()
+        self._last_observation = observation
+        return observation
+
+    def _on_stable(self, stable: bool) -> None:
+        """Start or drop a speculative capture as the settle wait progresses."""
+        if stable:
+            self._speculative = self._get_executor().submit(self._capture_observation)
+        else:
+            # The screen changed again; a capture still running is ignored
+            self._speculative = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # Two workers: a dropped speculative capture may still be running
+            self._executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="phone-agent"
+            )
+        return self._executor
+
+    def _shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _capture_observation(self) -> Observation:
+        """Unlock the screen if needed and capture screenshot and foreground app."""
+        device_id = self.agent_config.device_id
+        timings = StepTimings()
+
+        try:
+            with timings.span("unlock"):
+                ensure_screen_unlocked(device_id)
+        except Exception as e:
+            if self.agent_config.verbose:
+                print(f"Warning: Failed to unlock screen: {e}")
+
+        with timings.collect(), timings.span("screenshot"):
+            screenshot = get_screenshot(
+                device_id, mode=self.agent_config.screenshot_mode
+            )
+        previous = self._last_observation
+        if previous is not None and previous.screenshot.same_content(screenshot):
+            # Nothing changed on screen: the previous encoding is still valid
+            image = previous.image
+        else:
+            with timings.span("encode"):
+                image = encode_image(
+                    screenshot,
+                    self.model_config.image_format,
+                    self.model_config.image_quality,
+                    self.model_config.image_max_long_edge,
+                    self.model_config.image_max_pixels,
+                )
+
+        if self.agent_config.screen_tracking or self.trajectory_cache is not None:
+            # Hash on this (possibly prefetching) thread rather than in the
+            # step, after encoding so a PNG is decoded at most once
+            with timings.span("hash"):
+                screenshot.dhash
+
+        with timings.span("current_app"):
+            current_app = get_current_app(device_id)
+
+        # Only this thread writes `timings`; the step merges them once the
+        # observation is taken
+        return Observation(
+            screenshot=screenshot, current_app=current_app, image=image, timings=timings
+        )
+
+    def _discard_next_observation(self) -> None:
+        """Drop a prefetched observation that belongs to a previous task."""
+        for future in (self._next_observation, self._speculative):
+            if future is not None:
+                future.cancel()
+        self._next_observation = None
+        self._speculative = None
 
     @property
     def context(self) -> list[dict[str, Any]]:
@@ -2,8 +2,9 @@ import os
 import yaml
 from typing import Optional
 
-from phone_agent.model import ModelConfig
+from phone_agent.model import ContextPolicy, ModelConfig
 from phone_agent.agent import AgentConfig
+from phone_agent.adb.settle import SettleConfig
 
 
 class BotConfig:
@@ -29,12 +30,36 @@ class BotConfig:
     def device_id(self) -> Optional[str]:
         return self.config['agent'].get('device_id')
 
+    @property
+    def device_ids(self) -> Optional[list]:
+        # Devices to run tasks on; None discovers all connected devices
+        devices = self.config['agent'].get('devices')
+        if devices:
+            return list(devices)
+        if self.device_id:
+            return [self.device_id]
+        return None
+
     @property
     def model_config(self) -> ModelConfig:
         return ModelConfig(
-            base_url=self.config['model']['base_url'],
+            base_url=self.config['model'].get('base_url') or self.config['model']['base_urls'][0],
             model_name=self.config['model']['model_name'],
-            api_key=self.config['model'].get('api_key', 'EMPTY')
+            api_key=self.config['model'].get('api_key', 'EMPTY'),
+            image_format=self.config['model'].get('image_format', 'png'),
+            image_quality=self.config['model'].get('image_quality', 85),
+            image_max_long_edge=self.config['model'].get('image_max_long_edge'),
+            image_max_pixels=self.config['model'].get('image_max_pixels'),
+            stream=self.config['model'].get('stream', False),
+            http2=self.config['model'].get('http2', True),
+            max_connections=self.config['model'].get('max_connections', 100),
+            max_concurrent_requests=self.config['model'].get('max_concurrent_requests'),
+            batch_max_size=self.config['model'].get('batch_max_size'),
+            batch_max_wait_ms=self.config['model'].get('batch_max_wait_ms', 20.0),
+            base_urls=self.config['model'].get('base_urls') or [],
+            load_balancing=self.config['model'].get('load_balancing', 'least_outstanding'),
+            health_check_interval=self.config['model'].get('health_check_interval', 10.0),
+            hedge_percentile=self.config['model'].get('hedge_percentile')
         )
 
     @property
@@ -43,7 +68,48 @@ class BotConfig:
             max_steps=self.config['agent'].get('max_steps', 100),
             device_id=self.device_id,
             verbose=self.config['agent'].get('verbose', True),
-            lang=self.config['agent'].get('lang', 'cn')
+            lang=self.config['agent'].get('lang', 'cn'),
+            pipelined=self.config['agent'].get('pipelined', False),
+            screen_tracking=self.config['agent'].get('screen_tracking', False),
+            settle_config=self.settle_config,
+            context_policy=self.context_policy,
+            prompt_layout=self.config['agent'].get('prompt_layout', 'default'),
+            trajectory_cache=self.config['agent'].get('trajectory_cache'),
+            app_catalog=self.config['agent'].get('app_catalog'),
+            trace_file=self.config['agent'].get('trace_file')
+        )
+
+    @property
+    def adb_backend(self) -> str:
+        # Process-wide, applied once at startup with set_adb_backend()
+        return self.config['agent'].get('adb_backend', 'adb')
+
+    @property
+    def input_backend(self) -> str:
+        # Process-wide, applied once at startup with set_input_backend()
+        return self.config['agent'].get('input_backend', 'shell')
+
+    @property
+    def settle_config(self) -> Optional[SettleConfig]:
+        settle = self.config['agent'].get('settle')
+        if not settle or not settle.get('enabled', False):
+            return None
+        return SettleConfig(
+            stable_ms=settle.get('stable_ms', 300),
+            poll_interval_ms=settle.get('poll_interval_ms', 100),
+            timeout_ms=settle.get('timeout_ms', 1000)
+        )
+
+    @property
+    def context_policy(self) -> Optional[ContextPolicy]:
+        context = self.config['agent'].get('context')
+        if not context or not context.get('enabled', False):
+            return None
+        return ContextPolicy(
+            max_turns=context.get('max_turns'),
+            summarize=context.get('summarize', True),
+            keep_thinking_turns=context.get('keep_thinking_turns'),
+            max_prompt_tokens=context.get('max_prompt_tokens')
         )
 
     @property
@@ -61,3 +127,15 @@ class BotConfig:
     @property
     def lark_allowed_users(self) -> list:
         return self.config.get('lark', {}).get('allowed_users', [])
+
+    @property
+    def metrics_port(self) -> Optional[int]:
+        # Port for the Prometheus /metrics endpoint; None when metrics are off
+        metrics = self.config.get('metrics') or {}
+        if not metrics.get('enabled', False):
+            return None
+        return metrics.get('port', 9464)
+
+    @property
+    def metrics_host(self) -> str:
+        return (self.config.get('metrics') or {}).get('host', '127.0.0.1')
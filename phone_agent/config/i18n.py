@@ -19,6 +19,13 @@ MESSAGES_ZH = {
     "step": "步骤",
     "task": "任务",
     "result": "结果",
+    "earlier_steps": "此前已执行的步骤",
+    "context_size": "上下文",
+    "prefix_reuse": "前缀复用",
+    "screen_unchanged": "上一步操作后屏幕没有变化",
+    "screen_revisited": "又回到了之前出现过的屏幕",
+    "replayed_step": "屏幕与缓存的轨迹一致，直接复用动作",
+    "timing_summary": "耗时统计",
 }
 
 # English messages
@@ -40,6 +47,13 @@ MESSAGES_EN = {
     "step": "Step",
     "task": "Task",
     "result": "Result",
+    "earlier_steps": "Steps already taken",
+    "context_size": "Context",
+    "prefix_reuse": "Prefix reuse",
+    "screen_unchanged": "Screen unchanged since the last action",
+    "screen_revisited": "Back on a screen seen before",
+    "replayed_step": "Screen matches the cached trajectory, action replayed",
+    "timing_summary": "Timing breakdown",
 }
 
 
@@ -25,6 +25,10 @@ class BaseInterface(ABC):
     async def send_progress(self, update: ProgressUpdate) -> None:
         pass
 
+    async def send_thinking(self, text: str) -> None:
+        """Receive model thinking text as it streams in. Ignored by default."""
+        pass
+
     @abstractmethod
     async def ask_confirmation(self, message: str) -> bool:
         pass
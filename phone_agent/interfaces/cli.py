@@ -21,6 +21,9 @@ class CLIInterface(BaseInterface):
         print(f"Action: {json.dumps(update.action, ensure_ascii=False, indent=2)}")
         print('=' * 50)
 
+    async def send_thinking(self, text: str) -> None:
+        print(text, end='', flush=True)
+
     async def ask_confirmation(self, message: str) -> bool:
         response = input(f"Confirm: {message} (Y/N): ")
         return response.upper() == 'Y'
@@ -2,9 +2,10 @@ import asyncio
 import base64
 import os
 import tempfile
+import time
 from typing import Optional
 
-from phone_agent import PhoneAgent
+from phone_agent import PhoneAgent, metrics
 from phone_agent.agent import AgentConfig, StepResult
 from phone_agent.model import ModelConfig
 from phone_agent.interfaces.base import BaseInterface, ProgressUpdate
@@ -23,11 +24,23 @@ class TaskRunner:
         self.agent_config = agent_config
 
     async def run_task(self, task: str) -> str:
+        start = time.monotonic()
+        outcome = 'error'
+        metrics.task_started()
+        try:
+            result, outcome = await self._run_task(task)
+            return result
+        finally:
+            metrics.observe_task(time.monotonic() - start, outcome)
+
+    async def _run_task(self, task: str) -> tuple[str, str]:
+        self._loop = asyncio.get_running_loop()
         agent = PhoneAgent(
             model_config=self.model_config,
             agent_config=self.agent_config,
             confirmation_callback=self._wrap_confirmation,
-            takeover_callback=self._wrap_takeover
+            takeover_callback=self._wrap_takeover,
+            thinking_callback=self._forward_thinking
         )
 
         await self.interface.send_message(f"Starting task: {task}")
@@ -35,44 +48,46 @@ class TaskRunner:
         is_first = True
         step_num = 0
 
-        while step_num < self.agent_config.max_steps:
-            if self.interface.is_cancelled():
-                await self.interface.send_message("Task cancelled by user")
-                return "Task cancelled"
-
-            step_num += 1
-
-            if is_first:
-                result = await asyncio.to_thread(agent.step, task)
-                is_first = False
-            else:
-                result = await asyncio.to_thread(agent.step)
-
-            await self._send_step_progress(result, step_num)
-
-            if result.finished:
-                await self.interface.send_message(
-                    f"Task completed!\n\n{result.message or 'Done'}"
-                )
-                return result.message or "Task completed"
-
-        await self.interface.send_message("Max steps reached")
-        return "Max steps reached"
+        # A pipelined agent keeps worker threads until it is closed
+        try:
+            while step_num < self.agent_config.max_steps:
+                if self.interface.is_cancelled():
+                    await self.interface.send_message("Task cancelled by user")
+                    return "Task cancelled", 'cancelled'
+
+                step_num += 1
+
+                # Model requests are awaited on this loop; only device I/O uses threads
+                if is_first:
+                    result = await agent.astep(task)
+                    is_first = False
+                else:
+                    result = await agent.astep()
+
+                metrics.observe_step(result)
+                await self._send_step_progress(result, step_num)
+
+                if result.finished:
+                    await self.interface.send_message(
+                        f"Task completed!\n\n{result.message or 'Done'}"
+                    )
+                    outcome = 'completed' if result.success else 'failed'
+                    return result.message or "Task completed", outcome
+
+            await self.interface.send_message("Max steps reached")
+            return "Max steps reached", 'max_steps'
+        finally:
+            agent.close()
 
     async def _send_step_progress(self, result: StepResult, step_num: int):
         screenshot_path = None
 
         if self.agent_config.verbose:
             try:
-                screenshot = get_screenshot(self.agent_config.device_id)
-                image_data = base64.b64decode(screenshot.base64_data)
-
-                temp_file = tempfile.NamedTemporaryFile(
-                    suffix='.png', delete=False
+                # Capturing blocks on the device; keep it off the event loop
+                screenshot_path = await asyncio.to_thread(
+                    self._save_screenshot
                 )
-                with open(temp_file.name, 'wb') as f:
-                    f.write(image_data)
-                screenshot_path = temp_file.name
             except Exception as e:
                 print(f"Failed to capture screenshot: {e}")
 
@@ -92,17 +107,40 @@ class TaskRunner:
             except Exception:
                 pass
 
+    def _save_screenshot(self) -> str:
+        screenshot = get_screenshot(
+            self.agent_config.device_id,
+            mode=self.agent_config.screenshot_mode
+        )
+        image_data = base64.b64decode(screenshot.base64_data)
+
+        temp_file = tempfile.NamedTemporaryFile(
+            suffix='.png', delete=False
+        )
+        with open(temp_file.name, 'wb') as f:
+            f.write(image_data)
+        return temp_file.name
+
+    def _forward_thinking(self, text: str) -> None:
+        # Safe from the agent's worker threads as well as the bot's event loop
+        asyncio.run_coroutine_threadsafe(
+            self.interface.send_thinking(text), self._loop
+        )
+
     def _wrap_confirmation(self, message: str) -> bool:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            return loop.run_until_complete(
+            confirmed = loop.run_until_complete(
                 self.interface.ask_confirmation(message)
             )
         finally:
             loop.close()
+        metrics.observe_confirmation(confirmed)
+        return confirmed
 
     def _wrap_takeover(self, message: str) -> None:
+        metrics.observe_takeover()
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
@@ -0,0 +1,400 @@
+"""Opt-in Prometheus metrics for long-running bot processes."""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; suited to device I/O (tens of ms) up to model calls and whole tasks
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+class _Metric:
+    """
+    Base for metrics whose updates go to a per-thread shard without locking.
+
+    Each thread only ever writes its own shard; a scrape sums all shards.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._local = threading.local()
+        self._shards: list[dict[tuple[str, ...], Any]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict[tuple[str, ...], Any]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _snapshot(self) -> list[tuple[tuple[str, ...], Any]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.items() is copied atomically under the GIL
+        return [item for shard in shards for item in list(shard.items())]
+
+    def _label_text(self, labels: tuple[str, ...], extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, labels: tuple[str, ...] = ()) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount: Non-negative increment.
+            labels: Label values, in the order of `labelnames`.
+        """
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def value(self, labels: tuple[str, ...] = ()) -> float:
+        """Current total across threads."""
+        return sum(v for key, v in self._snapshot() if key == labels)
+
+    def render(self) -> list[str]:
+        totals: dict[tuple[str, ...], float] = {}
+        for labels, value in self._snapshot():
+            totals[labels] = totals.get(labels, 0.0) + value
+        lines = super().render()
+        for labels, value in sorted(totals.items()):
+            lines.append(f"{self.name}{self._label_text(labels)} {_number(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    A value that goes up and down.
+
+    Either adjust it with inc()/dec(), or compute it at scrape time with
+    set_function(), which costs nothing between scrapes.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._function: Callable[[], float] | None = None
+
+    def inc(self, amount: float = 1.0, labels: tuple[str, ...] = ()) -> None:
+        """Increase the gauge."""
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, labels: tuple[str, ...] = ()) -> None:
+        """Decrease the gauge."""
+        self.inc(-amount, labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Report the return value of `function` at each scrape instead."""
+        self._function = function
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        if self._function is not None:
+            try:
+                value = float(self._function())
+            except Exception as e:
+                print(f"Warning: Failed to collect metric {self.name}: {e}")
+                return lines
+            lines.append(f"{self.name} {_number(value)}")
+            return lines
+
+        totals: dict[tuple[str, ...], float] = {}
+        for labels, value in self._snapshot():
+            totals[labels] = totals.get(labels, 0.0) + value
+        for labels, value in sorted(totals.items()):
+            lines.append(f"{self.name}{self._label_text(labels)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        """
+        Record a value.
+
+        Args:
+            value: Observed value, e.g. a duration in seconds.
+            labels: Label values, in the order of `labelnames`.
+        """
+        shard = self._shard()
+        # Per-bucket counts followed by the sum and the count
+        counts = shard.get(labels)
+        if counts is None:
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def render(self) -> list[str]:
+        totals: dict[tuple[str, ...], list] = {}
+        for labels, counts in self._snapshot():
+            total = totals.setdefault(labels, [0] * len(counts))
+            for i, count in enumerate(counts):
+                total[i] += count
+
+        lines = super().render()
+        for labels, counts in sorted(totals.items()):
+            cumulative = 0
+            bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                label_text = self._label_text(labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+            label_text = self._label_text(labels)
+            lines.append(f"{self.name}_sum{label_text} {_number(counts[-2])}")
+            lines.append(f"{self.name}_count{label_text} {counts[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """A set of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Add a metric to the registry.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STEP_SECONDS = REGISTRY.register(
+    Histogram("phone_agent_step_seconds", "Wall time of agent steps.")
+)
+MODEL_SECONDS = REGISTRY.register(
+    Histogram("phone_agent_model_request_seconds", "Duration of model requests.")
+)
+SCREENSHOT_SECONDS = REGISTRY.register(
+    Histogram("phone_agent_screenshot_seconds", "Duration of screenshot captures.")
+)
+TASK_SECONDS = REGISTRY.register(
+    Histogram(
+        "phone_agent_task_seconds",
+        "Duration of tasks.",
+        buckets=(5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+    )
+)
+STEPS_TOTAL = REGISTRY.register(
+    Counter("phone_agent_steps_total", "Agent steps executed.", ("replayed",))
+)
+STEP_FAILURES_TOTAL = REGISTRY.register(
+    Counter("phone_agent_step_failures_total", "Agent steps that did not succeed.")
+)
+TASKS_TOTAL = REGISTRY.register(
+    Counter(
+        "phone_agent_tasks_total",
+        "Tasks ended, by outcome (completed, failed, cancelled, max_steps, error).",
+        ("outcome",),
+    )
+)
+CONFIRMATIONS_TOTAL = REGISTRY.register(
+    Counter(
+        "phone_agent_confirmations_total",
+        "Sensitive-operation confirmations, by answer.",
+        ("answer",),
+    )
+)
+TAKEOVERS_TOTAL = REGISTRY.register(
+    Counter("phone_agent_takeovers_total", "Requests for manual takeover.")
+)
+ACTIVE_TASKS = REGISTRY.register(
+    Gauge("phone_agent_active_tasks", "Tasks currently running.")
+)
+DEVICE_LEASES = REGISTRY.register(
+    Gauge("phone_agent_device_leases", "Devices currently leased to tasks.")
+)
+QUEUED_TASKS = REGISTRY.register(
+    Gauge("phone_agent_queued_tasks", "Tasks waiting for a free device.")
+)
+
+_enabled = False
+
+
+def metrics_enabled() -> bool:
+    """Whether metrics are being collected (start_metrics_server() was called)."""
+    return _enabled
+
+
+def observe_step(result: Any) -> None:
+    """
+    Record a finished agent step.
+
+    Args:
+        result: StepResult of the step.
+    """
+    if not _enabled:
+        return
+    STEPS_TOTAL.inc(labels=("true" if result.replayed else "false",))
+    if not result.success:
+        STEP_FAILURES_TOTAL.inc()
+    spans = result.timings.spans if result.timings else {}
+    if "step" in spans:
+        STEP_SECONDS.observe(spans["step"])
+    if "model" in spans:
+        MODEL_SECONDS.observe(spans["model"])
+    if "screenshot" in spans:
+        SCREENSHOT_SECONDS.observe(spans["screenshot"])
+
+
+def task_started() -> None:
+    """Count a task as active until observe_task() is called for it."""
+    if _enabled:
+        ACTIVE_TASKS.inc()
+
+
+def observe_task(seconds: float, outcome: str) -> None:
+    """
+    Record a finished task started with task_started().
+
+    Args:
+        seconds: Task duration.
+        outcome: completed, failed, cancelled, max_steps or error.
+    """
+    if not _enabled:
+        return
+    ACTIVE_TASKS.dec()
+    TASK_SECONDS.observe(seconds)
+    TASKS_TOTAL.inc(labels=(outcome,))
+
+
+def observe_confirmation(confirmed: bool) -> None:
+    """Record the user's answer to a sensitive-operation confirmation."""
+    if _enabled:
+        CONFIRMATIONS_TOTAL.inc(labels=("approved" if confirmed else "denied",))
+
+
+def observe_takeover() -> None:
+    """Record a request for manual takeover."""
+    if _enabled:
+        TAKEOVERS_TOTAL.inc()
+
+
+def track_scheduler(scheduler: Any) -> None:
+    """
+    Report device leases and queued tasks of a DeviceScheduler.
+
+    The counts are snapshotted on the scheduler's event loop whenever they
+    change, so scrapes never read the scheduler from the server's thread.
+    Call this from the loop, or before the loop starts.
+
+    Args:
+        scheduler: The bot's DeviceScheduler.
+    """
+    snapshot = {"leases": 0, "queued": 0}
+
+    def update() -> None:
+        snapshot["leases"] = sum(1 for s in scheduler.utilization().values() if s.busy)
+        snapshot["queued"] = scheduler.queue_length
+
+    scheduler.add_listener(update)
+    DEVICE_LEASES.set_function(lambda: snapshot["leases"])
+    QUEUED_TASKS.set_function(lambda: snapshot["queued"])
+
+
+def start_metrics_server(
+    port: int, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY
+) -> ThreadingHTTPServer:
+    """
+    Enable collection and serve `/metrics` on a background thread.
+
+    Args:
+        port: TCP port to listen on.
+        host: Interface to bind; the default only accepts local scrapers.
+        registry: Metrics to expose.
+
+    Returns:
+        The running server; call shutdown() to stop it.
+    """
+    global _enabled
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    ).start()
+    _enabled = True
+    return server
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
@@ -1,5 +1,16 @@
 """Model client module for AI inference."""
 
-from phone_agent.model.client import ModelClient, ModelConfig
+from phone_agent.model.client import AsyncModelClient, ModelClient, ModelConfig
+from phone_agent.model.context import ContextPolicy
+from phone_agent.model.endpoints import EndpointPool
+from phone_agent.model.image import EncodedImage, encode_image
 
-__all__ = ["ModelClient", "ModelConfig"]
+__all__ = [
+    "ModelClient",
+    "AsyncModelClient",
+    "ModelConfig",
+    "ContextPolicy",
+    "EndpointPool",
+    "EncodedImage",
+    "encode_image",
+]
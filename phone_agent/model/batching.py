@@ -0,0 +1,138 @@
+"""Micro-batching of concurrent model requests from many agents."""
+
+import asyncio
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+
+@dataclass
+class BatchStats:
+    """Sizes of the batches dispatched so far."""
+
+    batches: int = 0
+    requests: int = 0
+    sizes: Counter = field(default_factory=Counter)
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average number of requests per batch."""
+        return self.requests / self.batches if self.batches else 0.0
+
+
+class RequestBatcher:
+    """
+    Collect requests arriving within a short window and dispatch them together.
+
+    OpenAI-compatible servers have no synchronous batch endpoint, but
+    engines such as vLLM and SGLang batch whatever requests are queued when
+    their scheduler runs. Releasing requests from many agents at the same
+    moment lets them share prefill iterations instead of trickling in one
+    at a time. Each request still gets its own HTTP call and its own
+    response.
+
+    A batch is dispatched when it reaches `max_batch_size` or `max_wait_ms`
+    after its first request arrived, whichever comes first.
+
+    Args:
+        max_batch_size: Maximum number of requests per batch.
+        max_wait_ms: Maximum time the first request of a batch waits.
+    """
+
+    def __init__(self, max_batch_size: int = 8, max_wait_ms: float = 20.0):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.stats = BatchStats()
+        self._pending: list[tuple[Callable[[], Awaitable[Any]], asyncio.Future]] = []
+        self._timer: asyncio.Handle | None = None
+
+    async def submit(self, send: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Queue a request for the next batch and wait for its response.
+
+        Args:
+            send: Coroutine function performing the request.
+
+        Returns:
+            The result of `send()`.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((send, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Dispatch the pending requests as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending[: self.max_batch_size]
+        del self._pending[: self.max_batch_size]
+        if self._pending:
+            # More arrived than fit: start the next window right away
+            self._timer = asyncio.get_running_loop().call_soon(self._flush)
+
+        batch = [(send, future) for send, future in batch if not future.done()]
+        if not batch:
+            return
+
+        self.stats.batches += 1
+        self.stats.requests += len(batch)
+        self.stats.sizes[len(batch)] += 1
+
+        for send, future in batch:
+            task = asyncio.ensure_future(send())
+            task.add_done_callback(lambda t, f=future: _propagate(t, f))
+            # If the waiting agent gives up, stop its request too
+            future.add_done_callback(
+                lambda f, t=task: t.cancel() if f.cancelled() else None
+            )
+
+
+def _propagate(task: asyncio.Task, future: asyncio.Future) -> None:
+    """Copy the outcome of a dispatched request to the waiting agent."""
+    if task.cancelled():
+        future.cancel()
+        return
+    error = task.exception()
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(task.result())
+
+
+# Batchers are shared by all agents targeting the same endpoint on a loop
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_request_batcher(
+    key: Any, max_batch_size: int, max_wait_ms: float
+) -> RequestBatcher:
+    """
+    Get the batcher for an endpoint on the running event loop.
+
+    Args:
+        key: Identifies the endpoint, e.g. (base_url, model_name).
+        max_batch_size: Maximum number of requests per batch.
+        max_wait_ms: Maximum time the first request of a batch waits.
+
+    Returns:
+        Shared RequestBatcher.
+    """
+    batchers = _batchers.setdefault(asyncio.get_running_loop(), {})
+    full_key = (key, max_batch_size, max_wait_ms)
+    if full_key not in batchers:
+        batchers[full_key] = RequestBatcher(max_batch_size, max_wait_ms)
+    return batchers[full_key]
@@ -1,10 +1,31 @@
 """Model client for AI inference using OpenAI-compatible API."""
 
+import asyncio
 import json
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Callable
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from phone_agent.actions.parser import ActionParseError, parse_action_call
+from phone_agent.model.batching import (
+    BatchStats,
+    RequestBatcher,
+    get_request_batcher,
+)
+from phone_agent.model.endpoints import (
+    RETRYABLE_ERRORS,
+    Endpoint,
+    EndpointPool,
+    get_endpoint_pool,
+)
+from phone_agent.model.http_pool import get_async_openai, get_request_semaphore
+
+ACTION_MARKERS = ("finish(message=", "do(action=")
 
 
 @dataclass
@@ -19,6 +40,37 @@ class ModelConfig:
     top_p: float = 0.85
     frequency_penalty: float = 0.2
     extra_body: dict[str, Any] = field(default_factory=dict)
+    # Screenshot encoding: "png", "jpeg" or "webp"; downscaling keeps aspect ratio
+    image_format: str = "png"
+    image_quality: int = 85
+    image_max_long_edge: int | None = None
+    image_max_pixels: int | None = None
+    # Consume the response as a stream and stop once the action call is complete
+    stream: bool = False
+    # AsyncModelClient only: pooled connections shared by every agent in the
+    # process, HTTP/2 if `h2` is installed, and a cap on in-flight requests
+    http2: bool = True
+    max_connections: int = 100
+    max_concurrent_requests: int | None = None
+    # AsyncModelClient only: release requests from concurrent agents together,
+    # up to batch_max_size at a time or after batch_max_wait_ms (None disables)
+    batch_max_size: int | None = None
+    batch_max_wait_ms: float = 20.0
+    # Replicas serving the same model (overrides base_url), balanced by
+    # "least_outstanding" or "latency" and probed via /models in the background
+    base_urls: list[str] = field(default_factory=list)
+    load_balancing: str = "least_outstanding"
+    health_check_interval: float = 10.0
+    # Send a duplicate request to another replica once the first has run
+    # longer than this percentile of recent latencies, e.g. 0.95. The blocking
+    # ModelClient only hedges with stream=True: a non-streaming request cannot
+    # be stopped once the other one wins
+    hedge_percentile: float | None = None
+
+    @property
+    def endpoint_urls(self) -> list[str]:
+        """Base URLs of all replicas requests may be sent to."""
+        return self.base_urls or [self.base_url]
 
 
 @dataclass
@@ -28,52 +80,68 @@ class ModelResponse:
     thinking: str
     action: str
     raw_content: str
-
-
-class ModelClient:
-    """
-    Client for interacting with OpenAI-compatible vision-language models.
-
-    Args:
-        config: Model configuration.
-    """
-
-    def __init__(self, config: ModelConfig | None = None):
-        self.config = config or ModelConfig()
-        self.client = OpenAI(base_url=self.config.base_url, api_key=self.config.api_key)
-
-    def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
-        """
-        Send a request to the model.
-
-        Args:
-            messages: List of message dictionaries in OpenAI format.
-
-        Returns:
-            ModelResponse containing thinking and action.
-
-        Raises:
-            ValueError: If the response cannot be parsed.
-        """
-        response = self.client.chat.completions.create(
-            messages=messages,
-            model=self.config.model_name,
-            max_tokens=self.config.max_tokens,
-            temperature=self.config.temperature,
-            top_p=self.config.top_p,
-            frequency_penalty=self.config.frequency_penalty,
-            extra_body=self.config.extra_body,
-            stream=False,
+    time_to_first_token: float | None = None
+    time_to_action: float | None = None
+    total_time: float | None = None
+    # Prompt size and prefix-cache hits reported by the server, when available
+    prompt_tokens: int | None = None
+    cached_tokens: int | None = None
+
+
+class _BaseModelClient:
+    """Request building and response parsing shared by the model clients."""
+
+    config: ModelConfig
+    endpoints: EndpointPool
+
+    def _get_endpoint_pool(self) -> EndpointPool:
+        return get_endpoint_pool(
+            self.config.endpoint_urls,
+            self.config.api_key,
+            self.config.model_name,
+            self.config.load_balancing,
+            self.config.health_check_interval,
         )
 
+    def _hedge_delay(self, tried: list[Endpoint]) -> float | None:
+        """Seconds after which to hedge, or None if hedging does not apply."""
+        if not self.config.hedge_percentile or len(tried) >= len(self.endpoints):
+            return None
+        return self.endpoints.latency_percentile(self.config.hedge_percentile)
+
+    def _request_params(
+        self, messages: list[dict[str, Any]], stream: bool
+    ) -> dict[str, Any]:
+        """Build the chat completion parameters from the config."""
+        return {
+            "messages": messages,
+            "model": self.config.model_name,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature,
+            "top_p": self.config.top_p,
+            "frequency_penalty": self.config.frequency_penalty,
+            "extra_body": self.config.extra_body,
+            "stream": stream,
+        }
+
+    def _build_response(self, response: Any, start: float) -> ModelResponse:
+        """Build a ModelResponse from a non-streaming chat completion."""
         raw_content = response.choices[0].message.content
 
         # Parse thinking and action from response
         thinking, action = self._parse_response(raw_content)
 
-        return ModelResponse(thinking=thinking, action=action, raw_content=raw_content)
+        return ModelResponse(
+            thinking=thinking,
+            action=action,
+            raw_content=raw_content,
+            total_time=time.perf_counter() - start,
+            prompt_tokens=response.usage.prompt_tokens if response.usage else None,
+            cached_tokens=_get_cached_tokens(response.usage),
+        )
 
-    def _parse_response(self, content: str) -> tuple[str, str]:
+    @staticmethod
+    def _parse_response(content: str) -> tuple[str, str]:
         """
         Parse the model response into thinking and action parts.
 
@@ -116,6 +184,528 @@ class ModelClient:
         return "", content
 
 
+class ModelClient(_BaseModelClient):
+    """
+    Client for interacting with OpenAI-compatible vision-language models.
+
+    With several replicas configured (`config.base_urls`), each request goes
+    to a replica chosen by the shared EndpointPool, fails over to another
+    replica on connection or server errors, and, with
+    `config.hedge_percentile`, is duplicated to a second replica when it runs
+    longer than that percentile of recent latencies.
+
+    Args:
+        config: Model configuration.
+    """
+
+    def __init__(self, config: ModelConfig | None = None):
+        self.config = config or ModelConfig()
+        self.endpoints = self._get_endpoint_pool()
+        self._clients = {
+            url: OpenAI(base_url=url, api_key=self.config.api_key)
+            for url in self.config.endpoint_urls
+        }
+        self.client = self._clients[self.config.endpoint_urls[0]]
+        self._hedge_executor: ThreadPoolExecutor | None = None
+
+    def request(
+        self,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None = None,
+    ) -> ModelResponse:
+        """
+        Send a request to the model.
+
+        Args:
+            messages: List of message dictionaries in OpenAI format.
+            on_thinking: Optional callback receiving thinking text as it
+                streams in. Only called when streaming is enabled.
+
+        Returns:
+            ModelResponse containing thinking and action.
+
+        Raises:
+            ValueError: If the response cannot be parsed.
+        """
+        tried: list[Endpoint] = []
+        while True:
+            endpoint = self.endpoints.acquire(tried)
+            tried.append(endpoint)
+            try:
+                return self._attempt(endpoint, messages, on_thinking, tried)
+            except RETRYABLE_ERRORS:
+                if len(tried) >= len(self.endpoints):
+                    raise
+
+    def _attempt(
+        self,
+        endpoint: Endpoint,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None,
+        tried: list[Endpoint],
+    ) -> ModelResponse:
+        """Request from one replica, hedging to another if it is slow."""
+        # Only a stream can be abandoned, releasing the loser's replica
+        delay = self._hedge_delay(tried) if self.config.stream else None
+        if delay is None:
+            return self._request_on(endpoint, messages, on_thinking)
+
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(thread_name_prefix="model-hedge")
+        # Set once a result is returned: the slower request stops streaming
+        # and forwards no more thinking
+        superseded = threading.Event()
+        primary = self._hedge_executor.submit(
+            self._request_on, endpoint, messages, on_thinking, superseded
+        )
+        try:
+            try:
+                return primary.result(timeout=delay)
+            except FutureTimeoutError:
+                pass
+
+            backup_endpoint = self.endpoints.acquire(tried)
+            tried.append(backup_endpoint)
+            # Thinking is only forwarded from the first request to avoid duplicates
+            backup = self._hedge_executor.submit(
+                self._request_on, backup_endpoint, messages, None, superseded
+            )
+
+            error = None
+            for future in as_completed([primary, backup]):
+                try:
+                    return future.result()
+                except RETRYABLE_ERRORS as e:
+                    error = e
+            raise error
+        finally:
+            superseded.set()
+
+    def _request_on(
+        self,
+        endpoint: Endpoint,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None,
+        superseded: threading.Event | None = None,
+    ) -> ModelResponse:
+        """Send a request to a replica acquired from the pool and release it."""
+        client = self._clients[endpoint.base_url]
+        start = time.perf_counter()
+        try:
+            if self.config.stream:
+                response = self._request_stream(
+                    client, messages, on_thinking, superseded
+                )
+            else:
+                completion = client.chat.completions.create(
+                    **self._request_params(messages, stream=False)
+                )
+                response = self._build_response(completion, start)
+        except RETRYABLE_ERRORS:
+            self.endpoints.release(endpoint, failed=True)
+            raise
+        except BaseException:
+            self.endpoints.release(endpoint)
+            raise
+        self.endpoints.release(endpoint, latency=time.perf_counter() - start)
+        return response
+
+    def _request_stream(
+        self,
+        client: OpenAI,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None,
+        superseded: threading.Event | None = None,
+    ) -> ModelResponse:
+        """
+        Stream the response, forwarding thinking and stopping at the action.
+
+        Generation is abandoned as soon as the `do(...)`/`finish(...)` call is
+        syntactically complete, so the action can run without waiting for
+        trailing tokens, or as soon as `superseded` is set by a hedged request
+        that finished first.
+
+        Raises:
+            CancelledError: If the request was superseded.
+        """
+        if on_thinking is not None and superseded is not None:
+            forward = on_thinking
+
+            def on_thinking(text: str) -> None:
+                if not superseded.is_set():
+                    forward(text)
+
+        reader = _ActionStreamReader(on_thinking)
+        stream = client.chat.completions.create(
+            **self._request_params(messages, stream=True)
+        )
+
+        try:
+            for chunk in stream:
+                if superseded is not None and superseded.is_set():
+                    raise CancelledError("Superseded by a hedged request")
+                if reader.feed(chunk):
+                    break
+        finally:
+            stream.close()
+
+        return reader.finish(self._parse_response)
+
+
+class AsyncModelClient(_BaseModelClient):
+    """
+    Asynchronous client for OpenAI-compatible vision-language models.
+
+    All clients on an event loop share one keep-alive connection pool
+    (HTTP/2 when the optional `h2` package is installed), and at most
+    `config.max_concurrent_requests` requests per replica are in flight
+    at once, so many agents can be driven from a single loop. Replica
+    selection, failover and hedging work as in ModelClient.
+
+    Args:
+        config: Model configuration.
+    """
+
+    def __init__(self, config: ModelConfig | None = None):
+        self.config = config or ModelConfig()
+        self.endpoints = self._get_endpoint_pool()
+
+    def get_client(self, base_url: str | None = None) -> AsyncOpenAI:
+        """
+        Get the pooled AsyncOpenAI client for the running event loop.
+
+        Args:
+            base_url: Replica to talk to; defaults to the first one.
+        """
+        return get_async_openai(
+            base_url or self.config.endpoint_urls[0],
+            self.config.api_key,
+            self.config.http2,
+            self.config.max_connections,
+        )
+
+    async def request(
+        self,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None = None,
+    ) -> ModelResponse:
+        """
+        Send a request to the model.
+
+        Args:
+            messages: List of message dictionaries in OpenAI format.
+            on_thinking: Optional callback receiving thinking text as it
+                streams in. Only called when streaming is enabled.
+
+        Returns:
+            ModelResponse containing thinking and action.
+        """
+        if not self.config.batch_max_size:
+            return await self._request_with_failover(messages, on_thinking)
+
+        batcher = self._get_batcher()
+        return await batcher.submit(
+            lambda: self._request_with_failover(messages, on_thinking)
+        )
+
+    @property
+    def batch_stats(self) -> BatchStats | None:
+        """Batch sizes achieved for this endpoint on the running loop, if batching."""
+        if not self.config.batch_max_size:
+            return None
+        return self._get_batcher().stats
+
+    def _get_batcher(self) -> RequestBatcher:
+        return get_request_batcher(
+            (tuple(self.config.endpoint_urls), self.config.model_name),
+            self.config.batch_max_size,
+            self.config.batch_max_wait_ms,
+        )
+
+    async def _request_with_failover(
+        self,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None,
+    ) -> ModelResponse:
+        tried: list[Endpoint] = []
+        while True:
+            endpoint = self.endpoints.acquire(tried)
+            tried.append(endpoint)
+            try:
+                return await self._attempt(endpoint, messages, on_thinking, tried)
+            except RETRYABLE_ERRORS:
+                if len(tried) >= len(self.endpoints):
+                    raise
+
+    async def _attempt(
+        self,
+        endpoint: Endpoint,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None,
+        tried: list[Endpoint],
+    ) -> ModelResponse:
+        """Request from one replica, hedging to another if it is slow."""
+        delay = self._hedge_delay(tried)
+        if delay is None:
+            return await self._request_on(endpoint, messages, on_thinking)
+
+        tasks = {
+            asyncio.ensure_future(self._request_on(endpoint, messages, on_thinking))
+        }
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                backup_endpoint = self.endpoints.acquire(tried)
+                tried.append(backup_endpoint)
+                # Thinking is only forwarded from the first request
+                tasks.add(
+                    asyncio.ensure_future(
+                        self._request_on(backup_endpoint, messages, None)
+                    )
+                )
+
+            error = None
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    if not isinstance(task.exception(), RETRYABLE_ERRORS):
+                        raise task.exception()
+                    error = task.exception()
+            raise error
+        finally:
+            # Cancel the slower request; it is no longer needed
+            for task in tasks:
+                if task.done() and not task.cancelled():
+                    task.exception()
+                task.cancel()
+
+    async def _request_on(
+        self,
+        endpoint: Endpoint,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None,
+    ) -> ModelResponse:
+        """Send a request to an acquired replica within its in-flight cap."""
+        semaphore = get_request_semaphore(
+            endpoint.base_url,
+            self.config.model_name,
+            self.config.max_concurrent_requests,
+        )
+        start = time.perf_counter()
+        try:
+            if semaphore is None:
+                response = await self._request(endpoint, messages, on_thinking)
+            else:
+                async with semaphore:
+                    response = await self._request(endpoint, messages, on_thinking)
+        except RETRYABLE_ERRORS:
+            self.endpoints.release(endpoint, failed=True)
+            raise
+        except BaseException:
+            self.endpoints.release(endpoint)
+            raise
+        self.endpoints.release(endpoint, latency=time.perf_counter() - start)
+        return response
+
+    async def _request(
+        self,
+        endpoint: Endpoint,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None,
+    ) -> ModelResponse:
+        client = self.get_client(endpoint.base_url)
+        if self.config.stream:
+            return await self._request_stream(client, messages, on_thinking)
+
+        start = time.perf_counter()
+        response = await client.chat.completions.create(
+            **self._request_params(messages, stream=False)
+        )
+        return self._build_response(response, start)
+
+    async def _request_stream(
+        self,
+        client: AsyncOpenAI,
+        messages: list[dict[str, Any]],
+        on_thinking: Callable[[str], None] | None,
+    ) -> ModelResponse:
+        """Stream the response, stopping as soon as the action is complete."""
+        reader = _ActionStreamReader(on_thinking)
+        stream = await client.chat.completions.create(
+            **self._request_params(messages, stream=True)
+        )
+
+        try:
+            async for chunk in stream:
+                if reader.feed(chunk):
+                    break
+        finally:
+            await stream.close()
+
+        return reader.finish(self._parse_response)
+
+
+class _ActionStreamReader:
+    """Accumulate streamed chunks, forwarding thinking until the action ends."""
+
+    def __init__(self, on_thinking: Callable[[str], None] | None):
+        self.on_thinking = on_thinking
+        self.start = time.perf_counter()
+        # Hold back enough characters that a marker split across chunks is
+        # never forwarded as thinking
+        self.holdback = max(len(marker) for marker in ACTION_MARKERS) - 1
+        self.content = ""
+        self.emitted = 0
+        self.action_start = None
+        # End of a balanced call that did not parse, e.g. cut at a quote
+        self.rejected_end = None
+        self.time_to_first_token = None
+        self.time_to_action = None
+
+    def feed(self, chunk: Any) -> bool:
+        """
+        Add a chunk.
+
+        Returns:
+            True once the action call is complete and the stream can be closed.
+        """
+        if not chunk.choices:
+            return False
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            return False
+
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self.start
+        self.content += delta
+
+        if self.action_start is None:
+            self.action_start = find_action_start(self.content)
+
+        if self.on_thinking is not None:
+            limit = (
+                self.action_start
+                if self.action_start is not None
+                else len(self.content) - self.holdback
+            )
+            if limit > self.emitted:
+                self.on_thinking(self.content[self.emitted : limit])
+                self.emitted = limit
+
+        if self.action_start is not None:
+            end = self._find_action_end()
+            if end is not None:
+                self.time_to_action = time.perf_counter() - self.start
+                self.content = self.content[:end]
+                return True
+        return False
+
+    def _find_action_end(self) -> int | None:
+        """
+        End of the action call if it can be dispatched before the stream ends.
+
+        finish(...) is never cut early: its message often holds unescaped
+        quotes, so a balancing `)` may be part of the text. A do(...) call
+        ends early only if the balanced span parses as a valid action;
+        otherwise the whole response is read.
+        """
+        if self.content.startswith("finish", self.action_start):
+            return None
+        end = find_call_end(self.content, self.action_start)
+        if end is None or end == self.rejected_end:
+            return None
+        try:
+            parse_action_call(self.content[self.action_start : end])
+        except ActionParseError:
+            self.rejected_end = end
+            return None
+        return end
+
+    def finish(self, parse_response: Callable[[str], tuple[str, str]]) -> ModelResponse:
+        """Flush remaining thinking and build the response."""
+        content = self.content
+        if (
+            self.on_thinking is not None
+            and self.action_start is None
+            and len(content) > self.emitted
+        ):
+            self.on_thinking(content[self.emitted :])
+
+        thinking, action = parse_response(content)
+
+        return ModelResponse(
+            thinking=thinking,
+            action=action,
+            raw_content=content,
+            time_to_first_token=self.time_to_first_token,
+            time_to_action=self.time_to_action,
+            total_time=time.perf_counter() - self.start,
+        )
+
+
+def _get_cached_tokens(usage: Any) -> int | None:
+    """Get the prefix-cache hit count from a usage block, if the server sends it."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", None)
+
+
+def find_action_start(content: str) -> int | None:
+    """
+    Find where the action call begins in (partial) model output.
+
+    Args:
+        content: Model output so far.
+
+    Returns:
+        Index of the first `do(action=` or `finish(message=`, or None.
+    """
+    positions = [content.find(marker) for marker in ACTION_MARKERS]
+    positions = [pos for pos in positions if pos != -1]
+    return min(positions) if positions else None
+
+
+def find_call_end(content: str, start: int) -> int | None:
+    """
+    Find the end of a call expression, honouring quoted strings.
+
+    Args:
+        content: Model output so far.
+        start: Index where the call expression begins.
+
+    Returns:
+        Index just past the closing parenthesis, or None if the call is
+        not complete yet.
+    """
+    depth = 0
+    quote = None
+    escaped = False
+
+    for i in range(start, len(content)):
+        char = content[i]
+        if quote is not None:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+
+    return None
+
+
 class MessageBuilder:
     """Helper class for building conversation messages."""
 
@@ -126,7 +716,10 @@ class MessageBuilder:
 
     @staticmethod
     def create_user_message(
-        text: str, image_base64: str | None = None
+        text: str,
+        image_base64: str | None = None,
+        image_mime_type: str = "image/png",
+        image_first: bool = True,
     ) -> dict[str, Any]:
         """
         Create a user message with optional image.
@@ -134,21 +727,24 @@ class MessageBuilder:
         Args:
             text: Text content.
             image_base64: Optional base64-encoded image.
+            image_mime_type: MIME type of the image.
+            image_first: Put the image before the text. Putting it last keeps
+                the text in the cached prefix once the image is removed.
 
         Returns:
             Message dictionary.
         """
-        content = []
+        content = [{"type": "text", "text": text}]
 
         if image_base64:
-            content.append(
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
-                }
-            )
-
-        content.append({"type": "text", "text": text})
+            image = {
+                "type": "image_url",
+                "image_url": {"url": f"data:{image_mime_type};base64,{image_base64}"},
+            }
+            if image_first:
+                content.insert(0, image)
+            else:
+                content.append(image)
 
         return {"role": "user", "content": content}
 
@@ -166,12 +762,16 @@ class MessageBuilder:
             message: Message dictionary.
 
         Returns:
-            Message with images removed.
+            Copy of the message with images removed; the original (which may
+            be part of an earlier request) is left untouched.
         """
         if isinstance(message.get("content"), list):
-            message["content"] = [
-                item for item in message["content"] if item.get("type") == "text"
-            ]
+            return {
+                **message,
+                "content": [
+                    item for item in message["content"] if item.get("type") == "text"
+                ],
+            }
         return message
 
     @staticmethod
@@ -0,0 +1,189 @@
+"""Policies that bound the conversation history sent to the model."""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from phone_agent.config import get_messages
+from phone_agent.model.client import find_action_start
+
+# Rough per-image prompt cost used when estimating prompt size
+DEFAULT_IMAGE_TOKENS = 1000
+
+_ANSWER_RE = re.compile(r"<answer>(.*?)</answer>", re.DOTALL)
+
+
+@dataclass
+class ContextPolicy:
+    """
+    Rules for trimming the history sent with each request.
+
+    The system prompt and the first user message (which holds the task) are
+    always kept. Older steps are dropped first; their actions can be folded
+    into a compact memory block so the model still knows what it has done.
+    """
+
+    # Keep at most this many of the most recent steps verbatim
+    max_turns: int | None = None
+    # Replace dropped steps with a one-line-per-step summary
+    summarize: bool = True
+    # Keep <think> text only in the last N assistant messages
+    keep_thinking_turns: int | None = None
+    # Drop further steps until the estimated prompt fits this budget
+    max_prompt_tokens: int | None = None
+    image_tokens: int = DEFAULT_IMAGE_TOKENS
+
+
+def estimate_tokens(
+    messages: list[dict[str, Any]], image_tokens: int = DEFAULT_IMAGE_TOKENS
+) -> int:
+    """
+    Estimate the prompt size of a message list.
+
+    CJK characters count as one token each and other text as one token per
+    four characters; each image counts as `image_tokens`.
+
+    Args:
+        messages: Messages in OpenAI format.
+        image_tokens: Estimated cost of one image.
+
+    Returns:
+        Estimated number of prompt tokens.
+    """
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            total += _estimate_text_tokens(content)
+            continue
+        for item in content or []:
+            if item.get("type") == "text":
+                total += _estimate_text_tokens(item["text"])
+            elif item.get("type") == "image_url":
+                total += image_tokens
+    return total
+
+
+def apply_context_policy(
+    messages: list[dict[str, Any]], policy: ContextPolicy, lang: str = "cn"
+) -> list[dict[str, Any]]:
+    """
+    Build the messages to send for this step from the full history.
+
+    The history is not modified; trimmed messages are copies.
+
+    Args:
+        messages: Full history: system message, then alternating user and
+            assistant messages ending with the current user message.
+        policy: Trimming rules.
+        lang: Language for the memory block header.
+
+    Returns:
+        Messages to send to the model.
+    """
+    head_size = 2 if messages and messages[0].get("role") == "system" else 1
+    if len(messages) <= head_size:
+        return list(messages)
+
+    head = messages[:head_size]
+    # steps[i] is the messages of step i + 2; step 1's user message is in head
+    first_reply, rest = messages[head_size], messages[head_size + 1 :]
+    steps = [rest[i : i + 2] for i in range(0, len(rest), 2)]
+
+    if policy.keep_thinking_turns is not None:
+        first_reply, steps = _strip_old_thinking(
+            first_reply, steps, policy.keep_thinking_turns
+        )
+
+    # Step 1's reply counts as a step of its own; the current step is never dropped
+    dropped = 0
+    droppable = len(steps)
+    if policy.max_turns is not None:
+        dropped = min(droppable, max(0, len(steps) + 1 - policy.max_turns))
+
+    def build(dropped: int) -> list[dict[str, Any]]:
+        if dropped == 0:
+            return [*head, first_reply, *_flatten(steps)]
+        result = list(head)
+        if policy.summarize:
+            summarized = [(1, head[-1], first_reply)] + [
+                (i + 2, step[0], step[1]) for i, step in enumerate(steps[: dropped - 1])
+            ]
+            result.append(_build_memory_block(summarized, lang))
+        result.extend(_flatten(steps[dropped - 1 :]))
+        return result
+
+    trimmed = build(dropped)
+    if policy.max_prompt_tokens is not None:
+        while dropped < droppable and (
+            estimate_tokens(trimmed, policy.image_tokens) > policy.max_prompt_tokens
+        ):
+            dropped += 1
+            trimmed = build(dropped)
+    return trimmed
+
+
+def _flatten(steps: list[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    return [message for step in steps for message in step]
+
+
+def _strip_old_thinking(
+    first_reply: dict[str, Any],
+    steps: list[list[dict[str, Any]]],
+    keep: int,
+) -> tuple[dict[str, Any], list[list[dict[str, Any]]]]:
+    """Replace assistant messages older than the last `keep` with their answer."""
+    replies = [first_reply] + [step[1] for step in steps if len(step) == 2]
+    stripped = {
+        id(reply): {"role": "assistant", "content": _answer_only(reply["content"])}
+        for reply in replies[: max(0, len(replies) - keep)]
+    }
+    first_reply = stripped.get(id(first_reply), first_reply)
+    steps = [[stripped.get(id(m), m) for m in step] for step in steps]
+    return first_reply, steps
+
+
+def _answer_only(content: str) -> str:
+    return f"<answer>{_extract_answer(content)}</answer>"
+
+
+def _extract_answer(content: str) -> str:
+    """Get the action part of an assistant message."""
+    match = _ANSWER_RE.search(content)
+    if match:
+        return match.group(1).strip()
+    # Verbatim model output (prefix-cache layout): the action follows the thinking
+    start = find_action_start(content)
+    if start is not None:
+        return content[start:].strip()
+    return content.rsplit("</think>", 1)[-1].strip()
+
+
+def _extract_current_app(message: dict[str, Any]) -> str | None:
+    """Get current_app from the screen info JSON at the end of a user message."""
+    for item in message.get("content") or []:
+        if isinstance(item, dict) and item.get("type") == "text":
+            try:
+                return json.loads(item["text"].rsplit("\n\n", 1)[-1])["current_app"]
+            except (ValueError, KeyError, TypeError):
+                continue
+    return None
+
+
+def _build_memory_block(
+    steps: list[tuple[int, dict[str, Any], dict[str, Any]]], lang: str
+) -> dict[str, Any]:
+    """Summarize dropped steps as an assistant message, one line per step."""
+    msgs = get_messages(lang)
+    lines = [f"{msgs['earlier_steps']}:"]
+    for number, user_message, reply in steps:
+        app = _extract_current_app(user_message)
+        location = f" [{app}]" if app else ""
+        lines.append(f"{number}.{location} {_extract_answer(reply['content'])}")
+    return {"role": "assistant", "content": "\n".join(lines)}
+
+
+def _estimate_text_tokens(text: str) -> int:
+    wide = sum(1 for char in text if ord(char) >= 0x2E80)
+    return wide + (len(text) - wide + 3) // 4
@@ -0,0 +1,236 @@
+"""Load balancing, health checking and hedging across model server replicas."""
+
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from openai import APIConnectionError, APIStatusError, InternalServerError, OpenAI
+
+LOAD_BALANCING_STRATEGIES = ("least_outstanding", "latency")
+
+# Errors after which a request is retried on another replica
+RETRYABLE_ERRORS = (APIConnectionError, InternalServerError)
+
+# Consecutive failures before a replica is taken out until its next good probe
+MAX_CONSECUTIVE_FAILURES = 3
+
+# Recent latencies kept for the hedging percentile, and the minimum needed
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+
+
+@dataclass
+class Endpoint:
+    """One model server replica and its live statistics."""
+
+    base_url: str
+    healthy: bool = True
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    requests: int = 0
+    failures: int = 0
+    # Exponentially weighted moving average of request latency in seconds
+    latency_ewma: float | None = None
+
+
+@dataclass
+class EndpointPool:
+    """
+    A set of replicas serving the same model.
+
+    Requests go to the healthy replica with the fewest requests in flight
+    ("least_outstanding"), or with the lowest expected wait, i.e. average
+    latency scaled by requests in flight ("latency"). Replicas are probed
+    in the background through `GET /models`; a replica failing
+    repeatedly is skipped until a probe succeeds again.
+
+    Pools are shared process-wide; use get_endpoint_pool().
+    """
+
+    base_urls: list[str]
+    api_key: str = "EMPTY"
+    model_name: str = ""
+    strategy: str = "least_outstanding"
+    health_check_interval: float = 10.0
+    endpoints: list[Endpoint] = field(init=False)
+
+    def __post_init__(self):
+        if self.strategy not in LOAD_BALANCING_STRATEGIES:
+            raise ValueError(f"Unknown load balancing strategy: {self.strategy}")
+        self.endpoints = [Endpoint(base_url) for base_url in self.base_urls]
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._round_robin = itertools.count()
+        self._health_thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def acquire(self, exclude: list[Endpoint] | None = None) -> Endpoint | None:
+        """
+        Pick a replica for a request and count it as in flight.
+
+        Args:
+            exclude: Replicas already tried for this request.
+
+        Returns:
+            The chosen Endpoint, or None if every replica is excluded.
+        """
+        self._ensure_health_checks()
+        exclude = exclude or []
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            # If no replica looks healthy, try them anyway rather than fail
+            healthy = [e for e in candidates if e.healthy] or candidates
+
+            # Rotate the starting point so ties are spread evenly
+            offset = next(self._round_robin) % len(healthy)
+            healthy = healthy[offset:] + healthy[:offset]
+            endpoint = min(healthy, key=self._score)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(
+        self, endpoint: Endpoint, latency: float | None = None, failed: bool = False
+    ) -> None:
+        """
+        Record the outcome of a request.
+
+        Args:
+            endpoint: Replica returned by acquire().
+            latency: Request duration in seconds, if it completed.
+            failed: Whether the request failed with a retryable error.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                    endpoint.healthy = False
+            elif latency is not None:
+                endpoint.consecutive_failures = 0
+                self._latencies.append(latency)
+                if endpoint.latency_ewma is None:
+                    endpoint.latency_ewma = latency
+                else:
+                    endpoint.latency_ewma = 0.8 * endpoint.latency_ewma + 0.2 * latency
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """
+        Get a percentile of recent request latencies across all replicas.
+
+        Args:
+            percentile: Percentile between 0 and 1, e.g. 0.95.
+
+        Returns:
+            Latency in seconds, or None if too few requests have completed.
+        """
+        with self._lock:
+            if len(self._latencies) < MIN_HEDGE_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(percentile * len(ordered)))
+        return ordered[index]
+
+    def probe(self, endpoint: Endpoint) -> bool:
+        """
+        Check a replica through its `/models` listing.
+
+        Args:
+            endpoint: Replica to check.
+
+        Returns:
+            True if it answered and serves the model (or lists no models,
+            or does not implement the listing).
+        """
+        try:
+            client = OpenAI(
+                base_url=endpoint.base_url, api_key=self.api_key, timeout=5.0
+            )
+            model_ids = [model.id for model in client.models.list()]
+        except RETRYABLE_ERRORS:
+            return False
+        except APIStatusError:
+            # Reachable but without a model listing: nothing more to check
+            return True
+        except Exception:
+            return False
+        return not model_ids or not self.model_name or self.model_name in model_ids
+
+    def check_health(self) -> None:
+        """Probe every replica once and update its health."""
+        for endpoint in self.endpoints:
+            healthy = self.probe(endpoint)
+            with self._lock:
+                endpoint.healthy = healthy
+                if healthy:
+                    endpoint.consecutive_failures = 0
+
+    def _score(self, endpoint: Endpoint) -> float:
+        if self.strategy == "latency":
+            # Unmeasured replicas score 0 so they get tried
+            return (endpoint.latency_ewma or 0.0) * (endpoint.outstanding + 1)
+        return endpoint.outstanding
+
+    def _ensure_health_checks(self) -> None:
+        """Start background probing on first use when there is a choice."""
+        if (
+            self._health_thread is not None
+            or len(self.endpoints) < 2
+            or self.health_check_interval <= 0
+        ):
+            return
+        with self._lock:
+            if self._health_thread is not None:
+                return
+            self._health_thread = threading.Thread(
+                target=self._health_loop, name="model-health", daemon=True
+            )
+            self._health_thread.start()
+
+    def _health_loop(self) -> None:
+        while True:
+            time.sleep(self.health_check_interval)
+            self.check_health()
+
+
+_pools: dict[tuple, EndpointPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(
+    base_urls: list[str],
+    api_key: str = "EMPTY",
+    model_name: str = "",
+    strategy: str = "least_outstanding",
+    health_check_interval: float = 10.0,
+) -> EndpointPool:
+    """
+    Get the pool for a set of replicas, shared by all clients in the process.
+
+    Sharing matters: in-flight counts must include every agent's requests
+    for least-outstanding balancing to work.
+
+    Args:
+        base_urls: API base URLs of the replicas.
+        api_key: API key.
+        model_name: Model expected in each replica's `/models` listing.
+        strategy: "least_outstanding" or "latency".
+        health_check_interval: Seconds between background probes (0 disables).
+
+    Returns:
+        Shared EndpointPool.
+    """
+    key = (tuple(base_urls), api_key, model_name, strategy, health_check_interval)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = EndpointPool(
+                list(base_urls), api_key, model_name, strategy, health_check_interval
+            )
+        return _pools[key]
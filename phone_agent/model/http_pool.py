@@ -0,0 +1,131 @@
+"""Shared HTTP connection pools for the async model client."""
+
+import asyncio
+import importlib.util
+import weakref
+from dataclasses import dataclass, field
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+# Idle keep-alive connections are kept this long before being closed
+KEEPALIVE_EXPIRY = 60.0
+
+
+@dataclass
+class _LoopPools:
+    """Clients and limits belonging to one event loop."""
+
+    http_clients: dict[tuple[bool, int], httpx.AsyncClient] = field(
+        default_factory=dict
+    )
+    openai_clients: dict[tuple[str, str, bool, int], AsyncOpenAI] = field(
+        default_factory=dict
+    )
+    semaphores: dict[tuple[str, str, int], asyncio.Semaphore] = field(
+        default_factory=dict
+    )
+
+
+# httpx connections belong to the loop that opened them, so pools are per loop
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopPools]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def http2_available() -> bool:
+    """Check whether the optional `h2` package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_http_client(
+    http2: bool = True, max_connections: int = 100
+) -> httpx.AsyncClient:
+    """
+    Get the keep-alive HTTP client shared by all agents on the running loop.
+
+    Args:
+        http2: Use HTTP/2 if the `h2` package is installed, otherwise HTTP/1.1.
+        max_connections: Maximum number of open connections in the pool.
+
+    Returns:
+        Shared httpx.AsyncClient.
+    """
+    pools = _get_loop_pools()
+    http2 = http2 and http2_available()
+    key = (http2, max_connections)
+    if key not in pools.http_clients:
+        pools.http_clients[key] = DefaultAsyncHttpxClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+        )
+    return pools.http_clients[key]
+
+
+def get_async_openai(
+    base_url: str, api_key: str, http2: bool = True, max_connections: int = 100
+) -> AsyncOpenAI:
+    """
+    Get an AsyncOpenAI client for an endpoint, backed by the shared pool.
+
+    Args:
+        base_url: API base URL.
+        api_key: API key.
+        http2: Use HTTP/2 when available.
+        max_connections: Maximum number of open connections in the pool.
+
+    Returns:
+        AsyncOpenAI client shared by all agents on the running loop.
+    """
+    pools = _get_loop_pools()
+    key = (base_url, api_key, http2, max_connections)
+    if key not in pools.openai_clients:
+        pools.openai_clients[key] = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=get_http_client(http2, max_connections),
+        )
+    return pools.openai_clients[key]
+
+
+def get_request_semaphore(
+    base_url: str, model_name: str, limit: int | None
+) -> asyncio.Semaphore | None:
+    """
+    Get the semaphore capping concurrent requests to a model endpoint.
+
+    Args:
+        base_url: API base URL.
+        model_name: Model name.
+        limit: Maximum in-flight requests, or None for no limit.
+
+    Returns:
+        Semaphore shared by all agents on the running loop, or None.
+    """
+    if not limit:
+        return None
+    pools = _get_loop_pools()
+    key = (base_url, model_name, limit)
+    if key not in pools.semaphores:
+        pools.semaphores[key] = asyncio.Semaphore(limit)
+    return pools.semaphores[key]
+
+
+async def aclose_http_pools() -> None:
+    """Close the pooled connections of the running loop."""
+    pools = _pools.pop(asyncio.get_running_loop(), None)
+    if pools is None:
+        return
+    for client in pools.http_clients.values():
+        await client.aclose()
+
+
+def _get_loop_pools() -> _LoopPools:
+    loop = asyncio.get_running_loop()
+    if loop not in _pools:
+        _pools[loop] = _LoopPools()
+    return _pools[loop]
@@ -0,0 +1,114 @@
+"""Image encoding for screenshots sent to the model."""
+
+import base64
+import math
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.adb.screenshot import Screenshot
+
+IMAGE_MIME_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
+
+@dataclass
+class EncodedImage:
+    """A screenshot encoded for inclusion in a model request."""
+
+    base64_data: str
+    mime_type: str
+    width: int
+    height: int
+
+    @property
+    def data_url(self) -> str:
+        """The image as a data URL."""
+        return f"data:{self.mime_type};base64,{self.base64_data}"
+
+
+def get_target_size(
+    width: int,
+    height: int,
+    max_long_edge: int | None = None,
+    max_pixels: int | None = None,
+) -> tuple[int, int]:
+    """
+    Compute the downscaled size that fits the limits, preserving aspect ratio.
+
+    Args:
+        width: Original width.
+        height: Original height.
+        max_long_edge: Maximum length of the longer side, or None for no limit.
+        max_pixels: Maximum width * height, or None for no limit.
+
+    Returns:
+        Tuple of (width, height). Images are never upscaled.
+    """
+    scale = 1.0
+    if max_long_edge:
+        scale = min(scale, max_long_edge / max(width, height))
+    if max_pixels:
+        scale = min(scale, math.sqrt(max_pixels / (width * height)))
+
+    if scale >= 1.0:
+        return width, height
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def encode_image(
+    screenshot: Screenshot,
+    image_format: str = "png",
+    quality: int = 85,
+    max_long_edge: int | None = None,
+    max_pixels: int | None = None,
+) -> EncodedImage:
+    """
+    Encode a screenshot for the model.
+
+    The original screenshot is left untouched, so actions are still mapped
+    against the device resolution.
+
+    Args:
+        screenshot: Captured screenshot.
+        image_format: "png", "jpeg" or "webp".
+        quality: Encoder quality for lossy formats (1-100).
+        max_long_edge: Maximum length of the longer side in pixels.
+        max_pixels: Maximum total pixel count.
+
+    Returns:
+        EncodedImage with base64 data and its MIME type.
+
+    Raises:
+        ValueError: If the image format is not supported.
+    """
+    image_format = image_format.lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+    if image_format not in IMAGE_MIME_TYPES:
+        raise ValueError(f"Unsupported image format: {image_format}")
+
+    size = get_target_size(
+        screenshot.width, screenshot.height, max_long_edge, max_pixels
+    )
+    mime_type = IMAGE_MIME_TYPES[image_format]
+
+    if size == (screenshot.width, screenshot.height):
+        # No resizing: reuse the screenshot's own (cached) encoding
+        base64_data = screenshot.to_base64(image_format, quality)
+        return EncodedImage(base64_data, mime_type, *size)
+
+    img = screenshot.to_image()
+    if image_format != "png" and img.mode != "RGB":
+        img = img.convert("RGB")
+    img = img.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+    buffered = BytesIO()
+    img.save(buffered, format=image_format.upper(), quality=quality)
+    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+    return EncodedImage(base64_data, mime_type, *size)
@@ -0,0 +1,98 @@
+"""Diagnostics for server-side prefix caching of consecutive requests."""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class PrefixReuse:
+    """How much of a request repeats the start of the previous request."""
+
+    common_messages: int
+    common_chars: int
+    total_chars: int
+
+    @property
+    def ratio(self) -> float:
+        """Fraction of this request covered by the common prefix."""
+        return self.common_chars / self.total_chars if self.total_chars else 0.0
+
+
+class PrefixCacheMonitor:
+    """
+    Track the longest common prefix between consecutive requests.
+
+    Serving engines with automatic prefix caching (vLLM, SGLang) reuse the
+    KV cache for the longest token prefix shared with an earlier request,
+    so the reuse measured here is an upper bound on what the server can
+    hit. Messages are compared in a canonical serialization where each
+    image is represented by a digest of its data.
+
+    Example:
+        >>> monitor = PrefixCacheMonitor()
+        >>> monitor.observe(messages).ratio
+    """
+
+    def __init__(self):
+        self._previous: list[str] | None = None
+
+    def observe(self, messages: list[dict[str, Any]]) -> PrefixReuse:
+        """
+        Record a request and compare it with the previous one.
+
+        Args:
+            messages: Messages of the request about to be sent.
+
+        Returns:
+            PrefixReuse relative to the previous request (zero for the first).
+        """
+        current = [serialize_message(message) for message in messages]
+        previous, self._previous = self._previous, current
+        total_chars = sum(len(part) for part in current)
+        if previous is None:
+            return PrefixReuse(0, 0, total_chars)
+
+        common_messages = 0
+        common_chars = 0
+        for before, after in zip(previous, current):
+            if before != after:
+                common_chars += len(os.path.commonprefix([before, after]))
+                break
+            common_messages += 1
+            common_chars += len(after)
+
+        return PrefixReuse(common_messages, common_chars, total_chars)
+
+    def reset(self) -> None:
+        """Forget the previous request, e.g. when a new task starts."""
+        self._previous = None
+
+
+def serialize_message(message: dict[str, Any]) -> str:
+    """
+    Serialize a message canonically, replacing image data with its digest.
+
+    Args:
+        message: Message in OpenAI format.
+
+    Returns:
+        Stable string form of the message.
+    """
+    content = message.get("content")
+    if isinstance(content, list):
+        content = [_canonical_item(item) for item in content]
+    return json.dumps(
+        {"role": message.get("role"), "content": content},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def _canonical_item(item: dict[str, Any]) -> Any:
+    if item.get("type") != "image_url":
+        return item
+    url = item["image_url"]["url"]
+    return {"type": "image_url", "digest": hashlib.md5(url.encode()).hexdigest()}
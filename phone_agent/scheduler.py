@@ -0,0 +1,288 @@
+"""Scheduling of tasks across a pool of connected devices."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+
+from phone_agent.adb import list_devices
+
+
+@dataclass
+class DeviceLease:
+    """Exclusive use of one device by one task."""
+
+    device_id: str
+    owner: str | None = None
+    acquired_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class DeviceStats:
+    """Usage of a device since it joined the pool."""
+
+    device_id: str
+    busy: bool
+    owner: str | None
+    tasks_completed: int
+    busy_seconds: float
+    online_seconds: float
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of time the device has been leased."""
+        return self.busy_seconds / self.online_seconds if self.online_seconds else 0.0
+
+
+@dataclass
+class _DeviceState:
+    added_at: float = field(default_factory=time.monotonic)
+    lease: DeviceLease | None = None
+    tasks_completed: int = 0
+    busy_seconds: float = 0.0
+    online: bool = True
+
+
+class DeviceScheduler:
+    """
+    Lease idle devices to tasks so several tasks can run in parallel.
+
+    A device is leased to at most one task at a time. When every device is
+    busy, tasks wait in a priority queue (higher priority first, FIFO within
+    a priority) and are handed the next device that is released.
+
+    The scheduler is not thread-safe; use it from a single event loop, and
+    rediscover devices there with arefresh() so `adb devices` runs in a thread.
+
+    Args:
+        device_ids: Fixed set of devices to schedule on. If None, devices are
+            discovered with `adb devices` and rediscovered by refresh().
+        refresh_interval: Seconds between rediscoveries while tasks wait.
+
+    Example:
+        >>> scheduler = DeviceScheduler()
+        >>> async with scheduler.lease(owner="chat-42") as lease:
+        ...     agent = PhoneAgent(agent_config=AgentConfig(device_id=lease.device_id))
+    """
+
+    def __init__(
+        self, device_ids: list[str] | None = None, refresh_interval: float = 10.0
+    ):
+        self.refresh_interval = refresh_interval
+        self._fixed = device_ids is not None
+        self._devices: dict[str, _DeviceState] = {}
+        self._waiters: list[
+            tuple[int, int, asyncio.Future[DeviceLease], str | None]
+        ] = []
+        self._sequence = itertools.count()
+        self._listeners: list[Callable[[], None]] = []
+        for device_id in device_ids or []:
+            self._devices[device_id] = _DeviceState()
+        if not self._fixed:
+            self.refresh()
+
+    def refresh(self) -> list[str]:
+        """
+        Rediscover connected devices.
+
+        New devices become available immediately (serving queued tasks);
+        devices that disappeared stop receiving new leases.
+
+        Returns:
+            IDs of the devices currently online.
+        """
+        if self._fixed:
+            return [d for d, state in self._devices.items() if state.online]
+
+        return self._update_online(_online_devices())
+
+    async def arefresh(self) -> list[str]:
+        """Rediscover connected devices without blocking the event loop."""
+        if self._fixed:
+            return self.refresh()
+        return self._update_online(await asyncio.to_thread(_online_devices))
+
+    def _update_online(self, online: set[str]) -> list[str]:
+        for device_id in online - self._devices.keys():
+            self._devices[device_id] = _DeviceState()
+        for device_id, state in self._devices.items():
+            state.online = device_id in online
+
+        self._dispatch()
+        return sorted(online)
+
+    async def acquire(
+        self,
+        priority: int = 0,
+        owner: str | None = None,
+        timeout: float | None = None,
+    ) -> DeviceLease:
+        """
+        Lease an idle device, waiting for one if all are busy.
+
+        Args:
+            priority: Higher values are served first while queued.
+            owner: Optional label for the task holding the lease.
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            DeviceLease for the leased device.
+
+        Raises:
+            asyncio.TimeoutError: If no device became free within the timeout.
+        """
+        device_id = self._find_idle_device()
+        if device_id is not None and not self._waiters:
+            lease = self._lease(device_id, owner)
+            self._notify()
+            return lease
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[DeviceLease] = loop.create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._sequence), future, owner))
+        self._dispatch()
+
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            while True:
+                # Without a fixed device list, poll for newly connected devices
+                wait = None if self._fixed else self.refresh_interval
+                if deadline is not None:
+                    remaining = max(0.0, deadline - loop.time())
+                    wait = remaining if wait is None else min(wait, remaining)
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), wait)
+                except asyncio.TimeoutError:
+                    if deadline is not None and loop.time() >= deadline:
+                        raise
+                    await self.arefresh()
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if future.done() and not future.cancelled():
+                # Leased just as we gave up: hand the device on
+                self._abandon(future.result())
+            else:
+                future.cancel()
+                self._dispatch()
+            raise
+
+    def release(self, lease: DeviceLease) -> None:
+        """
+        Return a leased device to the pool.
+
+        Args:
+            lease: Lease returned by acquire().
+        """
+        state = self._devices.get(lease.device_id)
+        if state is None or state.lease is not lease:
+            return
+        state.lease = None
+        state.tasks_completed += 1
+        state.busy_seconds += time.monotonic() - lease.acquired_at
+        self._dispatch()
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        priority: int = 0,
+        owner: str | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[DeviceLease]:
+        """Lease a device for the duration of a `async with` block."""
+        device_lease = await self.acquire(priority, owner, timeout)
+        try:
+            yield device_lease
+        finally:
+            self.release(device_lease)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Call `listener` on the event loop after every change to leases or queue.
+
+        Lets other threads (e.g. a metrics server) work from snapshots taken
+        on the loop instead of reading the scheduler concurrently.
+        """
+        self._listeners.append(listener)
+        listener()
+
+    @property
+    def queue_length(self) -> int:
+        """Number of tasks waiting for a device."""
+        return sum(1 for *_, future, _ in self._waiters if not future.done())
+
+    @property
+    def idle_count(self) -> int:
+        """Number of online devices not currently leased."""
+        return sum(
+            1
+            for state in self._devices.values()
+            if state.online and state.lease is None
+        )
+
+    @property
+    def device_ids(self) -> list[str]:
+        """IDs of the online devices in the pool."""
+        return [d for d, state in self._devices.items() if state.online]
+
+    def utilization(self) -> dict[str, DeviceStats]:
+        """
+        Get per-device usage statistics.
+
+        Returns:
+            Dictionary mapping device ID to DeviceStats.
+        """
+        now = time.monotonic()
+        stats = {}
+        for device_id, state in self._devices.items():
+            busy_seconds = state.busy_seconds
+            if state.lease is not None:
+                busy_seconds += now - state.lease.acquired_at
+            stats[device_id] = DeviceStats(
+                device_id=device_id,
+                busy=state.lease is not None,
+                owner=state.lease.owner if state.lease else None,
+                tasks_completed=state.tasks_completed,
+                busy_seconds=busy_seconds,
+                online_seconds=now - state.added_at,
+            )
+        return stats
+
+    def _abandon(self, lease: DeviceLease) -> None:
+        """Return a lease that was never used."""
+        self._devices[lease.device_id].lease = None
+        self._dispatch()
+
+    def _find_idle_device(self) -> str | None:
+        for device_id, state in self._devices.items():
+            if state.online and state.lease is None:
+                return device_id
+        return None
+
+    def _lease(self, device_id: str, owner: str | None) -> DeviceLease:
+        lease = DeviceLease(device_id=device_id, owner=owner)
+        self._devices[device_id].lease = lease
+        return lease
+
+    def _dispatch(self) -> None:
+        """Hand idle devices to queued tasks in priority order."""
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            device_id = self._find_idle_device()
+            if device_id is None:
+                break
+            _, _, future, owner = heapq.heappop(self._waiters)
+            future.set_result(self._lease(device_id, owner))
+        self._notify()
+
+    def _notify(self) -> None:
+        for listener in self._listeners:
+            listener()
+
+
+def _online_devices() -> set[str]:
+    return {d.device_id for d in list_devices() if d.status == "device"}
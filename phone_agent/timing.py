@@ -0,0 +1,165 @@
+"""Per-step latency spans, per-task aggregation and JSONL traces."""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+# Display order of the known spans. "screenshot" includes "screencap" and
+# "pull", "action" includes "settle", and "step" is the wall time of the step;
+# with a pipelined agent the capture spans overlap the previous step instead
+SPAN_ORDER = (
+    "unlock",
+    "screenshot",
+    "screencap",
+    "pull",
+    "hash",
+    "encode",
+    "current_app",
+    "prompt",
+    "model",
+    "model_ttft",
+    "parse",
+    "action",
+    "settle",
+    "step",
+)
+
+_active: ContextVar["StepTimings | None"] = ContextVar("step_timings", default=None)
+
+
+@dataclass
+class StepTimings:
+    """Seconds spent in each span of one step; repeated spans accumulate."""
+
+    spans: dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time a block and add it to the span `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    @contextmanager
+    def collect(self) -> Iterator["StepTimings"]:
+        """Make module-level span() calls in this context record here."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add a measured duration to a span."""
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def merge(self, other: "StepTimings") -> None:
+        """Add all spans of another set of timings."""
+        for name, seconds in other.spans.items():
+            self.add(name, seconds)
+
+    def as_ms(self) -> dict[str, float]:
+        """Spans in milliseconds, in display order, rounded to 0.1 ms."""
+        return {
+            name: round(self.spans[name] * 1000, 1) for name in _ordered(self.spans)
+        }
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Time a block into the step being collected, if any.
+
+    Lets lower layers (screenshot capture, settle waits) report spans
+    without passing timing objects around; outside StepTimings.collect()
+    this only costs a context variable lookup.
+    """
+    timings = _active.get()
+    if timings is None:
+        yield
+        return
+    with timings.span(name):
+        yield
+
+
+@dataclass
+class SpanStats:
+    """Aggregate of one span over the steps of a task."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class TaskTimings:
+    """Aggregate step timings over a task."""
+
+    def __init__(self):
+        self.steps = 0
+        self.spans: dict[str, SpanStats] = {}
+
+    def add(self, timings: StepTimings) -> None:
+        """Add the timings of one step."""
+        self.steps += 1
+        for name, seconds in timings.spans.items():
+            stats = self.spans.setdefault(name, SpanStats())
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+
+    def format_table(self) -> str:
+        """
+        Format the aggregate as a text table.
+
+        Returns:
+            One row per span with count, total, mean and max in milliseconds
+            and the share of total step time.
+        """
+        step_total = self.spans["step"].total if "step" in self.spans else 0.0
+        lines = [
+            f"{'span':<12} {'count':>5} {'total ms':>10} {'mean ms':>9} "
+            f"{'max ms':>9} {'share':>6}",
+            "-" * 56,
+        ]
+        for name in _ordered(self.spans):
+            stats = self.spans[name]
+            share = f"{stats.total / step_total:.0%}" if step_total else "-"
+            lines.append(
+                f"{name:<12} {stats.count:>5} {stats.total * 1000:>10.1f} "
+                f"{stats.mean * 1000:>9.1f} {stats.max * 1000:>9.1f} {share:>6}"
+            )
+        return "\n".join(lines)
+
+
+class TraceWriter:
+    """
+    Append one JSON line per step to a trace file for comparing runs.
+
+    Args:
+        path: File to append to; created if missing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Append a record as one line."""
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _ordered(names) -> list[str]:
+    known = [name for name in SPAN_ORDER if name in names]
+    return known + sorted(name for name in names if name not in SPAN_ORDER)
@@ -0,0 +1,219 @@
+"""Persistent cache of solved task trajectories for replay without the model."""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from dataclasses import asdict, dataclass, field
+
+from phone_agent.adb.screen_hash import DEFAULT_MAX_DISTANCE, hamming_distance
+
+# Bumped whenever the file layout changes; older files are ignored
+CACHE_VERSION = 1
+
+_TRAILING_PUNCTUATION = "。！!.？?，,；;"
+
+# Whitespace next to CJK text carries no meaning ("打开 微信" == "打开微信")
+_CJK_SPACE_RE = re.compile(r"\s+(?=[\u2e80-\u9fff])|(?<=[\u2e80-\u9fff])\s+")
+
+
+@dataclass
+class TrajectoryStep:
+    """One recorded step: what the screen looked like and what the model did."""
+
+    screen_hash: str
+    current_app: str
+    thinking: str
+    action: str
+    raw_content: str
+
+
+@dataclass
+class Trajectory:
+    """The steps that completed a task, from its first screen to finish."""
+
+    task: str
+    start_app: str
+    steps: list[TrajectoryStep] = field(default_factory=list)
+    replays: int = 0
+    updated_at: float = field(default_factory=time.time)
+
+
+def normalize_task(task: str) -> str:
+    """
+    Normalize task text so trivially different phrasings share a cache entry.
+
+    Full-width characters are folded to their ASCII forms, case, runs of
+    whitespace and spaces next to CJK text are ignored, and trailing
+    punctuation is dropped.
+
+    Args:
+        task: Task as given by the user.
+
+    Returns:
+        Normalized task text.
+    """
+    text = unicodedata.normalize("NFKC", task).casefold()
+    text = _CJK_SPACE_RE.sub("", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(_TRAILING_PUNCTUATION).strip()
+
+
+class TrajectoryCache:
+    """
+    Trajectories of successfully completed tasks, stored in a JSON file.
+
+    Entries are keyed by the normalized task text and the app in the
+    foreground when the task started. While a task runs, each step whose
+    screen matches the recorded step (same app, perceptual hash within
+    `max_distance` bits) can reuse the recorded action instead of asking the
+    model. The first mismatch ends the replay for the rest of the task.
+
+    Caches are shared per path within a process; use get_trajectory_cache().
+
+    Args:
+        path: JSON file holding the cache; created on first store.
+        max_distance: Maximum hash distance for a screen to count as the same.
+        max_entries: Least recently used trajectories beyond this are dropped.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+        max_entries: int = 1000,
+    ):
+        self.path = os.path.expanduser(path)
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._trajectories = self._load()
+
+    @staticmethod
+    def make_key(task: str, start_app: str) -> str:
+        """Build the cache key for a task started from an app."""
+        return f"{normalize_task(task)}\n{start_app}"
+
+    def get(self, key: str) -> Trajectory | None:
+        """Get the trajectory recorded for a key, if any."""
+        with self._lock:
+            return self._trajectories.get(key)
+
+    def match(
+        self, key: str, index: int, screen_hash: int, current_app: str
+    ) -> TrajectoryStep | None:
+        """
+        Find the recorded step to replay for the current screen.
+
+        Args:
+            key: Cache key of the running task.
+            index: Zero-based step number within the task.
+            screen_hash: dHash of the current screenshot.
+            current_app: App currently in the foreground.
+
+        Returns:
+            The recorded TrajectoryStep, or None if there is none or the
+            screen differs from the recording.
+        """
+        trajectory = self.get(key)
+        if trajectory is None or index >= len(trajectory.steps):
+            return None
+        step = trajectory.steps[index]
+        if step.current_app != current_app:
+            return None
+        distance = hamming_distance(int(step.screen_hash, 16), screen_hash)
+        if distance > self.max_distance:
+            return None
+        return step
+
+    def store(self, key: str, trajectory: Trajectory, replayed: bool = False) -> None:
+        """
+        Record the trajectory that completed a task and save the cache file.
+
+        Args:
+            key: Cache key of the task.
+            trajectory: Steps taken, ending with the finishing step.
+            replayed: Whether any steps were replayed from the cache.
+        """
+        with self._lock:
+            previous = self._trajectories.get(key)
+            trajectory.replays = (previous.replays if previous else 0) + int(replayed)
+            trajectory.updated_at = time.time()
+            self._trajectories[key] = trajectory
+            if len(self._trajectories) > self.max_entries:
+                oldest = min(
+                    self._trajectories, key=lambda k: self._trajectories[k].updated_at
+                )
+                del self._trajectories[oldest]
+            self._save()
+
+    def invalidate(self, key: str) -> None:
+        """Drop the trajectory for a key, e.g. after a replay led to failure."""
+        with self._lock:
+            if self._trajectories.pop(key, None) is not None:
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self._trajectories)
+
+    def _load(self) -> dict[str, Trajectory]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable trajectory cache {self.path}: {e}")
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+
+        trajectories = {}
+        for key, entry in data.get("trajectories", {}).items():
+            steps = [TrajectoryStep(**step) for step in entry.pop("steps", [])]
+            trajectories[key] = Trajectory(**entry, steps=steps)
+        return trajectories
+
+    def _save(self) -> None:
+        """Write the cache atomically so a crash never leaves a partial file."""
+        data = {
+            "version": CACHE_VERSION,
+            "trajectories": {
+                key: asdict(trajectory)
+                for key, trajectory in self._trajectories.items()
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+_caches: dict[str, TrajectoryCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_trajectory_cache(path: str) -> TrajectoryCache:
+    """
+    Get the cache stored at a path, shared by all agents in the process.
+
+    Args:
+        path: JSON file holding the cache.
+
+    Returns:
+        Shared TrajectoryCache.
+    """
+    path = os.path.abspath(os.path.expanduser(path))
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = TrajectoryCache(path)
+        return _caches[path]
@@ -0,0 +1,64 @@
+"""Tests for the action parser, checking the fast path against the general one."""
+
+import pytest
+
+from phone_agent.actions import parser
+from phone_agent.actions.parser import ActionParseError, parse_action_call
+
+CALLS = [
+    'do(action="Tap", element=[512, 873])',
+    'do(action="Swipe", start=[500, 800], end=[500, 200])',
+    'do(action="Launch", app="微信")',
+    'do(action = "Back" )',
+    'do(action="Tap", element=[1, 2], extra=[5000, 1])',
+    'finish(message="已完成")',
+    "finish()",
+    # Not on the fast path: escapes, single quotes, floats, negative numbers
+    'do(action="Type", text="a\\"b")',
+    "do(action='Home')",
+    'do(action="Tap", element=[1.5, 2])',
+]
+
+INVALID = [
+    'do(action="Tap", element=[1512, 873])',
+    'do(action="Tap", element="x")',
+    'do(action="Tap", element=[-1, 5])',
+    'do(action="Foo")',
+    'do(action="Tap", action="Tap")',
+    'do(app="x")',
+    'do(action="Launch", app=[1, 2])',
+    "do()",
+    'do(action="Tap", element=[1, 2]) trailing',
+    'run(action="Tap")',
+]
+
+
+def parse_generally(text):
+    kind, args = parser._Parser(text).parse_call()
+    parser._validate(kind, args, text)
+    return kind, args
+
+
+@pytest.mark.parametrize("text", CALLS)
+def test_matches_general_parser(text):
+    action = parse_action_call(text)
+    assert (action.kind, action.args) == parse_generally(text)
+
+
+@pytest.mark.parametrize("text", INVALID)
+def test_rejects_like_general_parser(text):
+    with pytest.raises(ActionParseError) as fast:
+        parse_action_call(text)
+    with pytest.raises(ActionParseError) as general:
+        parse_generally(text)
+    assert str(fast.value) == str(general.value)
+
+
+def test_finish_with_unescaped_quotes():
+    action = parse_action_call('finish(message="他说"好的"然后离开")')
+    assert action.to_dict() == {"_metadata": "finish", "message": '他说"好的"然后离开'}
+
+
+def test_answer_tag_is_stripped():
+    action = parse_action_call('do(action="Home")</answer>')
+    assert action.to_dict() == {"_metadata": "do", "action": "Home"}
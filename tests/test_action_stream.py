@@ -0,0 +1,42 @@
+"""Tests for early dispatch of streamed actions."""
+
+from types import SimpleNamespace
+
+from phone_agent.actions.parser import parse_action_call
+from phone_agent.model.client import ModelClient, _ActionStreamReader
+
+
+def chunk(text):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=text))]
+    )
+
+
+def stream(pieces):
+    """Feed pieces until the reader stops; return it and the pieces it read."""
+    reader = _ActionStreamReader(None)
+    for count, piece in enumerate(pieces, 1):
+        if reader.feed(chunk(piece)):
+            return reader, count
+    return reader, len(pieces)
+
+
+def test_do_call_is_dispatched_when_complete():
+    reader, read = stream(['<answer>do(action="Tap", ', "element=[1, 2])", "</answer>"])
+    assert read == 2
+    assert reader.content.endswith('do(action="Tap", element=[1, 2])')
+
+
+def test_finish_is_read_to_the_end():
+    pieces = ['finish(message="他说"好")', '然后走了")', "</answer>"]
+    reader, read = stream(pieces)
+    assert read == len(pieces)
+    _, action = ModelClient._parse_response(reader.content)
+    assert parse_action_call(action).args["message"] == '他说"好")然后走了'
+
+
+def test_unparsable_do_span_is_not_dispatched():
+    pieces = ['do(action="Type", text="say "x" (y)', '")']
+    reader, read = stream(pieces)
+    assert read == len(pieces)
+    assert reader.content == 'do(action="Type", text="say "x" (y)")'
@@ -0,0 +1,230 @@
+"""Tests for the ADB wire-protocol client against a scripted local server."""
+
+import socket
+import struct
+import threading
+
+import pytest
+
+from phone_agent.adb.protocol import ADBProtocolError, ADBServerClient
+
+
+class StubADBServer:
+    """
+    Accepts connections on a local port and hands each one to `handler`.
+
+    Requests the handler read are recorded in `requests`, in order.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests: list[str] = []
+        self._sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self._sock.close()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            try:
+                self.handler(self, conn)
+            except (OSError, AssertionError):
+                pass
+
+    def read_request(self, conn) -> str:
+        length = int(read_exact(conn, 4), 16)
+        request = read_exact(conn, length).decode()
+        self.requests.append(request)
+        return request
+
+
+def read_exact(conn, size: int) -> bytes:
+    buf = b""
+    while len(buf) < size:
+        data = conn.recv(size - len(buf))
+        if not data:
+            raise OSError("client closed the connection")
+        buf += data
+    return buf
+
+
+def length_prefixed(text: str) -> bytes:
+    data = text.encode()
+    return f"{len(data):04x}".encode() + data
+
+
+def sync_message(message_id: bytes, payload: bytes = b"") -> bytes:
+    return message_id + struct.pack("<I", len(payload)) + payload
+
+
+def read_sync_message(conn) -> tuple[bytes, bytes]:
+    message_id, length = struct.unpack("<4sI", read_exact(conn, 8))
+    if message_id in (b"DONE", b"QUIT"):
+        return message_id, b""
+    return message_id, read_exact(conn, length)
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(handler):
+        server = StubADBServer(handler)
+        servers.append(server)
+        client = ADBServerClient(host="127.0.0.1", port=server.port, timeout=5)
+        return server, client
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def test_version(stub):
+    def handler(server, conn):
+        server.read_request(conn)
+        conn.sendall(b"OKAY" + length_prefixed("0029"))
+
+    server, client = stub(handler)
+    assert client.version() == 0x29
+    assert server.requests == ["host:version"]
+
+
+def test_transport_failure_raises_server_message(stub):
+    def handler(server, conn):
+        server.read_request(conn)
+        conn.sendall(b"FAIL" + length_prefixed("device 'missing' not found"))
+
+    server, client = stub(handler)
+    with pytest.raises(ADBProtocolError, match="device 'missing' not found"):
+        client.shell("echo hi", "missing")
+    assert server.requests == ["host:transport:missing"]
+
+
+def test_unexpected_status_raises(stub):
+    def handler(server, conn):
+        server.read_request(conn)
+        conn.sendall(b"WHAT")
+
+    _, client = stub(handler)
+    with pytest.raises(ADBProtocolError, match="Unexpected ADB server status"):
+        client.version()
+
+
+def test_shell_reads_output_until_close(stub):
+    def handler(server, conn):
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        conn.sendall(b"line one\r\n")
+        conn.sendall(b"line two\r\n")
+
+    server, client = stub(handler)
+    assert client.shell("getprop", "emulator-5554") == "line one\nline two\n"
+    assert server.requests == ["host:transport:emulator-5554", "shell:getprop"]
+
+
+def test_exec_out_keeps_binary_output(stub):
+    payload = bytes(range(256)) * 3
+
+    def handler(server, conn):
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        server.read_request(conn)
+        conn.sendall(b"OKAY" + payload)
+
+    server, client = stub(handler)
+    assert client.exec_out("screencap") == payload
+    assert server.requests == ["host:transport-any", "exec:screencap"]
+
+
+def test_sync_recv(stub):
+    def handler(server, conn):
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        assert read_sync_message(conn) == (b"RECV", b"/sdcard/a.png")
+        conn.sendall(sync_message(b"DATA", b"hello "))
+        conn.sendall(sync_message(b"DATA", b"world"))
+        conn.sendall(sync_message(b"DONE"))
+        assert read_sync_message(conn)[0] == b"QUIT"
+
+    server, client = stub(handler)
+    assert client.pull("/sdcard/a.png") == b"hello world"
+    assert server.requests == ["host:transport-any", "sync:"]
+
+
+def test_sync_recv_failure(stub):
+    def handler(server, conn):
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        read_sync_message(conn)
+        conn.sendall(sync_message(b"FAIL", b"No such file or directory"))
+
+    _, client = stub(handler)
+    with pytest.raises(ADBProtocolError, match="Pull failed: No such file"):
+        client.pull("/missing")
+
+
+def test_sync_send(stub):
+    received = {}
+    data = b"x" * 70000  # more than one 64 KiB DATA chunk
+
+    def handler(server, conn):
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        received["target"] = read_sync_message(conn)
+        chunks = []
+        while True:
+            message_id, payload = read_sync_message(conn)
+            if message_id == b"DONE":
+                break
+            assert message_id == b"DATA"
+            chunks.append(payload)
+        received["chunks"] = chunks
+        conn.sendall(sync_message(b"OKAY"))
+        assert read_sync_message(conn)[0] == b"QUIT"
+
+    _, client = stub(handler)
+    client.push(data, "/data/local/tmp/f.jar", mode=0o755)
+    assert received["target"] == (b"SEND", f"/data/local/tmp/f.jar,{0o755}".encode())
+    assert len(received["chunks"]) == 2
+    assert b"".join(received["chunks"]) == data
+
+
+def test_sync_send_failure(stub):
+    def handler(server, conn):
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        server.read_request(conn)
+        conn.sendall(b"OKAY")
+        while read_sync_message(conn)[0] != b"DONE":
+            pass
+        conn.sendall(sync_message(b"FAIL", b"Permission denied"))
+
+    _, client = stub(handler)
+    with pytest.raises(ADBProtocolError, match="Push failed: Permission denied"):
+        client.push(b"data", "/system/f")
+
+
+def test_server_unreachable():
+    with socket.create_server(("127.0.0.1", 0)) as sock:
+        port = sock.getsockname()[1]
+    client = ADBServerClient(host="127.0.0.1", port=port, timeout=1)
+    with pytest.raises(ADBProtocolError, match="Cannot reach ADB server"):
+        client.version()
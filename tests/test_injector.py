@@ -0,0 +1,180 @@
+"""Tests for the input injector client against a scripted socket server."""
+
+import socket
+import struct
+import threading
+
+import pytest
+
+from phone_agent.adb import injector
+from phone_agent.adb import input as adb_input
+from phone_agent.adb.injector import InjectorClient, InjectorError, PartialTextError
+
+# Payload formats of the fixed-size messages
+PAYLOAD_FORMATS = {
+    injector.MSG_PING: "",
+    injector.MSG_TAP: ">ii",
+    injector.MSG_SWIPE: ">iiiiI",
+    injector.MSG_KEY: ">i",
+    injector.MSG_CLEAR: "",
+}
+
+
+class StubInjector:
+    """
+    The device end of an injector connection, on a local socket pair.
+
+    Replies to each message with the next of `statuses` (OK once they run
+    out) and records the messages received as (type, payload).
+    """
+
+    def __init__(self, greeting=None, statuses=(), drop_after=None):
+        self.client_sock, self._sock = socket.socketpair()
+        self.greeting = greeting or injector.MAGIC + bytes([injector.PROTOCOL_VERSION])
+        self.statuses = list(statuses)
+        self.drop_after = drop_after
+        self.messages: list[tuple[int, bytes]] = []
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        try:
+            self._sock.sendall(self.greeting)
+            while self.drop_after is None or len(self.messages) < self.drop_after:
+                header = self._sock.recv(1)
+                if not header:
+                    return
+                self._handle(header[0])
+        except OSError:
+            pass
+        finally:
+            self._sock.close()
+
+    def _handle(self, message_type):
+        if message_type == injector.MSG_TEXT:
+            length = struct.unpack(">I", self._recv(4))[0]
+            payload = self._recv(length)
+        else:
+            payload = self._recv(struct.calcsize(PAYLOAD_FORMATS[message_type]))
+        self.messages.append((message_type, payload))
+        status = self.statuses.pop(0) if self.statuses else injector.STATUS_OK
+        self._sock.sendall(bytes([status]))
+
+    def _recv(self, size):
+        buf = b""
+        while len(buf) < size:
+            data = self._sock.recv(size - len(buf))
+            if not data:
+                raise OSError("client closed the connection")
+            buf += data
+        return buf
+
+
+@pytest.fixture
+def injector_backend(monkeypatch):
+    """Use the injector backend with no shared connections left over."""
+    monkeypatch.setattr(injector, "_input_backend", "injector")
+    monkeypatch.setattr(injector, "_clients", {})
+    monkeypatch.setattr(injector, "_failed_at", {})
+    monkeypatch.setattr(injector, "_device_locks", {})
+
+
+def test_greeting_is_checked():
+    client = InjectorClient(StubInjector().client_sock, timeout=2)
+    client.ping()
+    assert not client.closed
+
+
+def test_unexpected_greeting_raises_and_closes():
+    stub = StubInjector(
+        greeting=injector.MAGIC + bytes([injector.PROTOCOL_VERSION + 1])
+    )
+    with pytest.raises(InjectorError, match="Unexpected injector greeting"):
+        InjectorClient(stub.client_sock, timeout=2)
+    assert stub.client_sock.fileno() == -1
+
+
+def test_messages_are_encoded_big_endian():
+    stub = StubInjector()
+    client = InjectorClient(stub.client_sock, timeout=2)
+    client.tap(10, 20)
+    client.swipe(1, 2, 3, 4, 0)
+    client.key(injector.KEYCODES["KEYCODE_BACK"])
+    assert client.text("hi")
+    client.clear()
+    assert stub.messages == [
+        (injector.MSG_TAP, struct.pack(">ii", 10, 20)),
+        (injector.MSG_SWIPE, struct.pack(">iiiiI", 1, 2, 3, 4, 0)),
+        (injector.MSG_KEY, struct.pack(">i", 4)),
+        (injector.MSG_TEXT, b"hi"),
+        (injector.MSG_CLEAR, b""),
+    ]
+
+
+def test_error_status_raises_but_keeps_connection():
+    stub = StubInjector(statuses=[injector.STATUS_ERROR])
+    client = InjectorClient(stub.client_sock, timeout=2)
+    with pytest.raises(InjectorError, match="failed to inject"):
+        client.tap(1, 1)
+    assert not client.closed
+    client.tap(1, 1)
+
+
+def test_unsupported_text_returns_false():
+    stub = StubInjector(statuses=[injector.STATUS_UNSUPPORTED])
+    client = InjectorClient(stub.client_sock, timeout=2)
+    assert client.text("你好") is False
+
+
+def test_unsupported_text_falls_back_to_broadcast(injector_backend, monkeypatch):
+    stub = StubInjector(statuses=[injector.STATUS_UNSUPPORTED])
+    client = InjectorClient(stub.client_sock, timeout=2)
+    monkeypatch.setattr(injector, "start_injector", lambda device_id: client)
+    commands = []
+    monkeypatch.setattr(
+        adb_input, "run_shell", lambda command, device_id: commands.append(command)
+    )
+
+    adb_input.type_text("你好")
+
+    assert stub.messages == [(injector.MSG_TEXT, "你好".encode())]
+    assert commands and commands[0][:4] == ["am", "broadcast", "-a", "ADB_INPUT_B64"]
+
+
+def test_partially_typed_text_is_not_broadcast(injector_backend, monkeypatch):
+    stub = StubInjector(statuses=[injector.STATUS_PARTIAL])
+    client = InjectorClient(stub.client_sock, timeout=2)
+    monkeypatch.setattr(injector, "start_injector", lambda device_id: client)
+    monkeypatch.setattr(
+        adb_input, "run_shell", lambda *args: pytest.fail("typed the text again")
+    )
+
+    with pytest.raises(PartialTextError):
+        adb_input.type_text("hello")
+    assert not client.closed
+
+
+def test_clear_text_uses_injector(injector_backend, monkeypatch):
+    stub = StubInjector()
+    client = InjectorClient(stub.client_sock, timeout=2)
+    monkeypatch.setattr(injector, "start_injector", lambda device_id: client)
+    monkeypatch.setattr(
+        adb_input, "run_shell", lambda *args: pytest.fail("used the shell")
+    )
+
+    adb_input.clear_text()
+
+    assert stub.messages == [(injector.MSG_CLEAR, b"")]
+
+
+def test_reconnects_after_dropped_socket(injector_backend, monkeypatch):
+    stubs = [StubInjector(drop_after=1), StubInjector()]
+    clients = iter([InjectorClient(s.client_sock, timeout=2) for s in stubs])
+    monkeypatch.setattr(injector, "start_injector", lambda device_id: next(clients))
+
+    assert injector.inject_tap(1, 1)
+    # The server went away: this event falls back, and the client is dropped
+    assert not injector.inject_tap(2, 2)
+    assert injector.inject_tap(3, 3)
+
+    assert stubs[0].messages == [(injector.MSG_TAP, struct.pack(">ii", 1, 1))]
+    assert stubs[1].messages == [(injector.MSG_TAP, struct.pack(">ii", 3, 3))]
@@ -0,0 +1,59 @@
+"""Tests for settle detection and its speculative-capture callbacks."""
+
+import pytest
+
+from phone_agent.actions.handler import ActionHandler
+from phone_agent.adb import settle
+from phone_agent.adb.settle import SettleConfig, wait_for_settle
+
+CONFIG = SettleConfig(stable_ms=30, poll_interval_ms=5, min_wait_ms=0, timeout_ms=200)
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    """Serve frame hashes from a list, repeating the last one."""
+    hashes = []
+
+    def get_frame_hash(device_id=None):
+        return hashes.pop(0) if len(hashes) > 1 else hashes[0]
+
+    monkeypatch.setattr(settle, "get_frame_hash", get_frame_hash)
+    return hashes
+
+
+def test_settled_wait_keeps_speculation(frames):
+    frames.extend(["a", "b"])
+    calls = []
+    wait_for_settle(config=CONFIG, on_stable=calls.append)
+    assert calls == [True]
+
+
+def test_changed_screen_drops_speculation(frames):
+    frames.extend(["a", "a", "b", "c"])
+    calls = []
+    wait_for_settle(config=CONFIG, on_stable=calls.append)
+    assert calls == [True, False, True]
+
+
+def test_timeout_drops_speculation(frames):
+    # Repeats once per change, never for stable_ms, until the ceiling
+    frames.extend(["a", "a", "b", "b"] * 50 + ["c"])
+    calls = []
+    wait_for_settle(config=CONFIG, timeout_ms=40, on_stable=calls.append)
+    assert calls[-1] is False
+
+
+def test_fallback_drops_speculation(frames):
+    frames.extend(["a", "a", ""])
+    calls = []
+    wait_for_settle(config=CONFIG, fallback_delay=0.01, on_stable=calls.append)
+    assert calls == [True, False]
+
+
+def test_each_wait_drops_earlier_speculation(frames):
+    frames.append("a")
+    calls = []
+    handler = ActionHandler(settle_config=CONFIG, on_stable=calls.append)
+    handler._wait(1.0)
+    handler._wait(1.0)
+    assert calls == [False, True, False, True]
@@ -0,0 +1,87 @@
+"""Tests for persistent shell sessions, with a local shell standing in for adb."""
+
+import subprocess
+
+import pytest
+
+from phone_agent.adb.shell import ShellNotSentError, ShellSession, ShellSessionPool
+
+
+@pytest.fixture
+def adb_path(tmp_path):
+    """An `adb` that ignores its arguments and runs a local shell."""
+    path = tmp_path / "adb"
+    path.write_text("#!/bin/sh\nexec sh\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture
+def pool(adb_path):
+    pool = ShellSessionPool(max_size=1, adb_path=adb_path)
+    yield pool
+    pool.close()
+
+
+def count_starts(monkeypatch):
+    starts = []
+    start = ShellSession.start
+
+    def counting_start(self):
+        starts.append(self)
+        start(self)
+
+    monkeypatch.setattr(ShellSession, "start", counting_start)
+    return starts
+
+
+def test_output_and_status(pool):
+    assert pool.run_with_status("echo hi; false") == ("hi\n", 1)
+    assert pool.run_with_status("echo err >&2") == ("err\n", 0)
+
+
+def test_output_without_trailing_newline(pool):
+    assert pool.run_with_status("printf abc") == ("abc", 0)
+
+
+def test_session_is_reused(pool, monkeypatch):
+    starts = count_starts(monkeypatch)
+    pool.run("export X=1")
+    assert pool.run("echo $X") == "1\n"
+    assert len(starts) == 1
+
+
+def test_command_not_sent_is_retried(pool, monkeypatch):
+    pool.run("true")
+    session = pool._sessions[0]
+    session._process.kill()
+    session._process.wait()
+    # The shell dies between the liveness check and the write, as when adb drops
+    is_alive = ShellSession.is_alive
+    checks = []
+    monkeypatch.setattr(
+        ShellSession,
+        "is_alive",
+        lambda self: checks.append(self) or len(checks) == 1 or is_alive(self),
+    )
+    starts = count_starts(monkeypatch)
+
+    assert pool.run_with_status("echo again") == ("again\n", 0)
+    assert starts == [session]
+
+
+def test_session_dying_mid_command_is_not_retried(pool, monkeypatch):
+    pool.run("true")
+    starts = count_starts(monkeypatch)
+    with pytest.raises(ConnectionError) as excinfo:
+        pool.run("kill -9 $$")
+    assert not isinstance(excinfo.value, ShellNotSentError)
+    assert starts == []
+
+
+def test_timeout_covers_the_whole_command(pool):
+    # Prints more often than the timeout, so only an overall deadline ends it
+    command = "while true; do echo tick; sleep 0.05; done"
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run(command, timeout=0.5)
+    assert pool.run("echo ok") == "ok\n"